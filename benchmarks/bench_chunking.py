@@ -0,0 +1,96 @@
+"""Compare chunking strategies on a synthetic corpus.
+
+For each strategy the corpus is chunked, embedded and indexed, then queried with
+sentences sampled from the papers. Reports chunk count, duplicated text from
+overlap, index size on disk and hit@k (a top-k chunk from the right paper that
+contains the whole sentence).
+
+Usage:
+    python -m benchmarks.bench_chunking --docs 20 --pages 10 --queries 200 --k 3
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic_corpus import generate_corpus
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunking strategies for index size and retrieval quality")
+    parser.add_argument("--docs", type=int, default=20, help="Number of synthetic papers")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per paper")
+    parser.add_argument("--queries", type=int, default=200, help="Number of sampled query sentences")
+    parser.add_argument("--k", type=int, default=3, help="Chunks retrieved per query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="rag-bench-chunking-")
+    os.environ["FAISS_INDEX_PATH"] = os.path.join(work_dir, "faiss_index")
+
+    from langchain_community.vectorstores import FAISS
+    from src.chunking import SectionChunker, split_sections, split_sentences
+    from src.pdf_processor import pdf_processor
+    from src.vector_store import vector_store_manager
+
+    paths = generate_corpus(os.path.join(work_dir, "corpus"), args.docs, args.pages, seed=args.seed)
+    texts = []
+    for path in paths:
+        with open(path, "rb") as pdf:
+            texts.append(pdf_processor._extract_text_from_pdf(pdf))
+
+    # Query sentences sampled from section bodies, remembered with the paper they came from
+    rng = random.Random(args.seed)
+    candidates = [
+        (doc_num, sentence)
+        for doc_num, text in enumerate(texts)
+        for _, paragraphs in split_sections(text)
+        for paragraph in paragraphs
+        for sentence in split_sentences(paragraph)
+        if len(sentence.split()) >= 8
+    ]
+    samples = rng.sample(candidates, min(args.queries, len(candidates)))
+    corpus_chars = sum(len(text) for text in texts)
+
+    strategies = {
+        "recursive": lambda text: pdf_processor.text_splitter.split_text(text),
+        "sections": lambda text: [chunk["text"] for chunk in SectionChunker().split(text)],
+        "sections_skip_refs": lambda text: [chunk["text"] for chunk in SectionChunker(skip_references=True).split(text)],
+    }
+
+    print(f"{len(texts)} documents, {corpus_chars / 1e6:.2f} MB text, {len(samples)} queries")
+    print(f"{'strategy':20s} {'chunks':>7s} {'dup_text':>9s} {'index_kb':>9s} {'chunk_s':>8s} {f'hit@{args.k}':>7s} {'doc_hit':>8s}")
+    for name, split in strategies.items():
+        started = time.perf_counter()
+        chunks, metadatas = [], []
+        for doc_num, text in enumerate(texts):
+            for chunk in split(text):
+                chunks.append(chunk)
+                metadatas.append({"doc": doc_num})
+        chunk_seconds = time.perf_counter() - started
+
+        vectors = vector_store_manager.embeddings.embed_documents(chunks)
+        vector_store = FAISS.from_embeddings(list(zip(chunks, vectors)), vector_store_manager.embeddings, metadatas=metadatas)
+        index_dir = os.path.join(work_dir, f"index_{name}")
+        vector_store.save_local(index_dir)
+
+        hits = doc_hits = 0
+        for doc_num, sentence in samples:
+            results = vector_store.similarity_search(sentence, k=args.k)
+            doc_hits += any(doc.metadata["doc"] == doc_num for doc in results)
+            hits += any(doc.metadata["doc"] == doc_num and sentence in " ".join(doc.page_content.split()) for doc in results)
+
+        duplicated = sum(len(chunk) for chunk in chunks) / corpus_chars - 1
+        print(
+            f"{name:20s} {len(chunks):7d} {duplicated:8.1%} {directory_size(index_dir) / 1024:9.1f} "
+            f"{chunk_seconds:8.3f} {hits / len(samples):7.3f} {doc_hits / len(samples):8.3f}"
+        )
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
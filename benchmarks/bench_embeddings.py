@@ -0,0 +1,96 @@
+"""Compare embedding backends: startup time, memory, throughput and parity with torch.
+
+Requires an ONNX export for the onnx rows (python -m src.onnx_embeddings export --quantize).
+Startup and memory are measured in a fresh interpreter per backend. Parity is always
+measured against the torch model; without torch it is reported as n/a.
+
+Usage:
+    python -m benchmarks.bench_embeddings --docs 10 --pages 5 --chunks 512
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_corpus import generate_corpus
+
+BACKENDS = {
+    "torch": {"EMBEDDING_BACKEND": "torch"},
+    "onnx_fp32": {"EMBEDDING_BACKEND": "onnx", "ONNX_QUANTIZED": "false"},
+    "onnx_int8": {"EMBEDDING_BACKEND": "onnx", "ONNX_QUANTIZED": "true"},
+}
+
+STARTUP_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+from src.embedding_backends import create_embeddings
+embeddings = create_embeddings()
+embeddings.embed_query("warm up")
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"startup_s": time.perf_counter() - started, "peak_rss_mb": peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024}))
+"""
+
+def measure_startup(env_overrides: dict) -> dict:
+    """Import + model load + first query in a fresh process"""
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        env={**os.environ, **env_overrides},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--docs", type=int, default=10, help="Number of synthetic papers")
+    parser.add_argument("--pages", type=int, default=5, help="Pages per paper")
+    parser.add_argument("--chunks", type=int, default=512, help="Chunks to embed for throughput and parity")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from config.settings import Config
+    from src.embedding_backends import create_embeddings
+    from src.pdf_processor import pdf_processor
+
+    work_dir = tempfile.mkdtemp(prefix="rag-bench-embed-")
+    chunks = []
+    for path in generate_corpus(os.path.join(work_dir, "corpus"), args.docs, args.pages, seed=args.seed):
+        with open(path, "rb") as pdf:
+            chunks.extend(pdf_processor.split_text_into_chunks(pdf_processor._extract_text_from_pdf(pdf)))
+    chunks = chunks[:args.chunks]
+
+    reference = None
+    print(f"{len(chunks)} chunks")
+    print(f"{'backend':10s} {'startup_s':>9s} {'rss_mb':>8s} {'chunks/s':>9s} {'mean_cos':>9s} {'min_cos':>8s}")
+    for name, env_overrides in BACKENDS.items():
+        startup = measure_startup(env_overrides)
+        if "error" in startup:
+            print(f"{name:10s} skipped: {startup['error']}")
+            continue
+
+        Config.ONNX_QUANTIZED = env_overrides.get("ONNX_QUANTIZED") == "true"
+        embeddings = create_embeddings(backend=env_overrides["EMBEDDING_BACKEND"])
+
+        embeddings.embed_documents(chunks[:8])
+        started = time.perf_counter()
+        vectors = np.asarray(embeddings.embed_documents(chunks), dtype=np.float32)
+        throughput = len(chunks) / (time.perf_counter() - started)
+
+        if name == "torch":
+            reference = vectors
+        if reference is None:
+            parity = f"{'n/a':>9s} {'n/a':>8s}"
+        else:
+            cosine = (reference * vectors).sum(axis=1) / (np.linalg.norm(reference, axis=1) * np.linalg.norm(vectors, axis=1))
+            parity = f"{cosine.mean():9.4f} {cosine.min():8.4f}"
+        print(f"{name:10s} {startup['startup_s']:9.2f} {startup['peak_rss_mb']:8.1f} {throughput:9.1f} {parity}")
+
+if __name__ == "__main__":
+    main()
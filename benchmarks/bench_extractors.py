@@ -0,0 +1,94 @@
+"""Compare PDF extractor backends: throughput and text parity with PyPDF2.
+
+Runs every installed backend over the same fixed corpus: a directory of real PDFs
+(--corpus) or, by default, a deterministic synthetic corpus. Parity is the F1 overlap
+of each document's words with the PyPDF2 text (1.0 = the same words, in any order).
+A low score is not always the faster backend's fault: PyPDF2 garbles some CID-keyed
+(e.g. CJK) fonts that PDFium and pdfminer decode.
+
+Usage:
+    python -m benchmarks.bench_extractors --corpus papers/ --repeat 3
+    python -m benchmarks.bench_extractors --docs 20 --pages 10
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List
+
+from benchmarks.synthetic_corpus import generate_corpus
+from src.pdf_extractors import EXTRACTORS, create_extractor, is_available
+
+WORD_RE = re.compile(r"\w+")
+
+def word_f1(reference: str, text: str) -> float:
+    """F1 overlap of the word multisets of two texts"""
+    expected, actual = Counter(WORD_RE.findall(reference.lower())), Counter(WORD_RE.findall(text.lower()))
+    if not expected and not actual:
+        return 1.0
+    common = sum((expected & actual).values())
+    if not common:
+        return 0.0
+    precision, recall = common / sum(actual.values()), common / sum(expected.values())
+    return 2 * precision * recall / (precision + recall)
+
+def run_backend(name: str, paths: List[str], repeat: int) -> Dict:
+    """Extract every file repeat times; keeps the texts of the last run"""
+    extractor = create_extractor(name)
+    texts, errors, pages, best = {}, 0, 0, float("inf")
+    for _ in range(repeat):
+        errors, pages = 0, 0
+        started = time.perf_counter()
+        for path in paths:
+            try:
+                with open(path, "rb") as pdf:
+                    page_texts = extractor.extract_pages(pdf)
+            except Exception:
+                errors += 1
+                texts[path] = ""
+                continue
+            pages += len(page_texts)
+            texts[path] = "\n".join(page_texts)
+        best = min(best, time.perf_counter() - started)
+    return {"texts": texts, "errors": errors, "pages": pages, "seconds": best}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extractor backends")
+    parser.add_argument("--corpus", help="Directory of PDFs (default: a generated synthetic corpus)")
+    parser.add_argument("--docs", type=int, default=10, help="Number of synthetic papers")
+    parser.add_argument("--pages", type=int, default=8, help="Pages per synthetic paper")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend (the fastest is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.corpus:
+        paths = sorted(
+            os.path.join(root, name) for root, _, names in os.walk(args.corpus) for name in names if name.lower().endswith(".pdf")
+        )
+    else:
+        paths = generate_corpus(os.path.join(tempfile.mkdtemp(prefix="rag-bench-extract-"), "corpus"), args.docs, args.pages, seed=args.seed)
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    print(f"{len(paths)} PDFs, {total_bytes / 1e6:.1f} MB")
+
+    # PyPDF2 first: it is the parity reference
+    reference = None
+    print(f"{'backend':10s} {'pages/s':>8s} {'MB/s':>7s} {'speedup':>8s} {'errors':>6s} {'mean_f1':>8s} {'min_f1':>7s}")
+    for name in ["pypdf2"] + [name for name in EXTRACTORS if name != "pypdf2"]:
+        if not is_available(name):
+            print(f"{name:10s} skipped: not installed")
+            continue
+        result = run_backend(name, paths, max(1, args.repeat))
+        if reference is None:
+            reference = result
+        scores = [word_f1(reference["texts"][path], result["texts"][path]) for path in paths]
+        seconds = max(result["seconds"], 1e-9)
+        print(
+            f"{name:10s} {result['pages'] / seconds:8.1f} {total_bytes / seconds / 1e6:7.2f} "
+            f"{reference['seconds'] / seconds:7.2f}x {result['errors']:6d} "
+            f"{sum(scores) / max(len(scores), 1):8.4f} {min(scores, default=0.0):7.4f}"
+        )
+
+if __name__ == "__main__":
+    main()
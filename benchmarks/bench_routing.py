@@ -0,0 +1,85 @@
+"""Compare flat chunk search with two-stage (paper routing) search on a large synthetic library.
+
+Chunk vectors are clustered around one centre per paper, so no embedding model
+runs. Reports per-query latency and recall@k against the flat search results
+for several ROUTING_TOP_DOCUMENTS values.
+
+Usage:
+    python -m benchmarks.bench_routing --papers 10000 --chunks 30 --dim 384 --queries 200
+"""
+import argparse
+import time
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from benchmarks.run_benchmarks import percentiles
+
+def build_library(papers: int, chunks: int, dim: int, spread: float, rng: np.random.Generator):
+    """Chunk vectors scattered around per-paper centres, plus the centres"""
+    centres = rng.standard_normal((papers, dim)).astype(np.float32)
+    vectors = np.repeat(centres, chunks, axis=0) + spread * rng.standard_normal((papers * chunks, dim)).astype(np.float32)
+    return centres, vectors
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark paper-level routing against flat chunk search")
+    parser.add_argument("--papers", type=int, default=10000)
+    parser.add_argument("--chunks", type=int, default=30, help="Chunks per paper")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--spread", type=float, default=0.8, help="Chunk distance from the paper centre")
+    parser.add_argument("--top-documents", default="5,10,20", help="Comma-separated ROUTING_TOP_DOCUMENTS values")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from src.vector_store import IndexSnapshot, vector_store_manager as manager
+
+    rng = np.random.default_rng(args.seed)
+    centres, vectors = build_library(args.papers, args.chunks, args.dim, args.spread, rng)
+
+    started = time.perf_counter()
+    index = faiss.IndexFlatL2(args.dim)
+    index.add(vectors)
+    documents = {
+        str(i): Document(page_content="", metadata={"doc_id": f"paper{i // args.chunks:06d}", "chunk": i % args.chunks})
+        for i in range(len(vectors))
+    }
+    vector_store = FAISS(manager.embeddings, index, InMemoryDocstore(documents), {i: str(i) for i in range(len(vectors))})
+    document_map = manager._build_document_map(vector_store)
+    snapshot = IndexSnapshot(vector_store, document_map, manager._build_document_vectors(vector_store, document_map), None)
+    print(f"{args.papers} papers, {len(vectors)} chunks, dim {args.dim} (setup {time.perf_counter() - started:.1f}s)")
+
+    # Queries near a random paper's centre, like a question about that paper
+    targets = rng.integers(0, args.papers, args.queries)
+    queries = (centres[targets] + args.spread * rng.standard_normal((args.queries, args.dim))).astype(np.float32)
+
+    def timed_search(top_documents: int):
+        manager.config.ROUTING_TOP_DOCUMENTS = top_documents
+        manager.config.ROUTING_MIN_DOCUMENTS = 0
+        latencies, results = [], []
+        for query in queries:
+            started = time.perf_counter()
+            results.append(manager._search_by_vectors(snapshot, query[None, :], args.k))
+            latencies.append(time.perf_counter() - started)
+        return latencies, [[vector_id for vector_id, _ in hits[0]] for hits in results]
+
+    flat_latencies, flat_results = timed_search(0)
+    print(f"{'mode':14s} {'p50_ms':>8s} {'p95_ms':>8s} {'mean_ms':>8s} {f'recall@{args.k}':>9s} {'paper_hit':>9s}")
+
+    def report(name, latencies, results):
+        stats = percentiles(latencies)
+        recall = np.mean([len(set(r) & set(f)) / len(f) for r, f in zip(results, flat_results)])
+        paper_hit = np.mean([any(i // args.chunks == t for i in r) for r, t in zip(results, targets)])
+        print(f"{name:14s} {stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} {stats['mean_ms']:8.2f} {recall:9.3f} {paper_hit:9.3f}")
+
+    report("flat", flat_latencies, flat_results)
+    for top_documents in (int(value) for value in args.top_documents.split(",")):
+        latencies, results = timed_search(top_documents)
+        report(f"routed M={top_documents}", latencies, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Calibrate RETRIEVAL_MIN_SIMILARITY, the retrieval confidence gate, on the current index.
+
+Scores on-topic and off-topic questions against the index at FAISS_INDEX_PATH (best chunk
+cosine similarity per question) and reports, for a range of thresholds, how many on-topic
+questions still reach the LLM and how many off-topic ones are answered without it. The
+recommended threshold is the highest one that keeps --target-recall of the on-topic questions.
+
+Both question sets have generic defaults; questions your users actually ask (one per line)
+calibrate much better.
+
+Usage:
+    python -m benchmarks.calibrate_gate
+    python -m benchmarks.calibrate_gate --relevant questions.txt --off-topic unrelated.txt --target-recall 0.98
+"""
+import argparse
+from typing import List
+
+import numpy as np
+
+# Questions any collection of research papers can answer
+DEFAULT_RELEVANT = [
+    "What problem does the paper address?",
+    "Which datasets are used in the evaluation?",
+    "How does the proposed method compare to the baselines?",
+    "What are the main limitations discussed?",
+    "Summarize the methodology in two sentences.",
+    "What are the key results?",
+    "What related work does the paper build on?",
+    "Which metrics are reported?",
+    "What future work do the authors suggest?",
+    "What is the main contribution of this work?",
+]
+
+# Questions no research paper answers
+DEFAULT_OFF_TOPIC = [
+    "What is the weather like in Paris tomorrow?",
+    "Give me a recipe for chocolate chip cookies.",
+    "Who won the football world cup in 2018?",
+    "How do I reset my router password?",
+    "Recommend a good movie for tonight.",
+    "What time does the supermarket close?",
+    "Translate 'good morning' into Italian.",
+    "How many calories are in a banana?",
+    "Write a birthday poem for my sister.",
+    "What is the capital of Australia?",
+]
+
+def read_questions(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+def best_similarities(questions: List[str]) -> np.ndarray:
+    """Cosine similarity of each question's closest chunk (-1 when nothing is retrieved)"""
+    from src.vector_store import vector_store_manager
+
+    scored = vector_store_manager.batch_similarity_search_with_scores(questions, k=1)
+    return np.array([hits[0][1] if hits else -1.0 for hits in scored])
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the retrieval confidence gate")
+    parser.add_argument("--relevant", help="File of questions the indexed papers answer (one per line)")
+    parser.add_argument("--off-topic", help="File of questions they do not answer (one per line)")
+    parser.add_argument("--target-recall", type=float, default=0.95, help="Share of relevant questions that must pass the gate")
+    args = parser.parse_args()
+
+    relevant = read_questions(args.relevant) if args.relevant else DEFAULT_RELEVANT
+    off_topic = read_questions(args.off_topic) if args.off_topic else DEFAULT_OFF_TOPIC
+    relevant_scores, off_topic_scores = best_similarities(relevant), best_similarities(off_topic)
+
+    for label, scores in (("relevant", relevant_scores), ("off-topic", off_topic_scores)):
+        print(
+            f"{label:10s} n={len(scores):4d} min={scores.min():.3f} p5={np.percentile(scores, 5):.3f} "
+            f"median={np.median(scores):.3f} max={scores.max():.3f}"
+        )
+
+    print(f"\n{'threshold':>9s} {'relevant_pass':>13s} {'off_topic_blocked':>17s}")
+    for threshold in np.round(np.arange(0.0, 0.85, 0.05), 2):
+        print(f"{threshold:9.2f} {np.mean(relevant_scores >= threshold):13.2%} {np.mean(off_topic_scores < threshold):17.2%}")
+
+    # Highest threshold that still lets target_recall of the relevant questions through
+    recommended = max(0.0, float(np.quantile(relevant_scores, 1.0 - args.target_recall, method="lower")))
+    print(
+        f"\nRETRIEVAL_MIN_SIMILARITY={recommended:.3f} passes {np.mean(relevant_scores >= recommended):.0%} of relevant "
+        f"and blocks {np.mean(off_topic_scores < recommended):.0%} of off-topic questions"
+    )
+    if np.mean(off_topic_scores < recommended) < 0.5:
+        print("The two sets overlap: keep the gate low, or calibrate with questions your users actually ask")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Compare two benchmark result files stage by stage.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+import argparse
+import json
+
+def load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    baseline = load(args.baseline)
+    candidate = load(args.candidate)
+
+    print(f"{'stage':12s} {'metric':18s} {'baseline':>12s} {'candidate':>12s} {'ratio':>8s}")
+    for stage, values in candidate["stages"].items():
+        for metric, value in values.items():
+            old = baseline["stages"].get(stage, {}).get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+                continue
+            ratio = f"{value / old:.2f}x" if old else "-"
+            print(f"{stage:12s} {metric:18s} {old:12.3f} {value:12.3f} {ratio:>8s}")
+    print(f"{'':12s} {'peak_rss_mb':18s} {baseline['peak_rss_mb']:12.1f} {candidate['peak_rss_mb']:12.1f}")
+
+if __name__ == "__main__":
+    main()
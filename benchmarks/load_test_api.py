@@ -0,0 +1,138 @@
+"""Load test for the HTTP API (src/api_server.py).
+
+Sends a mix of /search and streamed /ask requests from concurrent clients and reports
+throughput, latency percentiles, time to first token and error/503 counts. A stream that
+ends without "event: done" or carries an error answer is counted as failed, not by status.
+With --start, a local server is launched first, with the fake LLM backend unless --backend
+is given. The fake model has no HTTP client, so run the real backend (e.g. against a
+local OpenAI-compatible server) to exercise the async client pool.
+
+Usage:
+    LLM_BACKEND=fake python -m src.api_server --workers 8 &
+    python -m benchmarks.load_test_api --clients 32 --requests 1000 --ask-fraction 0.3
+    python -m benchmarks.load_test_api --start --workers 4 --clients 16
+    python -m benchmarks.load_test_api --start --backend groq --ask-fraction 1 --requests 200
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from urllib.parse import urlparse
+
+from benchmarks.run_benchmarks import percentiles
+
+QUESTIONS = [
+    "What problem does the paper address?",
+    "Which datasets are used in the evaluation?",
+    "How does the proposed method compare to the baselines?",
+    "What are the main limitations discussed?",
+    "Summarize the methodology in two sentences.",
+    "What are the key results?",
+]
+
+def post(url: str, path: str, payload: dict, stream: bool = False):
+    """(status, seconds to first token, total seconds, whether a stream completed cleanly) for one request"""
+    target = urlparse(url)
+    connection = HTTPConnection(target.hostname, target.port, timeout=120)
+    started = time.perf_counter()
+    try:
+        connection.request("POST", path, json.dumps(payload), {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        first, ok = None, True
+        if stream and response.status == 200:
+            ok = False
+            for line in response:
+                if first is None and line.startswith(b"data:"):
+                    first = time.perf_counter() - started
+                if line.startswith(b"event: done"):
+                    ok = True
+                elif line.startswith(b"event: error") or b"Error processing query" in line:
+                    ok, first = False, None
+                    break
+        else:
+            response.read()
+        return response.status, first, time.perf_counter() - started, ok
+    finally:
+        connection.close()
+
+def wait_for_server(url: str, timeout: float = 300.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/health", timeout=5) as response:
+                return json.load(response)
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"API server at {url} did not become healthy")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the HTTP API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=500, help="Total requests")
+    parser.add_argument("--ask-fraction", type=float, default=0.2, help="Share of streamed /ask requests (rest: /search)")
+    parser.add_argument("--start", action="store_true", help="Start a local server")
+    parser.add_argument("--backend", default="fake", help="LLM_BACKEND of the server started with --start")
+    parser.add_argument("--workers", type=int, default=8, help="Server workers with --start")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    if args.start:
+        port = urlparse(args.url).port
+        server = subprocess.Popen(
+            [sys.executable, "-m", "src.api_server", "--port", str(port), "--workers", str(args.workers)],
+            env={**os.environ, "LLM_BACKEND": args.backend},
+        )
+    try:
+        health = wait_for_server(args.url)
+        print(f"Server: {health}")
+
+        rng = random.Random(args.seed)
+        plan = [("ask" if rng.random() < args.ask_fraction else "search", rng.choice(QUESTIONS)) for _ in range(args.requests)]
+        latencies, first_tokens, statuses, failed_streams = defaultdict(list), [], defaultdict(int), [0]
+        lock = threading.Lock()
+
+        def run(item):
+            endpoint, question = item
+            if endpoint == "ask":
+                status, first, total, ok = post(args.url, "/ask", {"question": question}, stream=True)
+            else:
+                status, first, total, ok = post(args.url, "/search", {"query": question})
+            with lock:
+                statuses[status] += 1
+                if not ok:
+                    failed_streams[0] += 1
+                elif status == 200:
+                    latencies[endpoint].append(total)
+                    if first is not None:
+                        first_tokens.append(first)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as executor:
+            list(executor.map(run, plan))
+        elapsed = time.perf_counter() - started
+
+        print(f"{args.requests} requests from {args.clients} clients in {elapsed:.1f}s: {args.requests / elapsed:.1f} req/s")
+        print(f"Status codes: {dict(sorted(statuses.items()))}, failed streams: {failed_streams[0]}")
+        for endpoint, values in sorted(latencies.items()):
+            stats = percentiles(values)
+            print(f"  /{endpoint:7s} n={len(values):5d} p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms")
+        if first_tokens:
+            stats = percentiles(first_tokens)
+            print(f"  /ask first token p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""End-to-end ingestion and query benchmark.
+
+Generates a synthetic PDF corpus and measures every stage of the
+PDFProcessor -> VectorStoreManager -> ChatHandler path with the fake LLM backend.
+
+Usage:
+    python -m benchmarks.run_benchmarks --docs 50 --pages 12 --queries 200
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+import numpy as np
+
+from benchmarks.synthetic_corpus import generate_corpus
+
+TRACKED_PACKAGES = [
+    "PyPDF2", "langchain", "langchain-community", "langchain-text-splitters", "langchain-huggingface",
+    "faiss-cpu", "sentence-transformers", "torch", "numpy", "streamlit",
+]
+
+def percentiles(values):
+    """p50/p95/p99 and mean of a list of latencies, in milliseconds"""
+    if not values:
+        return {}
+    ms = np.asarray(values) * 1000.0
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+    }
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def environment_info() -> dict:
+    versions = {}
+    for package in TRACKED_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit,
+        "packages": versions,
+    }
+
+def run(args) -> dict:
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="rag-bench-")
+
+    # Configure before importing the app modules: offline LLM and a private index location
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.llm_tokens_per_second)
+    os.environ["LLM_REQUESTS_PER_MINUTE"] = "0"
+    os.environ["LLM_TOKENS_PER_MINUTE"] = "0"
+    os.environ["FAISS_INDEX_PATH"] = os.path.join(work_dir, "faiss_index")
+
+    from langchain_community.vectorstores import FAISS
+    from src.pdf_processor import pdf_processor
+    from src.vector_store import EMPTY_SNAPSHOT, vector_store_manager
+    from src.chat_handler import chat_handler
+    from src.llm_backends import get_chat_model
+
+    results = {"stages": {}}
+    stages = results["stages"]
+
+    # Corpus
+    started = time.perf_counter()
+    paths = generate_corpus(os.path.join(work_dir, "corpus"), args.docs, args.pages, seed=args.seed)
+    stages["corpus"] = {
+        "seconds": time.perf_counter() - started,
+        "documents": len(paths),
+        "pages": args.docs * args.pages,
+        "bytes": sum(os.path.getsize(p) for p in paths),
+    }
+
+    # Extraction
+    texts = []
+    started = time.perf_counter()
+    for path in paths:
+        with open(path, "rb") as pdf:
+            texts.append(pdf_processor._extract_text_from_pdf(pdf))
+    elapsed = time.perf_counter() - started
+    stages["extract"] = {
+        "seconds": elapsed,
+        "pages_per_s": args.docs * args.pages / elapsed,
+        "chars": sum(len(t) for t in texts),
+    }
+
+    # Chunking
+    chunks, metadatas = [], []
+    started = time.perf_counter()
+    for doc_num, text in enumerate(texts):
+        for chunk_num, chunk in enumerate(pdf_processor.split_text_into_chunks(text)):
+            chunks.append(chunk)
+            metadatas.append({"doc_id": f"bench{doc_num:05d}", "title": f"Synthetic Paper {doc_num}", "chunk": chunk_num})
+    elapsed = time.perf_counter() - started
+    stages["chunk"] = {
+        "seconds": elapsed,
+        "chunks": len(chunks),
+        "chunks_per_s": len(chunks) / elapsed,
+        "mb_per_s": stages["extract"]["chars"] / elapsed / 1e6,
+    }
+
+    # Embedding
+    started = time.perf_counter()
+    vectors = vector_store_manager.embeddings.embed_documents(chunks)
+    elapsed = time.perf_counter() - started
+    stages["embed"] = {"seconds": elapsed, "chunks_per_s": len(chunks) / elapsed, "dimension": len(vectors[0])}
+
+    # Index build and write
+    started = time.perf_counter()
+    vector_store = FAISS.from_embeddings(
+        list(zip(chunks, vectors)), vector_store_manager.embeddings, metadatas=metadatas
+    )
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    vector_store_manager._save_atomic(vector_store)
+    stages["index_build"] = {"seconds": build_seconds, "vectors": vector_store.index.ntotal}
+    stages["index_write"] = {"seconds": time.perf_counter() - started}
+
+    # Index load (drop the in-memory copy first)
+    vector_store_manager._snapshot = EMPTY_SNAPSHOT
+    started = time.perf_counter()
+    vector_store_manager.load_vector_store()
+    stages["index_load"] = {"seconds": time.perf_counter() - started}
+
+    # Queries: retrieval alone, then the full chat path with the fake LLM
+    rng = random.Random(args.seed)
+    questions = [" ".join(rng.choice(chunks).split()[:12]) + "?" for _ in range(args.queries)]
+
+    retrieval_latencies = []
+    for question in questions:
+        started = time.perf_counter()
+        vector_store_manager.similarity_search(question)
+        retrieval_latencies.append(time.perf_counter() - started)
+    stages["retrieve"] = percentiles(retrieval_latencies)
+
+    llm = get_chat_model(chat_handler.config.GROQ_MODEL_NAME, chat_handler.backend)
+    model_seconds_before = llm.model_seconds()
+    query_latencies = []
+    for question in questions:
+        started = time.perf_counter()
+        chat_handler.handle_user_query(question, [])
+        query_latencies.append(time.perf_counter() - started)
+    model_seconds = llm.model_seconds() - model_seconds_before
+    stages["query"] = percentiles(query_latencies)
+    stages["query"]["queries"] = len(questions)
+    stages["query"]["model_seconds"] = model_seconds
+    stages["query"]["overhead_mean_ms"] = (sum(query_latencies) - model_seconds) / len(questions) * 1000.0
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    results["work_dir"] = work_dir
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion and query latency on a synthetic corpus")
+    parser.add_argument("--docs", type=int, default=20, help="Number of synthetic papers")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per paper")
+    parser.add_argument("--queries", type=int, default=100, help="Number of queries to time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Fake LLM time to first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=0.0, help="Fake LLM token rate (0 = instant)")
+    parser.add_argument("--work-dir", help="Directory for the corpus and index (default: a temp dir)")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    started_at = datetime.now(timezone.utc)
+    results = run(args)
+    report = {
+        "started_at": started_at.isoformat(),
+        "params": vars(args),
+        "environment": environment_info(),
+        **results,
+    }
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", started_at.strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for stage, values in results["stages"].items():
+        summary = ", ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in values.items())
+        print(f"{stage:12s} {summary}")
+    print(f"peak_rss_mb  {results['peak_rss_mb']:.1f}")
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import os
+import random
+import textwrap
+from typing import List
+
+SECTIONS = ["Abstract", "1 Introduction", "2 Related Work", "3 Method", "4 Experiments", "5 Results", "6 Conclusion", "References"]
+
+VOCABULARY = (
+    "model training data network attention transformer layer embedding retrieval corpus benchmark "
+    "accuracy baseline dataset evaluation loss gradient optimization parameter inference latency "
+    "throughput language vision graph representation contrastive supervised unsupervised encoder "
+    "decoder token sequence classification regression ablation robustness generalization scaling "
+    "architecture convolution recurrent memory sparse dense distillation pretraining finetuning"
+).split()
+
+LINE_WIDTH = 90
+LINES_PER_PAGE = 56
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_pdf(path: str, pages: List[List[str]]):
+    """Write a minimal text-only PDF (Helvetica, one text block per page)"""
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for i, lines in enumerate(pages):
+        page_id = 4 + 2 * i
+        content_id = page_id + 1
+        stream = "BT /F1 10 Tf 12 TL 50 760 Td " + " ".join(f"({_escape(line)}) Tj T*" for line in lines) + " ET"
+        objects[content_id] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+        objects[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n{objects[obj_id]}\nendobj\n".encode("latin-1")
+
+    xref_offset = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1")
+    for obj_id in range(1, size):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(VOCABULARY, k=rng.randint(8, 20))
+    return " ".join(words).capitalize() + "."
+
+def generate_paper_pages(rng: random.Random, title: str, num_pages: int) -> List[List[str]]:
+    """Generate paper-like pages with a running header, section headings and page numbers"""
+    body: List[str] = [title, ""]
+    sections_left = list(SECTIONS)
+    target_lines = num_pages * (LINES_PER_PAGE - 3)
+    while len(body) < target_lines:
+        if sections_left and len(body) >= (len(SECTIONS) - len(sections_left)) * target_lines // len(SECTIONS):
+            body += ["", sections_left.pop(0)]
+        paragraph = " ".join(_sentence(rng) for _ in range(rng.randint(3, 7)))
+        body += textwrap.wrap(paragraph, LINE_WIDTH)
+
+    pages = []
+    per_page = LINES_PER_PAGE - 3
+    for page_num in range(num_pages):
+        lines = body[page_num * per_page:(page_num + 1) * per_page]
+        pages.append([f"{title} - Synthetic Preprint", ""] + lines + [str(page_num + 1)])
+    return pages
+
+def generate_corpus(output_dir: str, num_docs: int, pages_per_doc: int, seed: int = 0) -> List[str]:
+    """Generate a deterministic corpus of synthetic paper PDFs and return their paths"""
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for doc_num in range(num_docs):
+        path = os.path.join(output_dir, f"paper_{doc_num:05d}.pdf")
+        title = f"Synthetic Paper {doc_num}: {' '.join(rng.choices(VOCABULARY, k=4)).title()}"
+        write_pdf(path, generate_paper_pages(rng, title, pages_per_doc))
+        paths.append(path)
+    return paths
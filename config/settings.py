@@ -9,25 +9,117 @@ class Config:
     # Updated to use supported model - llama-3.3-70b-versatile is the recommended replacement for llama3-8b-8192
     # Other available models: llama-3.1-70b-versatile, llama-3.1-8b-instant, mixtral-8x7b-32768
     GROQ_MODEL_NAME = os.getenv("GROQ_MODEL_NAME", "llama-3.1-8b-instant")
-    
+
+    # LLM backend: "groq", "openai" (any OpenAI-compatible server) or "fake" (offline, for load testing)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+    LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:8000/v1")  # OpenAI-compatible server
+    LLM_API_KEY = os.getenv("LLM_API_KEY")
+    FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "200"))  # Time to first token
+    FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "200"))
+    FAKE_LLM_RESPONSE_TOKENS = int(os.getenv("FAKE_LLM_RESPONSE_TOKENS", "128"))
+
+    # Model cascade: lookups go to a fast model, summaries and synthesis to a large one (same model = no routing)
+    FAST_MODEL_NAME = os.getenv("FAST_MODEL_NAME", GROQ_MODEL_NAME)
+    LARGE_MODEL_NAME = os.getenv("LARGE_MODEL_NAME", GROQ_MODEL_NAME)  # e.g. llama-3.3-70b-versatile
+    CASCADE_FAST_MAX_QUESTION_WORDS = int(os.getenv("CASCADE_FAST_MAX_QUESTION_WORDS", "25"))  # Longer questions go to the large model
+    CASCADE_FAST_MAX_CONTEXT_TOKENS = int(os.getenv("CASCADE_FAST_MAX_CONTEXT_TOKENS", "3000"))  # Larger contexts (chunks + history) go to the large model
+    CASCADE_ESCALATION = os.getenv("CASCADE_ESCALATION", "true").lower() == "true"  # Re-ask the large model when a fast answer fails the self-check
+    FAST_MODEL_COST_PER_MTOK = float(os.getenv("FAST_MODEL_COST_PER_MTOK", "0.08"))  # USD per million tokens, for rag_llm_cost_usd_total
+    LARGE_MODEL_COST_PER_MTOK = float(os.getenv("LARGE_MODEL_COST_PER_MTOK", "0.79"))
+
     # Temperature settings for different use cases
     QA_TEMPERATURE = float(os.getenv("QA_TEMPERATURE", "0.2"))  # Lower for factual Q&A
     SUMMARIZATION_TEMPERATURE = float(os.getenv("SUMMARIZATION_TEMPERATURE", "0.1"))  # Lowest for summaries
     CREATIVE_TEMPERATURE = float(os.getenv("CREATIVE_TEMPERATURE", "0.5"))  # Higher for creative tasks
-    
+
     # Backward compatibility: TEMPERATURE defaults to QA_TEMPERATURE
     TEMPERATURE = QA_TEMPERATURE
-    
+
     # Embedding Configuration
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-    
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))  # Chunks per embedding call during ingestion
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")  # "torch" (sentence-transformers) or "onnx" (onnxruntime)
+    ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "data/onnx")  # Exports go to ONNX_MODEL_DIR/<model name>
+    ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", "")  # Explicit export directory, overrides ONNX_MODEL_DIR
+    ONNX_QUANTIZED = os.getenv("ONNX_QUANTIZED", "false").lower() == "true"  # Use the int8 export
+    ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))  # onnxruntime intra-op threads (0 = runtime default)
+
     # Text Processing
+    PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "auto")  # "auto" (pypdfium2 if installed), "pypdfium2", "pdfminer" or "pypdf2"; falls back to PyPDF2 per file
+    EXTRACTION_ISOLATION = os.getenv("EXTRACTION_ISOLATION", "true").lower() == "true"  # Extract in a killable worker process
+    EXTRACTION_PAGE_TIMEOUT = float(os.getenv("EXTRACTION_PAGE_TIMEOUT", "30"))  # Seconds before a page is skipped
+    EXTRACTION_FILE_TIMEOUT = float(os.getenv("EXTRACTION_FILE_TIMEOUT", "300"))  # Seconds before the rest of a file is skipped
+    EXTRACTION_MEMORY_MB = int(os.getenv("EXTRACTION_MEMORY_MB", "2048"))  # Address-space limit of the worker (0 = none)
+    PROGRESSIVE_INGESTION = os.getenv("PROGRESSIVE_INGESTION", "true").lower() == "true"  # Index first pages first, the rest in the background
+    PROGRESSIVE_FIRST_PAGES = int(os.getenv("PROGRESSIVE_FIRST_PAGES", "2"))  # Pages per paper indexed before the chat unlocks
+    UPLOAD_DIR = os.getenv("UPLOAD_DIR", "data/uploads")  # Uploads and downloads staged on disk by content hash
+    UPLOAD_RETENTION_HOURS = float(os.getenv("UPLOAD_RETENTION_HOURS", "24"))  # Staged files unused this long are deleted (0 = keep)
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "2000"))
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+    TEXT_NORMALIZATION = os.getenv("TEXT_NORMALIZATION", "true").lower() == "true"  # De-hyphenate, fold ligatures, drop headers/footers
+    CHUNKING_STRATEGY = os.getenv("CHUNKING_STRATEGY", "sections")  # "sections" (headings + sentences) or "recursive" (CHUNK_SIZE characters)
+    CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "500"))  # Token budget per chunk for the sections strategy
+    CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))  # Only between chunks of the same section
+    CHUNK_MIN_TOKENS = int(os.getenv("CHUNK_MIN_TOKENS", "40"))  # Smaller chunks are merged into their neighbour
+    SKIP_REFERENCES = os.getenv("SKIP_REFERENCES", "false").lower() == "true"  # Leave the bibliography out of the index
     SIMILARITY_SEARCH_K = int(os.getenv("SIMILARITY_SEARCH_K", "3"))  # Increased for better context
-    
+    QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))  # Cached query vectors (0 disables)
+    QUERY_BATCH_WINDOW_MS = float(os.getenv("QUERY_BATCH_WINDOW_MS", "5"))  # Wait this long to batch queries across sessions (0 disables)
+    QUERY_BATCH_MAX_SIZE = int(os.getenv("QUERY_BATCH_MAX_SIZE", "32"))
+
+    # Confidence gate: skip the LLM when no retrieved chunk is close to the question
+    RETRIEVAL_MIN_SIMILARITY = float(os.getenv("RETRIEVAL_MIN_SIMILARITY", "0"))  # Cosine similarity the best chunk needs (0 disables); calibrate with benchmarks/calibrate_gate.py
+    LOW_CONFIDENCE_MODEL = os.getenv("LOW_CONFIDENCE_MODEL", "")  # Cheaper model that answers below the threshold (empty = templated reply, no LLM call)
+
+    # Two-stage retrieval: route each query to its closest papers, then search only their chunks
+    ROUTING_TOP_DOCUMENTS = int(os.getenv("ROUTING_TOP_DOCUMENTS", "10"))  # 0 disables routing
+    ROUTING_MIN_DOCUMENTS = int(os.getenv("ROUTING_MIN_DOCUMENTS", "200"))  # Route only libraries at least this large
+    ROUTING_DOCUMENT_VECTOR = os.getenv("ROUTING_DOCUMENT_VECTOR", "mean")  # "mean" of all chunks or "abstract" chunks
+
+    # Batch querying
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))  # Parallel LLM calls per batch
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))  # Retries after a rate-limit (429) response
+    LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "2.0"))  # Seconds, backoff ceiling doubles each retry
+
+    # Shared LLM rate limits per process (0 disables a limit) - match these to your Groq plan
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+    LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "512"))  # Reserved per request
+
     # Paths
-    FAISS_INDEX_PATH = "data/faiss_index"
+    FAISS_INDEX_PATH = os.getenv("FAISS_INDEX_PATH", "data/faiss_index")
+    INDEX_SHARDS = int(os.getenv("INDEX_SHARDS", "1"))  # >1 splits the index across that many local worker processes
+
+    # Shared resource server: one process per node holds the embedding model and index for all app replicas
+    RESOURCE_SERVER_SOCKET = os.getenv("RESOURCE_SERVER_SOCKET", "")  # Unix socket path; empty loads everything in-process
+    RESOURCE_SERVER_AUTHKEY = os.getenv("RESOURCE_SERVER_AUTHKEY", "")  # Empty uses a key file created next to the socket
+    RESOURCE_SERVER_CONNECTIONS = int(os.getenv("RESOURCE_SERVER_CONNECTIONS", "8"))  # Pooled connections per client process
+
+    # HTTP API (python -m src.api_server)
+    API_HOST = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT = int(os.getenv("API_PORT", "8000"))
+    API_WORKERS = int(os.getenv("API_WORKERS", "8"))  # Requests handled concurrently
+    API_MAX_QUEUE = int(os.getenv("API_MAX_QUEUE", "64"))  # Requests waiting for a worker; more get 503
+    API_MAX_UPLOAD_MB = int(os.getenv("API_MAX_UPLOAD_MB", "50"))  # Largest request body (PDF uploads)
+
+    # Observability: serve Prometheus metrics on this port (0 disables)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+    # Profiling: "cprofile" or "sampling" profiles every request (in admin mode, also ?profile=<mode> per request)
+    PROFILING_MODE = os.getenv("PROFILING_MODE", "")
+    PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+    PROFILE_RETENTION_HOURS = float(os.getenv("PROFILE_RETENTION_HOURS", "168"))  # Profiles older than this are deleted (0 = keep)
+    ADMIN_MODE = os.getenv("ADMIN_MODE", "false").lower() == "true"  # Profiles panel and ?profile= for every visitor
+
+    # Chat UI
+    CHAT_HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "20"))  # Turns rendered before "Show earlier messages"
+
+    # Precomputed per-paper insights
+    SUMMARY_DIR = os.getenv("SUMMARY_DIR", "data/summaries")  # Stored summaries and keyword facets
+    PRECOMPUTE_SUMMARIES = os.getenv("PRECOMPUTE_SUMMARIES", "false").lower() == "true"  # Summarize each paper after ingestion (one LLM call per paper, at background priority)
+    SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "1"))  # Background summary jobs run concurrently
+    KEYWORDS_PER_DOCUMENT = int(os.getenv("KEYWORDS_PER_DOCUMENT", "8"))  # TF-IDF keywords kept per paper
 
 # System Configuration
 SYSTEM_CONFIG = {
@@ -91,7 +183,7 @@ PROMPT_TEMPLATES = {
 
     **Your Professional Response:**
     """,
-    
+
     "summarization_template": """
     You are a world-class Research Paper Analyst and Academic Summarizer with expertise in distilling complex scholarly work into comprehensive, well-structured summaries. Your summaries are used by researchers, academics, and students to quickly understand the essence and contributions of scientific papers.
 
@@ -169,7 +261,7 @@ PROMPT_TEMPLATES = {
 
     ---
 
-    **Professional Note:** 
+    **Professional Note:**
     - If any section cannot be completed due to insufficient information in the provided context, clearly indicate: "Information not available in the provided content."
     - Maintain academic rigor and precision throughout the summary
     - Use professional terminology appropriate to the research domain
@@ -179,5 +271,12 @@ PROMPT_TEMPLATES = {
     {context}
 
     **Generate Your Professional Research Summary:**
-    """
+    """,
+
+    # Returned without an LLM call when retrieval finds nothing close to the question
+    "low_confidence_response": (
+        "This information is not available in the provided research papers. "
+        "None of the indexed passages is closely related to your question; "
+        "try rephrasing it with terms used in the papers, or select different papers in Search Scope."
+    )
 }
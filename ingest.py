@@ -0,0 +1,310 @@
+"""Build or update an index from the command line, without the Streamlit UI.
+
+Files are hashed and extracted in parallel worker processes while the main process
+embeds the previous batch. The index and its ingestion ledger are checkpointed by a
+background thread every --checkpoint-interval seconds and after the last batch, so an
+interrupted run resumes from the last checkpoint when started again.
+
+Usage:
+    python ingest.py papers/ --index neurips
+    python ingest.py --urls urls.txt --index arxiv --workers 8 --batch-size 128
+    python ingest.py papers/ --summaries    # also write every paper's summary before exiting
+    python ingest.py papers/ --checkpoint-interval 0    # save after every batch
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import shutil
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Tuple, Optional
+from urllib.parse import urlparse
+from config.settings import Config
+
+def resolve_index_path(index: Optional[str]) -> str:
+    """A bare name is an index next to FAISS_INDEX_PATH; anything with a slash is a path"""
+    if not index:
+        return Config.FAISS_INDEX_PATH
+    if os.sep in index or "/" in index:
+        return index
+    return os.path.join(os.path.dirname(Config.FAISS_INDEX_PATH) or ".", index)
+
+def collect_pdfs(paths: List[str]) -> List[str]:
+    """PDF files under the given files and directories, in a stable order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names if name.lower().endswith(".pdf"))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"Skipping {path}: not found", file=sys.stderr)
+    return sorted(set(files))
+
+# URL -> file name of every download in a download directory
+DOWNLOAD_MAP_FILE = "downloads.json"
+
+def _download_name(url: str) -> str:
+    """A file name unique to the URL (many URLs end in ".../pdf" or "paper.pdf")"""
+    name = urlparse(url).path.rstrip("/").rsplit("/", 1)[-1] or "download"
+    name = name if name.lower().endswith(".pdf") else name + ".pdf"
+    return f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}-{name}"
+
+def download_urls(url_file: str, download_dir: str, workers: int = 8) -> List[str]:
+    """Download every URL listed in url_file (one per line) once, reusing earlier downloads"""
+    from utils.file_utils import download_pdf_from_url
+
+    with open(url_file, "r", encoding="utf-8") as f:
+        urls = list(dict.fromkeys(line.strip() for line in f if line.strip() and not line.startswith("#")))
+    os.makedirs(download_dir, exist_ok=True)
+    map_path = os.path.join(download_dir, DOWNLOAD_MAP_FILE)
+    downloads: Dict[str, str] = {}
+    if os.path.exists(map_path):
+        with open(map_path, "r", encoding="utf-8") as f:
+            downloads = json.load(f)
+
+    def fetch(url: str) -> Optional[str]:
+        if url in downloads and os.path.exists(os.path.join(download_dir, downloads[url])):
+            return downloads[url]
+        tmp_path = download_pdf_from_url(url)
+        if tmp_path is None:
+            print(f"Failed to download {url}", file=sys.stderr)
+            return None
+        # Moved under a temporary name first, so an interrupted copy is never reused
+        name = _download_name(url)
+        shutil.move(tmp_path, os.path.join(download_dir, name + ".part"))
+        os.replace(os.path.join(download_dir, name + ".part"), os.path.join(download_dir, name))
+        return name
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        names = list(executor.map(fetch, urls))
+    downloads.update({url: name for url, name in zip(urls, names) if name})
+    with open(map_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(downloads, f, indent=1)
+    os.replace(map_path + ".tmp", map_path)
+    return [os.path.join(download_dir, name) for name in names if name]
+
+def _hash_file(path: str) -> str:
+    from src.pdf_processor import file_sha256
+    with open(path, "rb") as pdf:
+        return file_sha256(pdf)
+
+def _extract_file(path: str, sha256: str, source: str, metadata: Dict) -> Tuple[List[str], List[Dict], Dict[str, List[str]]]:
+    """Extract and chunk one PDF in a worker process; also returns its extraction problems"""
+    from src.pdf_processor import pdf_processor
+    from src.upload_staging import StagedPDF
+    errors: Dict[str, List[str]] = {}
+    try:
+        with StagedPDF(path, os.path.basename(source), sha256) as pdf:
+            return (*pdf_processor.process_documents([pdf], [metadata], errors=errors), errors)
+    except Exception as e:
+        errors.setdefault(os.path.basename(source), []).append(f"Failed to process {path}: {e}")
+        return [], [], errors
+
+def _new_checkpoint() -> Dict[str, List]:
+    return {"sources": [], "shas": [], "text_chunks": [], "metadatas": [], "origins": [], "vectors": []}
+
+def ingest(
+    files: List[str],
+    index_path: str,
+    workers: int,
+    batch_size: int,
+    summaries: bool = False,
+    checkpoint_interval: float = 300.0
+) -> Dict:
+    """Ingest files into the index at index_path batch by batch; returns counts and timings
+
+    Embedded batches are committed together every checkpoint_interval seconds (0: after every
+    batch), since each save rewrites the whole index. Saves run in a writer thread while the next
+    batches are embedded; only one is in flight at a time.
+    """
+    from src.ingest_ledger import (
+        IngestLedger, ingest_lock, commit_documents, skipped_pages, recoverable_documents, origins_of
+    )
+    from src.vector_store import VectorStoreManager
+    from src.document_insights import InsightScheduler
+
+    manager = VectorStoreManager(index_path=index_path)
+    ledger = IngestLedger(index_path)
+    stats = {
+        "files": len(files), "documents": 0, "skipped": 0, "replaced": 0, "failed": [], "chunks": 0, "bytes": 0, "skipped_pages": {},
+        "errors": {},
+        "rebuilt": ledger.stale, "recovered": 0, "dropped": [],
+        "checkpoints": 0, "hash_s": 0.0, "extract_wait_s": 0.0, "embed_s": 0.0, "write_s": 0.0, "write_wait_s": 0.0,
+        "insights_s": 0.0,
+    }
+    started = time.perf_counter()
+
+    def checkpoint(batch: Dict[str, List]) -> Tuple[int, int, List[str], float]:
+        """Commit the accumulated batches; runs in the writer thread"""
+        write_started = time.perf_counter()
+        # The app may write the same index meanwhile, so the ledger is reloaded under the lock
+        with ingest_lock(index_path):
+            replaced, failed = commit_documents(
+                IngestLedger(index_path), manager, batch["sources"], batch["shas"], batch["text_chunks"],
+                batch["metadatas"], origins=batch["origins"], vectors=batch["vectors"]
+            )
+        return len(batch["shas"]), replaced, failed, time.perf_counter() - write_started
+
+    def finish_checkpoint(future):
+        wait_started = time.perf_counter()
+        committed, replaced, failed, write_s = future.result()
+        stats["write_wait_s"] += time.perf_counter() - wait_started
+        stats["write_s"] += write_s
+        stats["checkpoints"] += 1
+        stats["replaced"] += replaced
+        stats["failed"].extend(failed)
+        stats["documents"] += committed - len(failed)
+
+    # path -> (ledger source, metadata); the absolute path identifies a file, so a changed file replaces its old version
+    documents = {path: (os.path.normpath(path), {"origin": os.path.abspath(path)}) for path in files}
+    if ledger.stale:
+        # The index is rebuilt with the new settings, so the papers already in it are ingested again too
+        recoverable, stats["dropped"] = recoverable_documents(manager)
+        for path, _, source, metadata in recoverable:
+            documents.setdefault(path, (source, metadata))
+        stats["recovered"] = len(recoverable)
+        files = list(documents)
+        stats["files"] = len(files)
+
+    # Spawned, not forked: the main process loads the embedding model while workers are still starting
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool, \
+            ThreadPoolExecutor(max_workers=1) as writer:
+        shas = list(pool.map(_hash_file, files, chunksize=16))
+        stats["hash_s"] = time.perf_counter() - started
+
+        pending, seen = [], set()
+        for path, sha256 in zip(files, shas):
+            if sha256 in ledger or sha256 in seen:
+                stats["skipped"] += 1
+                continue
+            seen.add(sha256)
+            pending.append((path, sha256))
+        print(f"{len(files)} files, {stats['skipped']} already indexed, {len(pending)} to ingest into {index_path}")
+
+        batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        # Extraction of the next batch overlaps with embedding the current one
+        uncommitted, writing, last_checkpoint, processed = _new_checkpoint(), None, time.perf_counter(), 0
+        next_futures = [pool.submit(_extract_file, path, sha256, *documents[path]) for path, sha256 in batches[0]] if batches else []
+        for number, batch in enumerate(batches):
+            futures = next_futures
+            next_futures = [
+                pool.submit(_extract_file, path, sha256, *documents[path]) for path, sha256 in batches[number + 1]
+            ] if number + 1 < len(batches) else []
+
+            wait_started = time.perf_counter()
+            results = [future.result() for future in futures]
+            stats["extract_wait_s"] += time.perf_counter() - wait_started
+
+            text_chunks = [chunk for chunks, _, _ in results for chunk in chunks]
+            metadatas = [metadata for _, doc_metadatas, _ in results for metadata in doc_metadatas]
+            for _, _, errors in results:
+                stats["errors"].update(errors)
+            sources = [documents[path][0] for path, _ in batch]
+            origins = origins_of([documents[path][1] for path, _ in batch])
+
+            embed_started = time.perf_counter()
+            vectors = manager.embed_chunks(text_chunks) if text_chunks else []
+            stats["embed_s"] += time.perf_counter() - embed_started
+
+            uncommitted["sources"].extend(sources)
+            uncommitted["shas"].extend(sha256 for _, sha256 in batch)
+            uncommitted["text_chunks"].extend(text_chunks)
+            uncommitted["metadatas"].extend(metadatas)
+            uncommitted["origins"].extend(origins)
+            uncommitted["vectors"].extend(vectors)
+            if number + 1 == len(batches) or time.perf_counter() - last_checkpoint >= checkpoint_interval:
+                if writing is not None:
+                    finish_checkpoint(writing)
+                writing = writer.submit(checkpoint, uncommitted)
+                uncommitted, last_checkpoint = _new_checkpoint(), time.perf_counter()
+
+            stats["chunks"] += len(text_chunks)
+            stats["skipped_pages"].update(skipped_pages(metadatas))
+            stats["bytes"] += sum(os.path.getsize(path) for path, _ in batch)
+            processed += len(batch)
+            elapsed = time.perf_counter() - started
+            print(
+                f"[batch {number + 1}/{len(batches)}] {processed}/{len(pending)} documents, "
+                f"{stats['chunks']} chunks, {processed / elapsed:.1f} docs/s"
+            )
+        if writing is not None:
+            finish_checkpoint(writing)
+
+    # Keywords are corpus-wide, so they are computed once after the last batch
+    insights_started = time.perf_counter()
+    doc_ids = [document["doc_id"] for document in manager.list_documents()]
+    jobs = InsightScheduler(manager).schedule(doc_ids, summaries=summaries)
+    if summaries:
+        print(f"Summarizing {len(jobs) - 1} papers")
+    failed = sum(1 for job in jobs if job.exception() is not None)
+    if failed:
+        print(f"{failed} summary/keyword jobs failed; run again to retry", file=sys.stderr)
+    stats["insights_s"] = time.perf_counter() - insights_started
+
+    stats["elapsed_s"] = time.perf_counter() - started
+    return stats
+
+def print_stats(stats: Dict):
+    elapsed = max(stats["elapsed_s"], 1e-9)
+    print(f"\nIngested {stats['documents']} documents ({stats['chunks']} chunks) in {elapsed:.1f}s")
+    print(f"  skipped (already indexed): {stats['skipped']}, replaced: {stats['replaced']}, failed: {len(stats['failed'])}")
+    if stats["failed"]:
+        print(f"  no text extracted, not recorded (run again to retry): {', '.join(stats['failed'])}", file=sys.stderr)
+    if stats["rebuilt"]:
+        print(f"  index rebuilt: ingestion settings changed or no ledger was found; {stats['recovered']} indexed papers processed again")
+    if stats["dropped"]:
+        print(f"  dropped from the rebuilt index (file no longer available): {', '.join(stats['dropped'])}", file=sys.stderr)
+    for source, pages in sorted(stats["skipped_pages"].items()):
+        print(f"  pages skipped in {source}: {', '.join(str(page) for page in pages)}")
+    for source, errors in sorted(stats["errors"].items()):
+        for error in errors:
+            print(f"  {source}: {error}", file=sys.stderr)
+    print(
+        f"  throughput: {stats['documents'] / elapsed:.2f} docs/s, {stats['chunks'] / elapsed:.1f} chunks/s, "
+        f"{stats['bytes'] / elapsed / 1e6:.2f} MB/s"
+    )
+    print(
+        f"  time: hashing {stats['hash_s']:.1f}s, waiting for extraction {stats['extract_wait_s']:.1f}s, "
+        f"embedding {stats['embed_s']:.1f}s, keywords/summaries {stats['insights_s']:.1f}s"
+    )
+    print(
+        f"  index writes: {stats['checkpoints']} checkpoints, {stats['write_s']:.1f}s in the background, "
+        f"{stats['write_wait_s']:.1f}s waited for"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest PDFs into an index without the web UI")
+    parser.add_argument("paths", nargs="*", help="PDF files or directories (searched recursively)")
+    parser.add_argument("--urls", help="File with one PDF URL per line")
+    parser.add_argument("--index", help="Index name (created next to FAISS_INDEX_PATH) or path (default: FAISS_INDEX_PATH)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction worker processes")
+    parser.add_argument("--batch-size", type=int, default=64, help="Files extracted and embedded together")
+    parser.add_argument(
+        "--checkpoint-interval", type=float, default=300.0,
+        help="Seconds between index saves (0: after every batch); an interrupted run resumes from the last save"
+    )
+    parser.add_argument("--download-dir", default="data/downloads", help="Where downloaded PDFs are kept")
+    parser.add_argument("--summaries", action="store_true", help="Also precompute each paper's summary (calls the LLM)")
+    args = parser.parse_args()
+    if not args.paths and not args.urls:
+        parser.error("Give PDF files/directories or --urls")
+
+    files = collect_pdfs(args.paths)
+    if args.urls:
+        files.extend(download_urls(args.urls, args.download_dir))
+    if not files:
+        print("No PDF files found", file=sys.stderr)
+        sys.exit(1)
+
+    print_stats(ingest(
+        files, resolve_index_path(args.index), max(1, args.workers), max(1, args.batch_size), args.summaries,
+        max(0.0, args.checkpoint_interval)
+    ))
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@ import os
 from dotenv import load_dotenv
 from src.ui_components import setup_page_config, render_sidebar, render_chat_interface
 from src.pdf_processor import process_pdfs
-from config.settings import UI_CONFIG
+from config.settings import Config, UI_CONFIG
+from src.metrics import start_metrics_server
 
 # Load environment variables
 load_dotenv()
@@ -13,11 +14,15 @@ def main():
     # Setup page configuration
     setup_page_config()
     
+    # Expose Prometheus metrics (started once per process)
+    if Config.METRICS_PORT:
+        start_metrics_server(Config.METRICS_PORT)
+    
     # Render sidebar for PDF upload/processing
     pdf_docs = render_sidebar()
     
     # Check if FAISS index exists
-    index_exists = os.path.exists("data/faiss_index")
+    index_exists = os.path.exists(Config.FAISS_INDEX_PATH)
     
     # Render main chat interface
     render_chat_interface(index_exists)
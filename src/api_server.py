@@ -0,0 +1,301 @@
+# HTTP query API: the same index, embedding model and chains as the Streamlit app, held
+# resident across requests and served by a bounded pool of worker threads.
+#     python -m src.api_server --port 8000 --workers 8
+# POST /search, /ask (server-sent events), /summarize, /ingest; GET /health, /metrics
+import io
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse, parse_qs
+from config.settings import Config
+from src.metrics import metrics
+from src.vector_store import vector_store_manager
+from src.chat_handler import chat_handler
+from src.event_loop import background_loop
+
+# Largest k a /search request may ask for
+MAX_SEARCH_K = 100
+# Filters understood by VectorStoreManager.resolve_filters
+FILTER_KEYS = ("doc_ids", "authors", "categories", "years", "keywords")
+
+class ApiError(Exception):
+    """An error reported to the client with an HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def _serialize_documents(scored: List) -> List[Dict[str, Any]]:
+    return [{"text": doc.page_content, "metadata": doc.metadata, "score": score} for doc, score in scored]
+
+def _validate_k(k: Any) -> Optional[int]:
+    """k from a request body; anything but an integer in range would fail inside FAISS with a 500"""
+    # bool is an int subclass
+    if k is not None and (not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= MAX_SEARCH_K):
+        raise ApiError(400, f"'k' must be an integer from 1 to {MAX_SEARCH_K}")
+    return k
+
+def _validate_filters(filters: Any) -> Optional[Dict]:
+    """filters from a request body: an object mapping FILTER_KEYS to lists of strings (or integer years)"""
+    if filters is None:
+        return None
+    if not isinstance(filters, dict):
+        raise ApiError(400, "'filters' must be an object")
+    for key, values in filters.items():
+        if key not in FILTER_KEYS:
+            raise ApiError(400, f"Unknown filter '{key}'; use {', '.join(FILTER_KEYS)}")
+        allowed = (str, int) if key == "years" else (str,)
+        if values is not None and (
+            not isinstance(values, list) or not all(isinstance(v, allowed) and not isinstance(v, bool) for v in values)
+        ):
+            raise ApiError(400, f"Filter '{key}' must be a list of {'years' if key == 'years' else 'strings'}")
+    return filters
+
+def _validate_chat_history(chat_history: Any) -> List[Dict[str, str]]:
+    """chat_history from a request body: a list of {"user": str, "assistant": str} turns"""
+    if chat_history is None:
+        return []
+    if not isinstance(chat_history, list) or not all(
+        isinstance(turn, dict) and isinstance(turn.get("user"), str) and isinstance(turn.get("assistant"), str)
+        for turn in chat_history
+    ):
+        raise ApiError(400, "'chat_history' must be a list of {\"user\": str, \"assistant\": str} objects")
+    return chat_history
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    server_version = "ResearchRAG/1.0"
+    # HTTP/1.0: every request closes its connection, so idle keep-alives never hold a worker
+
+    def do_GET(self):
+        self._dispatch({"/health": self.health, "/metrics": self.prometheus_metrics})
+
+    def do_POST(self):
+        self._dispatch({"/search": self.search, "/ask": self.ask, "/summarize": self.summarize, "/ingest": self.ingest})
+
+    def _dispatch(self, routes: Dict[str, Any]):
+        url = urlparse(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.status = 200
+        self.streaming = False
+        endpoint = url.path if url.path in routes else "unknown"
+        started = time.perf_counter()
+        try:
+            route = routes.get(url.path)
+            if route is None:
+                raise ApiError(404, f"Unknown endpoint: {self.command} {url.path}")
+            route()
+        except ApiError as e:
+            self._send_error(e.status, str(e))
+        except FileNotFoundError as e:
+            self._send_error(404, str(e))
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away (e.g. closed an event stream early)
+            self.status = 499
+        except Exception as e:
+            self._send_error(500, f"{type(e).__name__}: {e}")
+        finally:
+            metrics.inc("rag_http_requests_total", endpoint=endpoint, status=self.status)
+            metrics.observe("rag_http_request_duration_seconds", time.perf_counter() - started, endpoint=endpoint)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > Config.API_MAX_UPLOAD_MB * 1024 * 1024:
+            raise ApiError(413, f"Request body larger than {Config.API_MAX_UPLOAD_MB} MB")
+        return self.rfile.read(length) if length else b""
+
+    def _read_json(self) -> Dict:
+        body = self._read_body()
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError as e:
+            raise ApiError(400, f"Invalid JSON body: {e}")
+        if not isinstance(data, dict):
+            raise ApiError(400, "The JSON body must be an object")
+        return data
+
+    def _send_error(self, status: int, message: str):
+        if self.streaming:
+            # Headers are already out; report the failure as the last event of the stream
+            self.status = status
+            self.wfile.write(f"event: error\ndata: {json.dumps({'error': message})}\n\n".encode("utf-8"))
+            return
+        self._send_json({"error": message}, status)
+
+    def _send_json(self, payload: Any, status: int = 200):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.status = status
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def health(self):
+        self._send_json({
+            "status": "ok",
+            "documents": len(vector_store_manager.list_documents()),
+            "llm_backend": chat_handler.backend,
+            "workers": self.server.workers,
+        })
+
+    def prometheus_metrics(self):
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def search(self):
+        """{"query": str} or {"queries": [str]}, with optional k and filters"""
+        data = self._read_json()
+        k, filters = _validate_k(data.get("k")), _validate_filters(data.get("filters"))
+        if isinstance(data.get("queries"), list) and all(isinstance(query, str) for query in data["queries"]):
+            scored_per_query = vector_store_manager.batch_similarity_search_with_scores(data["queries"], k, filters)
+            self._send_json({"results": [_serialize_documents(scored) for scored in scored_per_query]})
+        elif isinstance(data.get("query"), str):
+            self._send_json({"results": _serialize_documents(vector_store_manager.similarity_search_with_scores(data["query"], k, filters))})
+        else:
+            raise ApiError(400, "Give a 'query' string or a 'queries' list of strings")
+
+    def ask(self):
+        """{"question": str, "chat_history": [...], "filters": {...}, "stream": true}
+
+        Streams the answer as server-sent events ("data: {"token": ...}" then "event: done"),
+        or returns {"answer": ...} with "stream": false.
+        """
+        data = self._read_json()
+        question = data.get("question")
+        if not isinstance(question, str) or not question.strip():
+            raise ApiError(400, "Give a non-empty 'question'")
+        # Checked before the stream opens: afterwards an error can only be reported as an event
+        chat_history, filters = _validate_chat_history(data.get("chat_history")), _validate_filters(data.get("filters"))
+
+        if not data.get("stream", True):
+            self._send_json({"answer": chat_handler.handle_user_query(question, chat_history, filters)})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.streaming = True
+        self._stream_answer(question, chat_history, filters)
+
+    def _stream_answer(self, question: str, chat_history: List[Dict[str, str]], filters: Optional[Dict]):
+        # On the process-wide loop the pooled async LLM clients are bound to, not a loop per request
+        stream = background_loop.iterate(chat_handler.astream_user_query(question, chat_history, filters))
+        try:
+            for token in stream:
+                self.wfile.write(f"data: {json.dumps({'token': token})}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"event: done\ndata: {}\n\n")
+            self.wfile.flush()
+        finally:
+            stream.close()
+
+    def summarize(self):
+        self._read_body()
+        self._send_json({"summary": chat_handler.summarize_research_papers()})
+
+    def ingest(self):
+        """A PDF as the request body (Content-Type: application/pdf), named by ?filename=
+
+        ?origin= (e.g. the paper's URL) identifies the document: a later upload with the same
+        origin and different contents replaces it. Without one, uploads never replace each other.
+        """
+        from src.ingest_ledger import ingest_documents
+        from src.upload_staging import upload_staging
+
+        if self.headers.get("Content-Type", "").split(";")[0].strip() != "application/pdf":
+            raise ApiError(415, "Send the PDF as the request body with Content-Type: application/pdf")
+        body = self._read_body()
+        if not body.startswith(b"%PDF"):
+            raise ApiError(400, "The request body is not a PDF file")
+        metadata = {key: self.query[key] for key in ("title", "authors", "year", "categories", "origin") if key in self.query}
+        # Staged on disk, so the extraction worker reads the file instead of receiving the body over a pipe
+        with upload_staging.stage_file(io.BytesIO(body), self.query.get("filename") or "upload.pdf") as pdf:
+            stats = ingest_documents([pdf], [metadata])
+        self._send_json(stats)
+
+    def log_message(self, format, *args):
+        pass
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that handles requests on a fixed pool of worker threads
+
+    At most max_queue requests wait for a worker; beyond that, new connections
+    get an immediate 503 instead of piling up.
+    """
+
+    def __init__(self, address, handler_class, workers: int, max_queue: int):
+        super().__init__(address, handler_class)
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            metrics.inc("rag_http_requests_total", endpoint="rejected", status=503)
+            body = b'{"error": "Server busy, retry later"}'
+            try:
+                request.sendall(
+                    b"HTTP/1.0 503 Service Unavailable\r\nContent-Type: application/json\r\nRetry-After: 1\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+                )
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False)
+
+def create_server(host: str = None, port: int = None, workers: int = None, max_queue: int = None) -> PooledHTTPServer:
+    """Load the index and embedding model, then bind the API server"""
+    vector_store_manager.embeddings.embed_query("warm up")
+    try:
+        vector_store_manager.load_vector_store()
+    except FileNotFoundError:
+        pass
+    return PooledHTTPServer(
+        (host or Config.API_HOST, Config.API_PORT if port is None else port),
+        ApiRequestHandler,
+        max(1, workers or Config.API_WORKERS),
+        max(0, Config.API_MAX_QUEUE if max_queue is None else max_queue)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve search, ask, summarize and ingest over HTTP")
+    parser.add_argument("--host", default=Config.API_HOST)
+    parser.add_argument("--port", type=int, default=Config.API_PORT)
+    parser.add_argument("--workers", type=int, default=Config.API_WORKERS, help="Requests handled concurrently")
+    parser.add_argument("--max-queue", type=int, default=Config.API_MAX_QUEUE, help="Requests waiting for a worker before 503s")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.workers, args.max_queue)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} with {server.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,60 @@
 import os
+import asyncio
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.prompts import PromptTemplate
-from langchain_groq import ChatGroq
-from typing import List, Dict
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableLambda
+from typing import List, Dict, Optional, AsyncIterator, Tuple, Any
 from config.settings import Config, PROMPT_TEMPLATES
-from src.vector_store import vector_store_manager
+from src.vector_store import vector_store_manager, VectorStoreManager
+from src.document_insights import SUMMARY_QUERY, insight_scheduler, stored_summaries
+from src.llm_backends import get_chat_model
+from src.metrics import metrics
+from src.model_cascade import model_cascade, FAST, LARGE
+from src.rate_limiter import (
+    rate_limiter, retry_with_backoff, aretry_with_backoff, is_rate_limit_error, retry_delay,
+    INTERACTIVE, BACKGROUND
+)
+from utils.text_utils import estimate_tokens
 
-class ChatHandler:
+class TokenUsageCallback(BaseCallbackHandler):
+    """Collect provider-reported token usage from LLM calls"""
+    
     def __init__(self):
+        self.total_tokens = 0
+    
+    def on_llm_end(self, response, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        self.total_tokens += usage.get("total_tokens", 0)
+
+class ChatHandler:
+    def __init__(self, backend: Optional[str] = None):
         self.config = Config()
-        self.chain = self._create_conversational_chain()
-        self.summarization_chain = self._create_summarization_chain()
-    
-    def _create_conversational_chain(self):
-        """Build QA chain with Groq LLM"""
-        llm = ChatGroq(
-            groq_api_key=self.config.GROQ_API_KEY,
-            model_name=self.config.GROQ_MODEL_NAME,
-            temperature=self.config.QA_TEMPERATURE,
+        self.backend = backend or self.config.LLM_BACKEND
+        # Chains per prompt kind and model tier (tiers share a chain when they use the same model)
+        self.chains = {
+            "qa": self._tier_chains(self._create_conversational_chain),
+            "summarization": self._tier_chains(self._create_summarization_chain),
+        }
+        self.chain = self.chains["qa"][LARGE]
+        self.summarization_chain = self.chains["summarization"][LARGE]
+        # Answers questions whose retrieval falls below the confidence gate, if configured
+        self.low_confidence_chain = (
+            self._create_conversational_chain(self.config.LOW_CONFIDENCE_MODEL) if self.config.LOW_CONFIDENCE_MODEL else None
+        )
+    
+    def _tier_chains(self, create_chain) -> Dict[str, Any]:
+        """One chain per model tier, built once per distinct model"""
+        by_model = {}
+        for model_name in model_cascade.models.values():
+            if model_name not in by_model:
+                by_model[model_name] = create_chain(model_name)
+        return {tier: by_model[model_name] for tier, model_name in model_cascade.models.items()}
+    
+    def _create_conversational_chain(self, model_name: Optional[str] = None):
+        """Build QA chain with the configured LLM backend"""
+        llm = get_chat_model(model_name or self.config.GROQ_MODEL_NAME, self.backend).bind(
+            temperature=self.config.QA_TEMPERATURE
         )
         
         prompt = PromptTemplate(
@@ -27,12 +64,10 @@ class ChatHandler:
         
         return create_stuff_documents_chain(llm=llm, prompt=prompt)
     
-    def _create_summarization_chain(self):
-        """Build summarization chain with Groq LLM"""
-        llm = ChatGroq(
-            groq_api_key=self.config.GROQ_API_KEY,
-            model_name=self.config.GROQ_MODEL_NAME,
-            temperature=self.config.SUMMARIZATION_TEMPERATURE,
+    def _create_summarization_chain(self, model_name: Optional[str] = None):
+        """Build summarization chain with the configured LLM backend"""
+        llm = get_chat_model(model_name or self.config.GROQ_MODEL_NAME, self.backend).bind(
+            temperature=self.config.SUMMARIZATION_TEMPERATURE
         )
         
         prompt = PromptTemplate(
@@ -49,49 +84,336 @@ class ChatHandler:
             chat_history_str += f"User: {entry['user']}\nAssistant: {entry['assistant']}\n"
         return chat_history_str
     
-    def handle_user_query(self, user_question: str, chat_history: List[Dict[str, str]]) -> str:
+    def _build_qa_inputs(self, user_question: str, docs: List, chat_history: List[Dict[str, str]]) -> Dict:
+        """Assemble the QA chain inputs from retrieved chunks and chat history"""
+        with metrics.span("prompt_build"):
+            return {
+                "context": docs,
+                "question": user_question,
+                "chat_history": self._format_chat_history(chat_history)
+            }
+    
+    def _gate(self, scored: List[Tuple[Any, float]]) -> Tuple[List, Optional[str]]:
+        """Retrieved chunks and the kind of answer: "qa", "low_confidence", or None for the templated reply
+        
+        A question passes when its most similar chunk reaches RETRIEVAL_MIN_SIMILARITY. Below
+        that, LOW_CONFIDENCE_MODEL answers if one is configured; otherwise no LLM is called.
+        """
+        docs = [doc for doc, _ in scored]
+        threshold = self.config.RETRIEVAL_MIN_SIMILARITY
+        best = max((similarity for _, similarity in scored), default=None)
+        if threshold <= 0 or (best is not None and best >= threshold):
+            metrics.inc("rag_retrieval_gate_total", result="pass")
+            return docs, "qa"
+        if self.low_confidence_chain is not None:
+            metrics.inc("rag_retrieval_gate_total", result="low_confidence_model")
+            return docs, "low_confidence"
+        metrics.inc("rag_retrieval_gate_total", result="template")
+        return docs, None
+    
+    def _select_chain(self, kind: str, inputs: Dict) -> Tuple[str, Any]:
+        """Model tier and chain for a "qa", "summarization" or "low_confidence" request"""
+        if kind == "low_confidence":
+            return "low_confidence", self.low_confidence_chain
+        context = "".join(doc.page_content for doc in inputs.get("context", [])) + inputs.get("chat_history", "")
+        tier, _ = model_cascade.route(kind, inputs.get("question", ""), estimate_tokens(context))
+        return tier, self.chains[kind][tier]
+    
+    def _answer(self, kind: str, inputs: Dict, priority: int = INTERACTIVE) -> str:
+        """Answer with the routed model tier, escalating a fast answer that fails the self-check"""
+        template = PROMPT_TEMPLATES["summarization_template" if kind == "summarization" else "qa_template"]
+        tier, chain = self._select_chain(kind, inputs)
+        response = self._invoke(chain, inputs, template, priority, tier)
+        if tier == FAST:
+            failure = model_cascade.self_check(response)
+            if failure:
+                metrics.inc("rag_model_escalations_total", reason=failure)
+                response = self._invoke(self.chains[kind][LARGE], inputs, template, priority, LARGE)
+        return response
+    
+    async def _aanswer(self, kind: str, inputs: Dict, priority: int = INTERACTIVE) -> str:
+        """Async variant of _answer"""
+        template = PROMPT_TEMPLATES["summarization_template" if kind == "summarization" else "qa_template"]
+        tier, chain = self._select_chain(kind, inputs)
+        response = await self._ainvoke(chain, inputs, template, priority, tier)
+        if tier == FAST:
+            failure = model_cascade.self_check(response)
+            if failure:
+                metrics.inc("rag_model_escalations_total", reason=failure)
+                response = await self._ainvoke(self.chains[kind][LARGE], inputs, template, priority, LARGE)
+        return response
+    
+    def _record_usage(self, estimated: int, usage: TokenUsageCallback, tier: str = LARGE):
+        """Feed provider-reported token usage to the rate limiter and metrics"""
+        if usage.total_tokens:
+            rate_limiter.record_usage(estimated, usage.total_tokens)
+            metrics.inc("rag_llm_tokens_total", usage.total_tokens, backend=self.backend, tier=tier)
+            model_cascade.record_cost(tier, usage.total_tokens)
+    
+    def _estimate_tokens(self, template: str, inputs: Dict) -> int:
+        """Estimate prompt plus expected completion tokens for rate limiting"""
+        text = template + inputs.get("question", "") + inputs.get("chat_history", "")
+        text += "".join(doc.page_content for doc in inputs.get("context", []))
+        return estimate_tokens(text) + self.config.LLM_EXPECTED_OUTPUT_TOKENS
+    
+    def _invoke(self, chain, inputs: Dict, template: str, priority: int = INTERACTIVE, tier: str = LARGE) -> str:
+        """Invoke a chain under the shared rate limiter, retrying rate-limited calls"""
+        estimated = self._estimate_tokens(template, inputs)
+        
+        def call():
+            rate_limiter.acquire(estimated, priority)
+            usage = TokenUsageCallback()
+            with metrics.span("llm_call", backend=self.backend, tier=tier):
+                response = chain.invoke(inputs, config={"callbacks": [usage]})
+            self._record_usage(estimated, usage, tier)
+            return response
+        
+        return retry_with_backoff(call)
+    
+    async def _ainvoke(self, chain, inputs: Dict, template: str, priority: int = INTERACTIVE, tier: str = LARGE) -> str:
+        """Async variant of _invoke"""
+        estimated = self._estimate_tokens(template, inputs)
+        
+        async def call():
+            await rate_limiter.aacquire(estimated, priority)
+            usage = TokenUsageCallback()
+            with metrics.span("llm_call", backend=self.backend, tier=tier):
+                response = await chain.ainvoke(inputs, config={"callbacks": [usage]})
+            self._record_usage(estimated, usage, tier)
+            return response
+        
+        return await aretry_with_backoff(call)
+    
+    def handle_user_query(self, user_question: str, chat_history: List[Dict[str, str]], filters: Optional[Dict] = None) -> str:
         """Handle user query against FAISS index and maintain chat history"""
+        metrics.inc("rag_queries_total", mode="sync")
         try:
-            # Perform similarity search
-            docs = vector_store_manager.similarity_search(user_question)
+            # Perform similarity search, restricted to the selected papers if any
+            scored = vector_store_manager.similarity_search_with_scores(user_question, filters=filters)
             
-            # Format chat history
-            chat_history_str = self._format_chat_history(chat_history)
+            # Nothing relevant retrieved: answer without the full model
+            docs, kind = self._gate(scored)
+            if kind is None:
+                return PROMPT_TEMPLATES["low_confidence_response"]
             
-            # Get response from chain
-            response = self.chain.invoke(
-                {
-                    "context": docs,
-                    "question": user_question,
-                    "chat_history": chat_history_str
-                }
-            )
+            # Format chat history and assemble the prompt inputs
+            inputs = self._build_qa_inputs(user_question, docs, chat_history)
+            
+            # Get response from the routed model tier
+            response = self._answer(kind, inputs)
             
             return response
         
         except Exception as e:
             return f"Error processing query: {str(e)}"
     
-    def summarize_research_papers(self) -> str:
+    async def ahandle_user_query(
+        self,
+        user_question: str,
+        chat_history: List[Dict[str, str]],
+        filters: Optional[Dict] = None,
+        priority: int = INTERACTIVE
+    ) -> str:
+        """Async variant of handle_user_query"""
+        metrics.inc("rag_queries_total", mode="async")
+        try:
+            scored = await asyncio.to_thread(vector_store_manager.similarity_search_with_scores, user_question, None, filters)
+            docs, kind = self._gate(scored)
+            if kind is None:
+                return PROMPT_TEMPLATES["low_confidence_response"]
+            inputs = self._build_qa_inputs(user_question, docs, chat_history)
+            return await self._aanswer(kind, inputs, priority)
+            
+        except Exception as e:
+            return f"Error processing query: {str(e)}"
+            
+    async def astream_user_query(
+        self,
+        user_question: str,
+        chat_history: List[Dict[str, str]],
+        filters: Optional[Dict] = None,
+        priority: int = INTERACTIVE
+    ) -> AsyncIterator[str]:
+        """Stream the answer to a user query chunk by chunk
+        
+        The answer comes from the routed model tier; it is not escalated, since it is shown as it arrives.
+        """
+        metrics.inc("rag_queries_total", mode="stream")
+        try:
+            scored = await asyncio.to_thread(vector_store_manager.similarity_search_with_scores, user_question, None, filters)
+            docs, kind = self._gate(scored)
+            if kind is None:
+                yield PROMPT_TEMPLATES["low_confidence_response"]
+                return
+            inputs = self._build_qa_inputs(user_question, docs, chat_history)
+            tier, chain = self._select_chain(kind, inputs)
+            estimated = self._estimate_tokens(PROMPT_TEMPLATES["qa_template"], inputs)
+            
+            for attempt in range(self.config.LLM_MAX_RETRIES + 1):
+                await rate_limiter.aacquire(estimated, priority)
+                started = False
+                streamed = []
+                try:
+                    with metrics.span("llm_call", backend=self.backend, mode="stream", tier=tier):
+                        async for chunk in chain.astream(inputs):
+                            started = True
+                            streamed.append(chunk)
+                            yield chunk
+                    # Streams report no usage: priced from the estimated prompt and the streamed text
+                    model_cascade.record_cost(
+                        tier, estimated - self.config.LLM_EXPECTED_OUTPUT_TOKENS + estimate_tokens("".join(streamed))
+                    )
+                    return
+                except Exception as e:
+                    # Only retry before anything was emitted; a partial answer cannot be replayed
+                    if started or not is_rate_limit_error(e) or attempt == self.config.LLM_MAX_RETRIES:
+                        raise
+                    await asyncio.sleep(retry_delay(e, attempt))
+        
+        except Exception as e:
+            yield f"Error processing query: {str(e)}"
+    
+    def _batch_answer(self, kind: str, inputs: List[Dict], max_concurrency: int) -> List:
+        """Answer many inputs of one kind with bounded concurrency at background priority"""
+        limited = RunnableLambda(lambda item: self._answer(kind, item, BACKGROUND))
+        return limited.batch(
+            inputs,
+            config={"max_concurrency": max(1, max_concurrency)},
+            return_exceptions=True
+        )
+    
+    def handle_batch_queries(
+        self,
+        questions: List[str],
+        filters: Optional[Dict] = None,
+        per_document: bool = False,
+        max_concurrency: Optional[int] = None
+    ) -> List[Dict]:
+        """Answer many questions at once: one embedding call, one batched search, concurrent LLM calls
+        
+        With per_document=True every question is asked of every matching paper separately.
+        Returns one dict per (question, paper) with: question, doc_id, answer, error, sources
+        """
+        if not questions:
+            return []
+        metrics.inc("rag_queries_total", len(questions), mode="batch")
+        if max_concurrency is None:
+            max_concurrency = self.config.BATCH_MAX_CONCURRENCY
+        
+        vector_store_manager.load_vector_store()
+        query_vectors = vector_store_manager.embed_queries(questions)
+        
+        if per_document:
+            doc_ids = vector_store_manager.resolve_filters(filters)
+            if doc_ids is None:
+                doc_ids = [doc["doc_id"] for doc in vector_store_manager.list_documents()]
+            scopes = [(doc_id, {"doc_ids": [doc_id]}) for doc_id in doc_ids]
+        else:
+            scopes = [(None, filters)]
+        
+        jobs = []
+        for doc_id, scope in scopes:
+            scored_per_question = vector_store_manager.batch_similarity_search_with_scores(
+                questions, filters=scope, query_vectors=query_vectors
+            )
+            for question, scored in zip(questions, scored_per_question):
+                docs, kind = self._gate(scored)
+                jobs.append({"question": question, "doc_id": doc_id, "docs": docs, "scores": [s for _, s in scored], "kind": kind})
+        
+        # Questions below the confidence gate get the templated reply or the low-confidence model
+        outputs = [PROMPT_TEMPLATES["low_confidence_response"]] * len(jobs)
+        for kind in ("qa", "low_confidence"):
+            positions = [i for i, job in enumerate(jobs) if job["kind"] == kind]
+            if not positions:
+                continue
+            inputs = [
+                {"context": jobs[i]["docs"], "question": jobs[i]["question"], "chat_history": ""}
+                for i in positions
+            ]
+            for i, output in zip(positions, self._batch_answer(kind, inputs, max_concurrency)):
+                outputs[i] = output
+        
+        results = []
+        for job, output in zip(jobs, outputs):
+            failed = isinstance(output, Exception)
+            results.append({
+                "question": job["question"],
+                "doc_id": job["doc_id"],
+                "answer": None if failed else output,
+                "error": str(output) if failed else None,
+                "sources": [
+                    {
+                        "doc_id": doc.metadata.get("doc_id"),
+                        "title": doc.metadata.get("title"),
+                        "chunk": doc.metadata.get("chunk"),
+                        "score": score,
+                    }
+                    for doc, score in zip(job["docs"], job["scores"])
+                ],
+            })
+        return results
+    
+    def summarize_document(self, doc_id: str, manager: Optional[VectorStoreManager] = None, priority: int = BACKGROUND) -> str:
+        """Summarize one paper from its most summary-relevant chunks (used to precompute summaries)"""
+        docs = (manager or vector_store_manager).similarity_search(SUMMARY_QUERY, k=10, filters={"doc_ids": [doc_id]})
+        if not docs:
+            raise ValueError(f"Document {doc_id} has no indexed text")
+        return self._answer("summarization", {"context": docs}, priority)
+    
+    def stored_summary(self) -> Optional[str]:
+        """The precomputed summaries of all papers, or None while any paper still lacks one"""
+        documents = vector_store_manager.list_documents()
+        summaries = stored_summaries(documents)
+        missing = [document["doc_id"] for document in documents if document["doc_id"] not in summaries]
+        if missing or not documents:
+            if missing and Config.PRECOMPUTE_SUMMARIES:
+                insight_scheduler.schedule(missing)
+            return None
+        
+        metrics.inc("rag_cache_requests_total", cache="summary", result="hit")
+        return "\n\n---\n\n".join(
+            f"## 📄 {summaries[document['doc_id']]['title']}\n\n{summaries[document['doc_id']]['summary']}"
+            for document in documents
+        )
+    
+    def summarize_research_papers(self, priority: int = INTERACTIVE) -> str:
         """Generate a comprehensive summary of all research papers in the vector store"""
         try:
+            # Precomputed per-paper summaries are returned as they are
+            stored = self.stored_summary()
+            if stored is not None:
+                return stored
+            
             # Get all documents from the vector store (use a broad query to get more content)
-            docs = vector_store_manager.similarity_search("research paper abstract methodology results findings", k=10)
+            docs = vector_store_manager.similarity_search(SUMMARY_QUERY, k=10)
             
             if not docs:
                 return "No research papers found in the processed documents. Please process some PDFs first."
             
             # Get response from summarization chain
-            response = self.summarization_chain.invoke(
-                {
-                    "context": docs
-                }
-            )
+            response = self._answer("summarization", {"context": docs}, priority)
             
             return response
         
         except Exception as e:
             return f"Error generating summary: {str(e)}"
 
+    async def asummarize_research_papers(self, priority: int = BACKGROUND) -> str:
+        """Async variant of summarize_research_papers, queued behind interactive chat by default"""
+        try:
+            stored = await asyncio.to_thread(self.stored_summary)
+            if stored is not None:
+                return stored
+            
+            docs = await asyncio.to_thread(vector_store_manager.similarity_search, SUMMARY_QUERY, 10)
+            
+            if not docs:
+                return "No research papers found in the processed documents. Please process some PDFs first."
+            
+            return await self._aanswer("summarization", {"context": docs}, priority)
+        
+        except Exception as e:
+            return f"Error generating summary: {str(e)}"
+
 # Global instance
 chat_handler = ChatHandler()
\ No newline at end of file
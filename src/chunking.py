@@ -0,0 +1,198 @@
+import re
+from typing import List, Dict, Optional, Tuple
+from config.settings import Config
+from utils.text_utils import estimate_tokens
+
+# Canonical names of common research paper sections (matched against the start of a heading)
+SECTION_NAMES = (
+    "abstract", "introduction", "background", "related work", "preliminaries", "problem",
+    "method", "methods", "methodology", "approach", "model", "framework", "experiments",
+    "experimental", "evaluation", "results", "discussion", "analysis", "conclusion",
+    "conclusions", "limitations", "future work", "acknowledgments", "acknowledgements",
+    "references", "bibliography", "appendix", "supplementary",
+)
+REFERENCE_SECTIONS = ("references", "bibliography")
+LOWERCASE_TITLE_WORDS = {"a", "an", "and", "as", "at", "by", "for", "from", "in", "of", "on", "or", "the", "to", "vs", "via", "with"}
+
+# Optional numbering ("3", "3.2", "IV.", "A.") followed by the heading text
+HEADING_RE = re.compile(r"^(?P<number>(?:\d+(?:\.\d+)*\.?|[IVX]+\.|[A-H]\.)\s+)?(?P<title>[A-Z][^.!?]{0,78})$")
+INLINE_ABSTRACT_RE = re.compile(r"^abstract\s*[.:—-]\s*(?P<rest>\S.*)$", re.IGNORECASE)
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\[\"'])")
+
+FRONT_MATTER = "Front Matter"
+
+def _canonical_section(title: str) -> Optional[str]:
+    """Known section name a heading starts with, if any"""
+    name = title.lower().rstrip(":").strip()
+    for section in SECTION_NAMES:
+        if name == section or name.startswith(section + " "):
+            return section
+    return None
+
+def detect_heading(line: str) -> Optional[str]:
+    """Return the heading text if the line looks like a section heading"""
+    if len(line) > 80 or len(line.split()) > 10:
+        return None
+    match = HEADING_RE.match(line)
+    if not match:
+        return None
+    title = match.group("title").strip().rstrip(":")
+    words = title.split()
+    # Body lines rarely have every word capitalized, headings usually do
+    title_case = all(not word[0].isalpha() or word[0].isupper() or word in LOWERCASE_TITLE_WORDS for word in words)
+    if not title_case:
+        return None
+    # Unnumbered lines must name a known section; numbered ones may be anything short, e.g. "3.2 Training Objective"
+    if _canonical_section(title) or (match.group("number") and len(words) <= 8 and title[-1] not in ",;"):
+        return line.rstrip(":")
+    return None
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Split text into (heading, paragraphs) sections at detected headings"""
+    sections: List[Tuple[str, List[str]]] = [(FRONT_MATTER, [])]
+    paragraph: List[str] = []
+
+    def end_paragraph():
+        if paragraph:
+            sections[-1][1].append(" ".join(paragraph))
+            paragraph.clear()
+
+    for raw_line in text.split("\n"):
+        line = raw_line.strip()
+        if not line:
+            end_paragraph()
+            continue
+        inline_abstract = INLINE_ABSTRACT_RE.match(line)
+        heading = "Abstract" if inline_abstract else detect_heading(line)
+        if heading:
+            end_paragraph()
+            sections.append((heading, []))
+            if inline_abstract:
+                paragraph.append(inline_abstract.group("rest"))
+            continue
+        paragraph.append(line)
+    end_paragraph()
+
+    return [(heading, paragraphs) for heading, paragraphs in sections if paragraphs or heading != FRONT_MATTER]
+
+def split_sentences(paragraph: str) -> List[str]:
+    """Split a paragraph at sentence boundaries"""
+    return [sentence for sentence in SENTENCE_END_RE.split(paragraph) if sentence]
+
+class SectionChunker:
+    """Chunk paper text along section headings and sentence boundaries to a token budget"""
+
+    def __init__(
+        self,
+        max_tokens: int = Config.CHUNK_MAX_TOKENS,
+        overlap_tokens: int = Config.CHUNK_OVERLAP_TOKENS,
+        min_tokens: int = Config.CHUNK_MIN_TOKENS,
+        skip_references: bool = Config.SKIP_REFERENCES
+    ):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = min_tokens
+        self.skip_references = skip_references
+
+    def _split_long_sentence(self, sentence: str) -> List[str]:
+        """Hard-split a sentence longer than the budget at word boundaries"""
+        max_chars = self.max_tokens * 4
+        pieces, current = [], ""
+        for word in sentence.split():
+            if current and len(current) + 1 + len(word) > max_chars:
+                pieces.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def _pack_section(self, heading: str, paragraphs: List[str]) -> List[str]:
+        """Pack the sentences of one section into chunks of at most max_tokens
+
+        Overlap is only added between chunks of the same section, never across sections.
+        """
+        chunks: List[str] = []
+        current: List[Tuple[str, str]] = []  # (separator, sentence)
+        current_tokens = 0
+        has_body = False
+
+        if heading != FRONT_MATTER:
+            current.append(("", heading))
+            current_tokens = estimate_tokens(heading) + 1
+
+        for paragraph in paragraphs:
+            for sentence_num, sentence in enumerate(split_sentences(paragraph)):
+                pieces = self._split_long_sentence(sentence) if estimate_tokens(sentence) > self.max_tokens else [sentence]
+                for piece_num, piece in enumerate(pieces):
+                    piece_tokens = estimate_tokens(piece) + 1
+                    if has_body and current_tokens + piece_tokens > self.max_tokens:
+                        chunks.append(self._join(current))
+                        current, current_tokens = self._overlap(current, piece_tokens)
+                    separator = "\n" if sentence_num == 0 and piece_num == 0 else " "
+                    current.append((separator, piece))
+                    current_tokens += piece_tokens
+                    has_body = True
+
+        if has_body and current:
+            chunks.append(self._join(current))
+        return chunks
+
+    def _join(self, sentences: List[Tuple[str, str]]) -> str:
+        return "".join(separator + sentence for separator, sentence in sentences).strip()
+
+    def _overlap(self, sentences: List[Tuple[str, str]], next_tokens: int) -> Tuple[List[Tuple[str, str]], int]:
+        """Trailing sentences of the previous chunk to repeat at the start of the next one"""
+        carried: List[Tuple[str, str]] = []
+        tokens = 0
+        for separator, sentence in reversed(sentences):
+            sentence_tokens = estimate_tokens(sentence) + 1
+            if tokens + sentence_tokens > self.overlap_tokens or tokens + sentence_tokens + next_tokens > self.max_tokens:
+                break
+            carried.insert(0, (" ", sentence))
+            tokens += sentence_tokens
+        return carried, tokens
+
+    def split(self, text: str) -> List[Dict[str, str]]:
+        """Split text into chunks, each tagged with the section it came from"""
+        chunks: List[Dict[str, str]] = []
+        skipping = False
+        for heading, paragraphs in split_sections(text):
+            match = HEADING_RE.match(heading)
+            section = _canonical_section(match.group("title")) if match else None
+            if self.skip_references:
+                if section in REFERENCE_SECTIONS:
+                    skipping = True
+                elif section:
+                    skipping = False
+                if skipping:
+                    continue
+            for chunk in self._pack_section(heading, paragraphs):
+                chunks.append({"text": chunk, "section": heading})
+        return self._merge_small(chunks)
+
+    def _merge_small(self, chunks: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Fold chunks below min_tokens (e.g. a title block) into the following chunk when it fits"""
+        merged: List[Dict[str, str]] = []
+        carry: Optional[Dict[str, str]] = None
+        for chunk in chunks:
+            if carry:
+                if estimate_tokens(carry["text"]) + estimate_tokens(chunk["text"]) + 1 <= self.max_tokens:
+                    chunk = {"text": carry["text"] + "\n" + chunk["text"], "section": chunk["section"]}
+                else:
+                    merged.append(carry)
+                carry = None
+            if estimate_tokens(chunk["text"]) < self.min_tokens:
+                carry = chunk
+            else:
+                merged.append(chunk)
+        if carry:
+            if merged and estimate_tokens(merged[-1]["text"]) + estimate_tokens(carry["text"]) + 1 <= self.max_tokens:
+                merged[-1] = {"text": merged[-1]["text"] + "\n" + carry["text"], "section": merged[-1]["section"]}
+            else:
+                merged.append(carry)
+        return merged
+
+# Global instance
+section_chunker = SectionChunker()
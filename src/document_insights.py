@@ -0,0 +1,165 @@
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime, timezone
+from typing import List, Dict, Optional
+from config.settings import Config
+from src.metrics import metrics
+from src.vector_store import vector_store_manager, VectorStoreManager
+from utils.text_utils import tfidf_keywords
+
+# Retrieval query used to pick the chunks a paper's summary is written from
+SUMMARY_QUERY = "research paper abstract methodology results findings"
+
+def _summary_model() -> str:
+    # Summaries are written by the large tier of the model cascade
+    return f"{Config.LLM_BACKEND}:{Config.LARGE_MODEL_NAME}"
+
+class InsightStore:
+    """Per-paper summaries and per-index keyword facets cached as JSON files
+
+    Summaries are keyed by document id (a hash of the file contents), so they are shared
+    by every index holding the paper. Keywords depend on the whole corpus and are stored
+    per index.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or Config.SUMMARY_DIR
+
+    def _summary_path(self, doc_id: str) -> str:
+        return os.path.join(self.directory, f"{doc_id}.json")
+
+    def _keywords_path(self, index_path: str) -> str:
+        key = hashlib.sha256(os.path.abspath(index_path).encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.directory, f"keywords-{key}.json")
+
+    def _write_json(self, path: str, data: Dict):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(path + ".tmp", path)
+
+    def summary(self, doc_id: str) -> Optional[Dict]:
+        """Stored summary of a paper, if one was written with the current LLM"""
+        path = self._summary_path(doc_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        return entry if entry.get("model") == _summary_model() else None
+
+    def save_summary(self, doc_id: str, title: str, summary: str):
+        self._write_json(self._summary_path(doc_id), {
+            "doc_id": doc_id,
+            "title": title,
+            "summary": summary,
+            "model": _summary_model(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+    def keywords(self, index_path: str) -> Dict[str, List[str]]:
+        path = self._keywords_path(index_path)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("keywords", {})
+
+    def save_keywords(self, index_path: str, keywords: Dict[str, List[str]]):
+        self._write_json(self._keywords_path(index_path), {"index_path": index_path, "keywords": keywords})
+
+def refresh_keywords(manager: Optional[VectorStoreManager] = None, store: Optional["InsightStore"] = None) -> Dict[str, List[str]]:
+    """Recompute the TF-IDF keywords of every indexed paper in one pass and store them"""
+    manager = manager or vector_store_manager
+    store = store or insight_store
+    with metrics.span("keywords"):
+        try:
+            keywords = tfidf_keywords(manager.document_chunks(), Config.KEYWORDS_PER_DOCUMENT)
+        except FileNotFoundError:
+            keywords = {}
+    store.save_keywords(manager.index_path, keywords)
+    manager.document_keywords = keywords
+    return keywords
+
+def summarize_document(doc_id: str, manager: Optional[VectorStoreManager] = None, store: Optional["InsightStore"] = None) -> str:
+    """Write and store the summary of one paper (background priority)"""
+    from src.chat_handler import chat_handler
+
+    manager = manager or vector_store_manager
+    store = store or insight_store
+    with metrics.span("summarize", mode="precompute"):
+        summary = chat_handler.summarize_document(doc_id, manager)
+    entry = manager.document_info(doc_id)
+    store.save_summary(doc_id, entry.get("title") or entry.get("source") or doc_id, summary)
+    return summary
+
+class InsightScheduler:
+    """Background jobs that precompute summaries and keywords after ingestion
+
+    One keyword pass runs per batch of scheduled documents (repeated if documents arrive
+    while it runs); each paper without a stored summary gets its own summary job.
+    """
+
+    def __init__(self, manager: Optional[VectorStoreManager] = None, store: Optional[InsightStore] = None, workers: int = 1):
+        self.manager = manager or vector_store_manager
+        self.store = store or insight_store
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="insights")
+        self._summaries: Dict[str, Future] = {}
+        self._keywords: Optional[Future] = None
+        self._keywords_stale = False
+        self._lock = threading.Lock()
+
+    def schedule(self, doc_ids: List[str], summaries: bool = True) -> List[Future]:
+        """Refresh keywords and queue summaries for papers that have none; returns the queued jobs"""
+        with self._lock:
+            if self._keywords is None or self._keywords.done():
+                self._keywords = self._executor.submit(self._refresh_keywords)
+            else:
+                self._keywords_stale = True
+            futures = [self._keywords]
+
+            for doc_id in doc_ids if summaries else []:
+                pending = self._summaries.get(doc_id)
+                if (pending is not None and not pending.done()) or self.store.summary(doc_id) is not None:
+                    continue
+                self._summaries[doc_id] = self._executor.submit(self._summarize, doc_id)
+                futures.append(self._summaries[doc_id])
+            return futures
+
+    def pending(self) -> List[str]:
+        """Papers whose summary is still being written"""
+        with self._lock:
+            return [doc_id for doc_id, future in self._summaries.items() if not future.done()]
+
+    def _refresh_keywords(self):
+        while True:
+            refresh_keywords(self.manager, self.store)
+            with self._lock:
+                if not self._keywords_stale:
+                    return
+                self._keywords_stale = False
+
+    def _summarize(self, doc_id: str):
+        try:
+            summarize_document(doc_id, self.manager, self.store)
+            metrics.inc("rag_summaries_total", result="ok")
+        except Exception:
+            # Left without a summary; the next ingestion or summary request schedules it again
+            metrics.inc("rag_summaries_total", result="error")
+            raise
+
+def stored_summaries(documents: List[Dict], store: Optional[InsightStore] = None) -> Dict[str, Dict]:
+    """Stored summaries of the given documents (papers without one are left out)"""
+    store = store or insight_store
+    summaries = {}
+    for document in documents:
+        entry = store.summary(document["doc_id"])
+        if entry is not None:
+            summaries[document["doc_id"]] = entry
+    return summaries
+
+# Global instances
+insight_store = InsightStore()
+insight_scheduler = InsightScheduler(workers=Config.SUMMARY_WORKERS)
+vector_store_manager.document_keywords = insight_store.keywords(vector_store_manager.index_path)
@@ -0,0 +1,26 @@
+from langchain_core.embeddings import Embeddings
+from config.settings import Config
+
+SUPPORTED_EMBEDDING_BACKENDS = ("torch", "onnx")
+
+def create_embeddings(model_name: str = None, backend: str = None) -> Embeddings:
+    """Construct the embedding model for a backend; heavy imports happen here, on first use"""
+    model_name = model_name or Config.EMBEDDING_MODEL
+    backend = (backend or Config.EMBEDDING_BACKEND).lower()
+
+    # Vectors are unit length whatever the model: scores are cosine similarities derived from L2 distances
+    if backend == "torch":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=model_name, encode_kwargs={"normalize_embeddings": True})
+
+    if backend == "onnx":
+        # Runs an exported copy of the model without importing torch
+        from src.onnx_embeddings import OnnxEmbeddings, default_export_dir
+        return OnnxEmbeddings(
+            Config.ONNX_MODEL_PATH or default_export_dir(model_name),
+            quantized=Config.ONNX_QUANTIZED,
+            batch_size=Config.EMBEDDING_BATCH_SIZE,
+            threads=Config.ONNX_THREADS,
+        )
+
+    raise ValueError(f"Unknown embedding backend '{backend}'. Supported backends: {', '.join(SUPPORTED_EMBEDDING_BACKENDS)}")
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+async def _next(stream: AsyncIterator[T]) -> T:
+    return await stream.__anext__()
+
+class BackgroundEventLoop:
+    """One event loop, running in a daemon thread, for every async LLM call in the process
+
+    The pooled chat model clients (get_chat_model) create their async HTTP clients once,
+    and httpx connections belong to the loop they were opened on. A fresh loop per request
+    (asyncio.run, or Streamlit draining an async generator) finds them bound to a closed
+    loop, so sync code hands its coroutines and async streams to this loop instead.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="async-llm", daemon=True).start()
+            return self._loop
+
+    def run(self, awaitable: Awaitable[T]) -> T:
+        """Run a coroutine on the shared loop and block until it returns"""
+        return asyncio.run_coroutine_threadsafe(awaitable, self.loop).result()
+
+    def iterate(self, stream: AsyncIterator[T]) -> Iterator[T]:
+        """Drain an async generator on the shared loop as a sync iterator; closing it closes the stream"""
+        try:
+            while True:
+                try:
+                    item = self.run(_next(stream))
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                self.run(aclose())
+
+# Global instance
+background_loop = BackgroundEventLoop()
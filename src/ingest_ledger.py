@@ -0,0 +1,294 @@
+import os
+import glob
+import json
+import hashlib
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, BinaryIO, Callable, Iterable, Tuple, Set
+from config.settings import Config
+from src.metrics import metrics
+from src.pdf_processor import pdf_processor, file_sha256
+from src.vector_store import vector_store_manager, VectorStoreManager, file_lock
+from src.document_insights import InsightScheduler, insight_scheduler
+from src.upload_staging import StagedPDF, upload_staging
+
+LEDGER_FILE = "ingest_ledger.json"
+
+_ingest_thread_lock = threading.Lock()
+
+@contextmanager
+def ingest_lock(index_path: str):
+    """Held from loading a ledger to saving it, so concurrent ingestions do not drop each other's entries
+
+    Covers the threads of this process and, through a lock file next to the index, other processes
+    such as ingest.py writing the same index while the app runs.
+    """
+    with _ingest_thread_lock, file_lock(index_path + ".lock"):
+        yield
+
+# Settings that change the chunks or vectors produced for a file
+FINGERPRINT_SETTINGS = (
+    "EMBEDDING_MODEL", "EMBEDDING_BACKEND", "ONNX_QUANTIZED", "TEXT_NORMALIZATION", "CHUNKING_STRATEGY",
+    "CHUNK_SIZE", "CHUNK_OVERLAP", "CHUNK_MAX_TOKENS", "CHUNK_OVERLAP_TOKENS", "CHUNK_MIN_TOKENS",
+    "SKIP_REFERENCES", "INDEX_SHARDS",
+)
+
+def pipeline_fingerprint() -> str:
+    """Short hash of the ingestion settings"""
+    settings = {name: getattr(Config, name) for name in FINGERPRINT_SETTINGS}
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+class IngestLedger:
+    """Files already in an index, keyed by sha256, for the pipeline settings that produced it
+
+    The ledger is stored inside the index directory and saved together with it, so the two
+    never disagree. A ledger written with different settings (or an index without a ledger)
+    is stale: the index has to be rebuilt before files can be skipped again.
+    """
+
+    def __init__(self, index_path: Optional[str] = None):
+        self.index_path = index_path or Config.FAISS_INDEX_PATH
+        self.fingerprint = pipeline_fingerprint()
+        self.files: Dict[str, Dict] = {}
+        self.stale = False
+        self._load()
+
+    def _load(self):
+        path = os.path.join(self.index_path, LEDGER_FILE)
+        if not os.path.exists(path):
+            self.stale = any(
+                os.path.exists(os.path.join(self.index_path, name)) for name in ("index.faiss", "shards.json")
+            )
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("fingerprint") != self.fingerprint:
+            self.stale = True
+            return
+        self.files = data.get("files", {})
+
+    def __contains__(self, sha256: str) -> bool:
+        """Whether a file is fully indexed (partially indexed ones are still to be completed)"""
+        entry = self.files.get(sha256)
+        return entry is not None and not entry.get("partial")
+
+    def superseded_by(self, origin: Optional[str], sha256: str) -> List[str]:
+        """Ledger keys of earlier versions of a file from the same origin (none without an origin)
+
+        File names are not identities: unrelated papers uploaded as "paper.pdf" both stay.
+        """
+        if not origin:
+            return []
+        return [key for key, entry in self.files.items() if entry.get("origin") == origin and key != sha256]
+
+    def record(self, sha256: str, source: str, chunks: int, partial: bool = False, origin: Optional[str] = None):
+        self.files[sha256] = {
+            "doc_id": sha256[:16],
+            "source": source,
+            "chunks": chunks,
+            "ingested_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if origin:
+            self.files[sha256]["origin"] = origin
+        if partial:
+            self.files[sha256]["partial"] = True
+
+    def remove(self, sha256: str) -> Optional[Dict]:
+        return self.files.pop(sha256, None)
+
+    def save(self, directory: str):
+        """Write the ledger into an index directory"""
+        path = os.path.join(directory, LEDGER_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "files": self.files}, f)
+        os.replace(path + ".tmp", path)
+
+def select_new_files(
+    pdf_files: List[BinaryIO],
+    metadata: Optional[List[Dict]],
+    ledger: IngestLedger,
+    stats: Dict,
+    exclude: Iterable[str] = ()
+) -> Tuple[List[BinaryIO], List[Dict], List[str]]:
+    """Files to ingest with their metadata and sha256: not in the ledger, not in exclude, first copy only
+
+    Skipped files are counted in stats["skipped"].
+    """
+    pending_files, pending_metadata, pending_shas = [], [], []
+    seen = set(exclude)
+    for idx, pdf in enumerate(pdf_files):
+        sha256 = file_sha256(pdf)
+        if sha256 in ledger or sha256 in seen:
+            metrics.inc("rag_cache_requests_total", cache="ingest_ledger", result="hit")
+            stats["skipped"] += 1
+            continue
+        metrics.inc("rag_cache_requests_total", cache="ingest_ledger", result="miss")
+        pending_files.append(pdf)
+        pending_metadata.append(metadata[idx] if metadata else {})
+        pending_shas.append(sha256)
+        seen.add(sha256)
+    return pending_files, pending_metadata, pending_shas
+
+def origins_of(metadata: List[Dict]) -> List[Optional[str]]:
+    """The "origin" of each file's metadata: a URL or path that identifies the same document across versions"""
+    return [m.get("origin") for m in metadata]
+
+def _readable_copy(document: Dict) -> Optional[Tuple[str, str]]:
+    """(path, sha256) of a file with an indexed document's contents, if one is still on disk"""
+    doc_id = document["doc_id"]
+    for path in glob.glob(os.path.join(glob.escape(upload_staging.directory), f"{doc_id}*.pdf")):
+        return path, os.path.splitext(os.path.basename(path))[0]
+    # Command-line ingestion reads files in place
+    for path in (document.get("origin"), document.get("source")):
+        if path and os.path.isfile(path):
+            with open(path, "rb") as f:
+                sha256 = file_sha256(f)
+            if sha256[:16] == doc_id:
+                return path, sha256
+    return None
+
+def recoverable_documents(manager: VectorStoreManager) -> Tuple[List[Tuple[str, str, str, Dict]], List[str]]:
+    """Documents of an index about to be rebuilt: (path, sha256, source, metadata) of those that can be read again, names of the rest
+
+    A rebuild starts from an empty index, so every indexed paper is ingested again with the
+    new settings: from its staged upload or download, or from the path it was ingested from.
+    Papers whose file is gone (e.g. uploads older than UPLOAD_RETENTION_HOURS) are dropped.
+    """
+    recoverable, dropped = [], []
+    for document in manager.list_documents():
+        copy = _readable_copy(document)
+        if copy is None:
+            dropped.append(document.get("source") or document["doc_id"])
+            continue
+        metadata = {key: document[key] for key in ("title", "authors", "year", "categories", "origin") if document.get(key)}
+        recoverable.append((copy[0], copy[1], document.get("source") or os.path.basename(copy[0]), metadata))
+    return recoverable, dropped
+
+def add_recoverable_documents(
+    pdf_files: List[BinaryIO],
+    metadata: Optional[List[Dict]],
+    manager: VectorStoreManager,
+    stats: Dict
+) -> Tuple[List[BinaryIO], List[Dict], List[BinaryIO]]:
+    """The files of a stale index appended to a batch: (all files, their metadata, the opened recovered files to close)
+
+    Counts the recovered documents in stats["recovered"] and lists the dropped ones in stats["dropped"].
+    """
+    metadata = list(metadata) if metadata else [{} for _ in pdf_files]
+    recoverable, stats["dropped"] = recoverable_documents(manager)
+    recovered = [StagedPDF(path, source, sha256) for path, sha256, source, _ in recoverable]
+    stats["recovered"] = len(recovered)
+    return list(pdf_files) + recovered, metadata + [m for _, _, _, m in recoverable], recovered
+
+def ingest_documents(
+    pdf_files: List[BinaryIO],
+    metadata: Optional[List[Dict]] = None,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    embedding_progress: Optional[Callable[[float], None]] = None,
+    manager: Optional[VectorStoreManager] = None
+) -> Dict:
+    """Add PDFs to the saved index, skipping files already ingested with the current settings
+
+    A file whose metadata "origin" (e.g. its URL) matches an indexed file with different
+    contents replaces it. When the settings changed, the index is rebuilt from these files
+    plus every indexed paper whose file can still be read. Returns counts of processed,
+    skipped and replaced documents and of new chunks, the files that produced no text, the
+    extraction problems of each file, and the papers a rebuild dropped.
+    """
+    manager = manager or vector_store_manager
+    ledger = IngestLedger(manager.index_path)
+    stats = {
+        "documents": 0, "skipped": 0, "replaced": 0, "chunks": 0, "rebuilt": ledger.stale, "skipped_pages": {},
+        "recovered": 0, "dropped": [], "failed": [], "errors": {},
+    }
+
+    recovered = []
+    try:
+        if ledger.stale:
+            pdf_files, metadata, recovered = add_recoverable_documents(pdf_files, metadata, manager, stats)
+        pending_files, pending_metadata, pending_shas = select_new_files(pdf_files, metadata, ledger, stats)
+        if not pending_files:
+            return stats
+
+        text_chunks, metadatas = pdf_processor.process_documents(
+            pending_files, pending_metadata, progress_callback, errors=stats["errors"]
+        )
+        sources = [os.path.basename(getattr(pdf, 'name', 'unknown')) for pdf in pending_files]
+        with ingest_lock(manager.index_path):
+            # Reloaded: background ingestion may have committed while these files were extracted
+            ledger = IngestLedger(manager.index_path)
+            stats["replaced"], stats["failed"] = commit_documents(
+                ledger, manager, sources, pending_shas, text_chunks, metadatas, embedding_progress,
+                origins=origins_of(pending_metadata)
+            )
+    finally:
+        for pdf in recovered:
+            pdf.close()
+    stats["documents"] = len(pending_files) - len(stats["failed"])
+    stats["chunks"] = len(text_chunks)
+    stats["skipped_pages"] = skipped_pages(metadatas)
+    schedule_insights(manager, metadatas)
+    return stats
+
+def schedule_insights(manager: VectorStoreManager, metadatas: List[Dict]):
+    """Compute keyword facets (and summaries of the new papers) in the background"""
+    scheduler = insight_scheduler if manager is insight_scheduler.manager else InsightScheduler(manager)
+    scheduler.schedule(sorted({m["doc_id"] for m in metadatas}), summaries=Config.PRECOMPUTE_SUMMARIES)
+
+def skipped_pages(metadatas: List[Dict]) -> Dict[str, List[int]]:
+    """Pages (1-based) that extraction skipped, per source file"""
+    return {m["source"]: m["skipped_pages"] for m in metadatas if m.get("skipped_pages")}
+
+def commit_documents(
+    ledger: IngestLedger,
+    manager: VectorStoreManager,
+    sources: List[str],
+    shas: List[str],
+    text_chunks: List[str],
+    metadatas: List[Dict],
+    embedding_progress: Optional[Callable[[float], None]] = None,
+    partial: Optional[Set[str]] = None,
+    origins: Optional[List[Optional[str]]] = None,
+    vectors: Optional[List[List[float]]] = None
+) -> Tuple[int, List[str]]:
+    """Record processed files in the ledger and upsert their chunks, saving both together
+
+    Earlier versions from the same origins are removed, as are the chunks of files
+    committed before as partial. Files whose sha256 is in partial are recorded as partially
+    indexed. The first commit into a stale ledger rebuilds the index. Precomputed vectors skip
+    the embedding step. Returns the number of replaced documents and the sources of the files
+    that produced no chunks.
+    """
+    origins = origins or [None] * len(shas)
+    partial = partial or set()
+    chunk_counts = Counter(m["doc_id"] for m in metadatas)
+    # Extraction returns no text for a corrupt file, but also after a timeout or a crashed worker: such files
+    # are left out of the ledger so the next upload retries them, and the versions they would replace stay
+    indexed = [i for i, sha256 in enumerate(shas) if chunk_counts[sha256[:16]]]
+    # Partial files are recorded even without chunks yet, so the background completion finds them
+    recorded = [i for i, sha256 in enumerate(shas) if chunk_counts[sha256[:16]] or sha256 in partial]
+    failed = [source for i, source in enumerate(sources) if i not in recorded]
+
+    # Earlier versions are looked up before recording this batch, so files of one batch never replace each other
+    superseded = {old for i in indexed for old in ledger.superseded_by(origins[i], shas[i])}
+    remove_doc_ids = [ledger.remove(old_sha256)["doc_id"] for old_sha256 in superseded]
+    # A partially indexed file is replaced as a whole
+    previously_partial = [ledger.files[shas[i]]["doc_id"] for i in indexed if shas[i] in ledger.files]
+
+    for i in recorded:
+        sha256 = shas[i]
+        ledger.record(sha256, sources[i], chunk_counts[sha256[:16]], partial=sha256 in partial, origin=origins[i])
+
+    manager.upsert_documents(
+        text_chunks,
+        metadatas,
+        remove_doc_ids=remove_doc_ids + previously_partial,
+        rebuild=ledger.stale,
+        progress_callback=embedding_progress,
+        ledger=ledger,
+        vectors=vectors
+    )
+    ledger.stale = False
+    return len(remove_doc_ids), failed
@@ -0,0 +1,185 @@
+# PDF extraction in a child process with per-page and per-file deadlines and a memory cap.
+# A page that hangs or exhausts memory gets the worker killed; the page is skipped and a
+# fresh worker resumes after it, so one pathological file cannot stall ingestion.
+import io
+import os
+import time
+import itertools
+import threading
+import multiprocessing
+from typing import List, Dict, Tuple, Optional, Union
+from config.settings import Config
+from src.metrics import metrics
+from src.pdf_extractors import PageErrorCallback
+
+# Exit status of a worker that ran out of memory (reported as reason "memory")
+OUT_OF_MEMORY_EXIT = 75
+
+class ExtractionError(Exception):
+    """The document could not be read (raised in the worker, re-raised in the caller)"""
+
+def _limit_memory(memory_mb: int):
+    if memory_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows; the deadlines still apply
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _open_source(source: Union[bytes, str]):
+    return open(source, "rb") if isinstance(source, str) else io.BytesIO(source)
+
+def _worker_main(conn, memory_mb: int):
+    """Serve extraction requests until the pipe closes: (extractor name, PDF bytes or path, first page, end page)"""
+    _limit_memory(memory_mb)
+    from src.pdf_extractors import create_extractor
+
+    extractors = {}
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        name, source, first_page, end_page = request
+
+        def on_page_error(page_num: int, error: Exception):
+            conn.send(("page_error", page_num, f"{type(error).__name__}: {error}"))
+
+        try:
+            extractor = extractors.get(name) or extractors.setdefault(name, create_extractor(name))
+            with _open_source(source) as pdf:
+                conn.send(("pages", extractor.page_count(pdf)))
+                pdf.seek(0)
+                page_texts = extractor.iter_pages(pdf, on_page_error, first_page)
+                if end_page is not None:
+                    page_texts = itertools.islice(page_texts, max(0, end_page - first_page))
+                for page_num, page_text in enumerate(page_texts, first_page):
+                    conn.send(("page", page_num, page_text))
+            conn.send(("done",))
+        except MemoryError:
+            # The heap may be in any state; let the caller skip the page and start a fresh worker
+            os._exit(OUT_OF_MEMORY_EXIT)
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+class IsolatedExtractor:
+    """Runs PDF extractors in a reusable worker process that is killed when a deadline passes
+
+    extract_pages returns the text of every page ("" for skipped ones and, with max_pages,
+    for the pages after the first max_pages) and the skipped
+    pages with the reason: "timeout" (page deadline), "file_timeout", "memory" (the
+    memory limit), "crashed" or "error".
+    """
+
+    def __init__(self, page_timeout: float = None, file_timeout: float = None, memory_mb: int = None):
+        self.page_timeout = Config.EXTRACTION_PAGE_TIMEOUT if page_timeout is None else page_timeout
+        self.file_timeout = Config.EXTRACTION_FILE_TIMEOUT if file_timeout is None else file_timeout
+        self.memory_mb = Config.EXTRACTION_MEMORY_MB if memory_mb is None else memory_mb
+        self._process = None
+        self._conn = None
+        # One file at a time per worker
+        self._lock = threading.Lock()
+
+    def _start(self):
+        # Spawned, not forked: the parent may hold the embedding model and running threads
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_worker_main, args=(child_conn, self.memory_mb), daemon=True)
+        try:
+            self._process.start()
+        except BaseException:
+            # Leave no half-started worker behind, so the next file starts a new one
+            self._kill()
+            raise
+        finally:
+            child_conn.close()
+
+    def _kill(self):
+        # A process whose start() failed has no pid and cannot be killed
+        if self._process is not None and self._process.pid is not None:
+            self._process.kill()
+            self._process.join()
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def close(self):
+        with self._lock:
+            self._kill()
+
+    def extract_pages(
+        self,
+        extractor_name: str,
+        source: Union[bytes, str],
+        on_page_error: Optional[PageErrorCallback] = None,
+        max_pages: Optional[int] = None
+    ) -> Tuple[List[str], Dict[int, str]]:
+        """(text of every page, {page index: reason} for skipped pages) of PDF bytes or a file path; raises ExtractionError"""
+        with self._lock:
+            pages: Dict[int, str] = {}
+            skipped: Dict[int, str] = {}
+            page_count, end_page, next_page = None, None, 0
+            file_deadline = time.monotonic() + self.file_timeout
+
+            while page_count is None or next_page < end_page:
+                if self._process is None or not self._process.is_alive():
+                    self._kill()
+                    self._start()
+                # A path is sent as is, so restarting after a skipped page does not copy the file again
+                self._conn.send((extractor_name, source, next_page, max_pages))
+                finished = False
+                while not finished:
+                    remaining = file_deadline - time.monotonic()
+                    if remaining <= 0 or not self._conn.poll(min(self.page_timeout, remaining)):
+                        self._kill()
+                        if page_count is None:
+                            raise ExtractionError(f"Timed out opening the PDF with {extractor_name}")
+                        if time.monotonic() >= file_deadline:
+                            skipped.update({page_num: "file_timeout" for page_num in range(next_page, end_page)})
+                            next_page = end_page
+                        else:
+                            skipped[next_page] = "timeout"
+                            next_page += 1
+                        break
+                    try:
+                        message = self._conn.recv()
+                    except (EOFError, OSError):
+                        self._process.join(1)
+                        exitcode = self._process.exitcode
+                        self._kill()
+                        if page_count is None:
+                            raise ExtractionError(f"Extraction worker exited with code {exitcode} while opening the PDF")
+                        skipped[next_page] = "memory" if exitcode == OUT_OF_MEMORY_EXIT else "crashed"
+                        next_page += 1
+                        break
+
+                    kind = message[0]
+                    if kind == "pages":
+                        page_count = message[1]
+                        end_page = page_count if max_pages is None else min(page_count, max_pages)
+                    elif kind == "page":
+                        pages[message[1]] = message[2]
+                        next_page = message[1] + 1
+                    elif kind == "page_error":
+                        skipped[message[1]] = "error"
+                        if on_page_error:
+                            on_page_error(message[1], ExtractionError(message[2]))
+                    elif kind == "error":
+                        raise ExtractionError(message[1])
+                    else:
+                        # "done": fewer pages than counted is not an error
+                        finished = True
+                        next_page = max(next_page, end_page)
+
+            for reason in skipped.values():
+                metrics.inc("rag_pages_skipped_total", reason=reason)
+            return [pages.get(page_num, "") for page_num in range(page_count)], skipped
+
+# Global instance
+isolated_extractor = IsolatedExtractor()
@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+from config.settings import Config
+
+SUPPORTED_BACKENDS = ("groq", "openai", "fake")
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic in-process chat model with configurable latency and token rate
+
+    The answer is derived from a hash of the prompt plus its first words, so identical
+    prompts always get identical answers. Simulated model time is tracked so callers can
+    separate our own overhead from (fake) model time.
+    """
+
+    model_name: str = "fake"
+    latency_ms: float = 200.0
+    tokens_per_second: float = 200.0
+    response_tokens: int = 128
+
+    _model_seconds: float = PrivateAttr(default=0.0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _response_tokens(self, messages: List[BaseMessage]) -> List[str]:
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        words = prompt.split()
+        return [f"[fake-{digest}]"] + words[:max(0, self.response_tokens - 1)]
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _usage(self, messages: List[BaseMessage], tokens: List[str]) -> dict:
+        prompt_tokens = sum(len(str(message.content)) // 4 for message in messages)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+
+    def _record(self, seconds: float):
+        with self._lock:
+            self._model_seconds += seconds
+
+    def model_seconds(self) -> float:
+        """Total simulated model time spent so far"""
+        return self._model_seconds
+
+    def _result(self, messages: List[BaseMessage], tokens: List[str]) -> ChatResult:
+        message = AIMessage(content=" ".join(tokens))
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"token_usage": self._usage(messages, tokens), "model_name": self.model_name},
+        )
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = self._response_tokens(messages)
+        seconds = self.latency_ms / 1000.0 + len(tokens) * self._token_delay()
+        time.sleep(seconds)
+        self._record(seconds)
+        return self._result(messages, tokens)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = self._response_tokens(messages)
+        seconds = self.latency_ms / 1000.0 + len(tokens) * self._token_delay()
+        await asyncio.sleep(seconds)
+        self._record(seconds)
+        return self._result(messages, tokens)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency_ms / 1000.0)
+        self._record(self.latency_ms / 1000.0)
+        for i, token in enumerate(self._response_tokens(messages)):
+            time.sleep(self._token_delay())
+            self._record(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token if i == 0 else " " + token))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency_ms / 1000.0)
+        self._record(self.latency_ms / 1000.0)
+        for i, token in enumerate(self._response_tokens(messages)):
+            await asyncio.sleep(self._token_delay())
+            self._record(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token if i == 0 else " " + token))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+def create_chat_model(backend: str, model_name: str) -> BaseChatModel:
+    """Construct a chat model client for the given backend"""
+    if backend == "groq":
+        from langchain_groq import ChatGroq
+        return ChatGroq(
+            groq_api_key=Config.GROQ_API_KEY,
+            model_name=model_name,
+        )
+
+    if backend == "openai":
+        # Any OpenAI-compatible server (vLLM, llama.cpp, Ollama, LM Studio, ...)
+        try:
+            from langchain_openai import ChatOpenAI
+        except ImportError as e:
+            raise ImportError(
+                "The 'openai' LLM backend requires langchain-openai. Install it with: pip install langchain-openai"
+            ) from e
+        return ChatOpenAI(
+            base_url=Config.LLM_BASE_URL,
+            api_key=Config.LLM_API_KEY or "not-needed",
+            model=model_name,
+        )
+
+    if backend == "fake":
+        return FakeChatModel(
+            model_name=model_name,
+            latency_ms=Config.FAKE_LLM_LATENCY_MS,
+            tokens_per_second=Config.FAKE_LLM_TOKENS_PER_SECOND,
+            response_tokens=Config.FAKE_LLM_RESPONSE_TOKENS,
+        )
+
+    raise ValueError(f"Unknown LLM backend '{backend}'. Supported backends: {', '.join(SUPPORTED_BACKENDS)}")
+
+# Shared client pool: one client per (backend, model), reused by every chain and session in the process
+_chat_models = {}
+_chat_models_lock = threading.Lock()
+
+def get_chat_model(model_name: str, backend: Optional[str] = None) -> BaseChatModel:
+    """Return the process-wide chat model client for model_name on the configured backend"""
+    backend = backend or Config.LLM_BACKEND
+    with _chat_models_lock:
+        key = (backend, model_name)
+        if key not in _chat_models:
+            _chat_models[key] = create_chat_model(backend, model_name)
+        return _chat_models[key]
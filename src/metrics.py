@@ -0,0 +1,158 @@
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# Histogram buckets for stage durations, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in items)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(items, escaped)) + "}"
+
+class MetricsRegistry:
+    """In-process counters and duration histograms with Prometheus text exposition"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, Dict]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        """Register the HELP text of a metric"""
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increase a counter"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record a value in a histogram"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                series[key] = histogram
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        """Time a pipeline stage and record it in rag_stage_duration_seconds"""
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self.observe("rag_stage_duration_seconds", time.perf_counter() - started, stage=stage, status=status, **labels)
+
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, total and mean seconds per stage (successful spans only)"""
+        summary = {}
+        with self._lock:
+            for key, histogram in self._histograms.get("rag_stage_duration_seconds", {}).items():
+                labels = dict(key)
+                if labels.get("status") != "ok":
+                    continue
+                entry = summary.setdefault(labels["stage"], {"count": 0, "seconds": 0.0})
+                entry["count"] += histogram["count"]
+                entry["seconds"] += histogram["sum"]
+        for entry in summary.values():
+            entry["mean_seconds"] = entry["seconds"] / entry["count"] if entry["count"] else 0.0
+        return summary
+
+    def counter_value(self, name: str, **labels) -> float:
+        """Current value of a counter series"""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+
+            for name in sorted(self._histograms):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(self._histograms[name].items()):
+                    for bound, count in zip(self.buckets, histogram["buckets"]):
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', repr(bound)))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {histogram['count']}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram['sum']}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+# Global instance
+metrics = MetricsRegistry()
+metrics.describe("rag_stage_duration_seconds", "Duration of pipeline stages (download, extract, chunk, embed, index_write, route, retrieve, prompt_build, llm_call)")
+metrics.describe("rag_llm_tokens_total", "LLM tokens reported by the provider")
+metrics.describe("rag_cache_requests_total", "Cache lookups by cache and result (hit/miss)")
+metrics.describe("rag_pages_total", "PDF pages extracted")
+metrics.describe("rag_pages_skipped_total", "PDF pages skipped by reason (timeout, file_timeout, memory, crashed, error)")
+metrics.describe("rag_extractions_total", "PDF extraction attempts by extractor backend and result (ok/empty/error)")
+metrics.describe("rag_chunks_total", "Text chunks produced by ingestion")
+metrics.describe("rag_documents_total", "Documents ingested")
+metrics.describe("rag_queries_total", "User queries handled")
+metrics.describe("rag_retrieval_gate_total", "Confidence gate decisions (pass, low_confidence_model, template)")
+metrics.describe("rag_model_routes_total", "LLM requests by model tier (fast/large) and routing reason")
+metrics.describe("rag_model_escalations_total", "Fast-tier answers re-asked of the large model, by self-check failure")
+metrics.describe("rag_llm_cost_usd_total", "Estimated LLM spend by model tier (FAST/LARGE_MODEL_COST_PER_MTOK)")
+metrics.describe("rag_query_embedding_batches_total", "Model calls made to embed queries")
+metrics.describe("rag_query_embeddings_total", "Queries embedded (cache misses)")
+metrics.describe("rag_http_requests_total", "HTTP API requests by endpoint and status")
+metrics.describe("rag_summaries_total", "Per-paper summaries precomputed in the background by result")
+metrics.describe("rag_http_request_duration_seconds", "HTTP API request duration by endpoint (until the last byte of a stream)")
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+def start_metrics_server(port: int, host: str = "0.0.0.0"):
+    """Serve /metrics on a background thread (once per process)"""
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_metrics_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _metrics_server
@@ -0,0 +1,77 @@
+import re
+from typing import Dict, Optional, Tuple
+from config.settings import Config
+from src.metrics import metrics
+
+FAST = "fast"
+LARGE = "large"
+
+# Questions that relate, explain or condense material rather than look something up
+SYNTHESIS_PATTERN = re.compile(
+    r"\b(compar\w*|contrast\w*|differen\w*|summar\w*|overview|why|discuss\w*|analy[sz]\w*|evaluat\w*|"
+    r"critique|critici[sz]\w*|implications?|trade-?offs?|pros and cons|relationship|strengths?|weakness\w*)\b",
+    re.IGNORECASE
+)
+
+# A fast answer that gives up or hedges is asked again of the large model
+UNCERTAIN_PATTERN = re.compile(
+    r"not available in the provided|i('m| am) not sure|cannot (be )?determined?|unable to (find|determine|answer)|"
+    r"i do(n't| not) know|not clear from the",
+    re.IGNORECASE
+)
+
+class ModelCascade:
+    """Picks the model tier of each LLM request and accounts for it per tier
+
+    Summaries, synthesis questions (compare, why, discuss, ...), long questions and large
+    contexts go to LARGE_MODEL_NAME; the remaining questions are lookups for FAST_MODEL_NAME.
+    A fast answer that fails the self-check is escalated to the large model. With both
+    tiers set to the same model, every request goes to the large tier.
+    """
+
+    def __init__(self):
+        self.models: Dict[str, str] = {FAST: Config.FAST_MODEL_NAME, LARGE: Config.LARGE_MODEL_NAME}
+        self.costs: Dict[str, float] = {FAST: Config.FAST_MODEL_COST_PER_MTOK, LARGE: Config.LARGE_MODEL_COST_PER_MTOK}
+        self.max_question_words = Config.CASCADE_FAST_MAX_QUESTION_WORDS
+        self.max_context_tokens = Config.CASCADE_FAST_MAX_CONTEXT_TOKENS
+        self.escalation = Config.CASCADE_ESCALATION
+
+    @property
+    def enabled(self) -> bool:
+        return self.models[FAST] != self.models[LARGE]
+
+    def route(self, kind: str, question: str = "", context_tokens: int = 0) -> Tuple[str, str]:
+        """(tier, reason) for a "qa" or "summarization" request"""
+        if not self.enabled:
+            tier, reason = LARGE, "single_model"
+        elif kind != "qa":
+            tier, reason = LARGE, kind
+        elif len(question.split()) > self.max_question_words:
+            tier, reason = LARGE, "long_question"
+        elif context_tokens > self.max_context_tokens:
+            tier, reason = LARGE, "large_context"
+        elif SYNTHESIS_PATTERN.search(question):
+            tier, reason = LARGE, "synthesis"
+        else:
+            tier, reason = FAST, "lookup"
+        metrics.inc("rag_model_routes_total", tier=tier, reason=reason)
+        return tier, reason
+
+    def self_check(self, answer: str) -> Optional[str]:
+        """Why a fast answer should be escalated ("empty" or "uncertain"), or None to keep it"""
+        if not self.escalation:
+            return None
+        if not answer.strip():
+            return "empty"
+        if UNCERTAIN_PATTERN.search(answer):
+            return "uncertain"
+        return None
+
+    def record_cost(self, tier: str, tokens: int):
+        """Add the price of a call's tokens to rag_llm_cost_usd_total"""
+        cost = tokens * self.costs.get(tier, 0.0) / 1_000_000
+        if cost:
+            metrics.inc("rag_llm_cost_usd_total", cost, tier=tier)
+
+# Global instance
+model_cascade = ModelCascade()
@@ -0,0 +1,179 @@
+# ONNX Runtime embedding backend. Export the model once with torch installed:
+#     python -m src.onnx_embeddings export --quantize --check
+# Serving then only needs onnxruntime and tokenizers.
+import os
+import json
+import argparse
+from typing import List, Dict
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from config.settings import Config
+
+EXPORT_CONFIG_FILE = "embedding_config.json"
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+
+def default_export_dir(model_name: str) -> str:
+    """Export location for a model under ONNX_MODEL_DIR"""
+    return os.path.join(Config.ONNX_MODEL_DIR, model_name.replace("/", "__"))
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence embeddings computed with onnxruntime from an exported transformer plus pooling"""
+
+    def __init__(self, model_dir: str, quantized: bool = False, batch_size: int = 32, threads: int = 0):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The 'onnx' embedding backend requires onnxruntime and tokenizers. "
+                "Install them with: pip install onnxruntime tokenizers"
+            ) from e
+
+        config_path = os.path.join(model_dir, EXPORT_CONFIG_FILE)
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(
+                f"No exported ONNX model in {model_dir}. Create it with: python -m src.onnx_embeddings export"
+            )
+        with open(config_path, "r", encoding="utf-8") as f:
+            self.export_config = json.load(f)
+
+        model_path = os.path.join(model_dir, QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"{model_path} not found. Re-export with{' --quantize' if quantized else ''}: python -m src.onnx_embeddings export"
+            )
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.export_config["max_seq_length"])
+        self.tokenizer.enable_padding()
+        self.batch_size = batch_size
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.asarray([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.asarray([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.asarray([e.type_ids for e in encodings], dtype=np.int64)
+
+        hidden = self.session.run(None, inputs)[0]
+        if self.export_config["pooling"] == "cls":
+            vectors = hidden[:, 0]
+        else:
+            mask = attention_mask[:, :, None].astype(np.float32)
+            vectors = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        # Always unit length, like the torch backend, even for models without a Normalize module
+        vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors.astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Sort by length so each batch pads to similar lengths, then restore the order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.zeros((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            batch_vectors = self._embed_batch([texts[i] for i in batch])
+            if vectors.shape[1] == 0:
+                vectors = np.zeros((len(texts), batch_vectors.shape[1]), dtype=np.float32)
+            vectors[batch] = batch_vectors
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = False, opset: int = 14) -> str:
+    """Export a sentence-transformers model to ONNX (and optionally a dynamic int8 copy)"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+
+    # Only the inputs the model takes: MPNet and RoBERTa-family models have no token_type_ids
+    sample = model.tokenizer(["An example sentence"], return_tensors="pt")
+    input_names = [name for name in model.tokenizer.model_input_names if name in sample]
+
+    class _LastHiddenState(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *inputs):
+            return self.inner(**dict(zip(input_names, inputs)))[0]
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    model_path = os.path.join(output_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            _LastHiddenState(transformer),
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    model.tokenizer.save_pretrained(output_dir)
+
+    # Pooling and normalization follow the sentence-transformers module list
+    module_names = [type(module).__name__ for module in model]
+    pooling = "mean"
+    for module in model:
+        if type(module).__name__ == "Pooling" and module.get_config_dict().get("pooling_mode_cls_token"):
+            pooling = "cls"
+    with open(os.path.join(output_dir, EXPORT_CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "model_name": model_name,
+            "pooling": pooling,
+            "normalize": "Normalize" in module_names,
+            "max_seq_length": model.max_seq_length,
+        }, f, indent=2)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(model_path, os.path.join(output_dir, QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+    return output_dir
+
+def parity_check(reference: Embeddings, candidate: Embeddings, texts: List[str]) -> Dict[str, float]:
+    """Cosine agreement between two embedding backends on the same texts"""
+    a = np.asarray(reference.embed_documents(texts), dtype=np.float32)
+    b = np.asarray(candidate.embed_documents(texts), dtype=np.float32)
+    cosine = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return {"mean_cosine": float(cosine.mean()), "min_cosine": float(cosine.min()), "texts": len(texts)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="Export (and optionally quantize) the embedding model")
+    export.add_argument("--model", default=Config.EMBEDDING_MODEL)
+    export.add_argument("--output", help="Export directory (default: ONNX_MODEL_DIR/<model>)")
+    export.add_argument("--quantize", action="store_true", help="Also write a dynamic int8 model")
+    export.add_argument("--check", action="store_true", help="Compare the export with the torch model")
+    args = parser.parse_args()
+
+    output_dir = export_onnx(args.model, args.output or default_export_dir(args.model), quantize=args.quantize)
+    print(f"Exported {args.model} to {output_dir}")
+
+    if args.check:
+        from src.embedding_backends import create_embeddings
+        reference = create_embeddings(args.model, backend="torch")
+        texts = [
+            "Transformers use self-attention to model long-range dependencies.",
+            "We evaluate retrieval quality with hit rate at k on a held-out set.",
+            "The references section lists prior work on contrastive pretraining.",
+        ]
+        for quantized in ([False, True] if args.quantize else [False]):
+            result = parity_check(reference, OnnxEmbeddings(output_dir, quantized=quantized), texts)
+            print(f"{'int8' if quantized else 'fp32'}: mean cosine {result['mean_cosine']:.4f}, min {result['min_cosine']:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import io
+import itertools
+import threading
+import importlib.util
+from typing import List, BinaryIO, Callable, Optional, Iterator
+from config.settings import Config
+
+SUPPORTED_PDF_EXTRACTORS = ("auto", "pypdfium2", "pdfminer", "pypdf2")
+
+# Used by the "auto" setting when installed; pdfminer is slower than PyPDF2, so it is opt-in
+FAST_EXTRACTORS = ("pypdfium2",)
+
+PageErrorCallback = Callable[[int, Exception], None]
+
+class PdfExtractor:
+    """Extracts the raw text of every page of a PDF
+
+    iter_pages yields one string per page from first_page on ("" for a page without
+    text) and raises when the document itself cannot be read. A failing page is
+    reported through on_page_error(page_index, error) and left empty.
+    """
+
+    name = ""
+
+    def page_count(self, pdf: BinaryIO) -> int:
+        raise NotImplementedError
+
+    def iter_pages(self, pdf: BinaryIO, on_page_error: Optional[PageErrorCallback] = None, first_page: int = 0) -> Iterator[str]:
+        raise NotImplementedError
+
+    def extract_pages(self, pdf: BinaryIO, on_page_error: Optional[PageErrorCallback] = None, max_pages: Optional[int] = None) -> List[str]:
+        """Text of every page; with max_pages, the pages after the first max_pages are left empty"""
+        if max_pages is None:
+            return list(self.iter_pages(pdf, on_page_error))
+        page_count = self.page_count(pdf)
+        pdf.seek(0)
+        pages = list(itertools.islice(self.iter_pages(pdf, on_page_error), max_pages))
+        return pages + [""] * (page_count - len(pages))
+
+class PyPDF2Extractor(PdfExtractor):
+    """Pure-Python extraction with PyPDF2 (the reference backend)"""
+
+    name = "pypdf2"
+
+    def page_count(self, pdf: BinaryIO) -> int:
+        from PyPDF2 import PdfReader
+        return len(PdfReader(pdf).pages)
+
+    def iter_pages(self, pdf: BinaryIO, on_page_error: Optional[PageErrorCallback] = None, first_page: int = 0) -> Iterator[str]:
+        from PyPDF2 import PdfReader
+
+        pages = PdfReader(pdf).pages
+        for page_num in range(first_page, len(pages)):
+            try:
+                page_text = pages[page_num].extract_text() or ""
+            except Exception as e:
+                if on_page_error:
+                    on_page_error(page_num, e)
+                page_text = ""
+            yield page_text
+
+class PdfiumExtractor(PdfExtractor):
+    """Extraction with PDFium (pypdfium2), native and several times faster than PyPDF2"""
+
+    name = "pypdfium2"
+    # PDFium is not thread-safe; documents are extracted one at a time per process
+    _lock = threading.Lock()
+
+    def page_count(self, pdf: BinaryIO) -> int:
+        import pypdfium2
+
+        with self._lock:
+            document = pypdfium2.PdfDocument(pdf.read())
+            try:
+                return len(document)
+            finally:
+                document.close()
+
+    def _page_text(self, document, page_num: int) -> str:
+        page = document[page_num]
+        try:
+            textpage = page.get_textpage()
+            # PDFium marks words hyphenated across lines with U+FFFE; join them back
+            page_text = textpage.get_text_range().replace("\r\n", "\n").replace("\ufffe", "")
+            textpage.close()
+            return page_text
+        finally:
+            page.close()
+
+    def iter_pages(self, pdf: BinaryIO, on_page_error: Optional[PageErrorCallback] = None, first_page: int = 0) -> Iterator[str]:
+        import pypdfium2
+
+        with self._lock:
+            document = pypdfium2.PdfDocument(pdf.read())
+            try:
+                for page_num in range(first_page, len(document)):
+                    try:
+                        page_text = self._page_text(document, page_num)
+                    except Exception as e:
+                        if on_page_error:
+                            on_page_error(page_num, e)
+                        page_text = ""
+                    yield page_text
+            finally:
+                document.close()
+
+class PdfminerExtractor(PdfExtractor):
+    """Extraction with pdfminer.six, reusing parsed fonts and resources across pages"""
+
+    name = "pdfminer"
+
+    def page_count(self, pdf: BinaryIO) -> int:
+        from pdfminer.pdfpage import PDFPage
+        return sum(1 for _ in PDFPage.get_pages(pdf))
+
+    def iter_pages(self, pdf: BinaryIO, on_page_error: Optional[PageErrorCallback] = None, first_page: int = 0) -> Iterator[str]:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        output = io.StringIO()
+        resources = PDFResourceManager(caching=True)
+        device = TextConverter(resources, output, laparams=LAParams())
+        interpreter = PDFPageInterpreter(resources, device)
+        try:
+            # Skipped pages are only parsed, not laid out
+            for page_num, page in enumerate(itertools.islice(PDFPage.get_pages(pdf), first_page, None), first_page):
+                try:
+                    interpreter.process_page(page)
+                    page_text = output.getvalue()
+                except Exception as e:
+                    if on_page_error:
+                        on_page_error(page_num, e)
+                    page_text = ""
+                output.seek(0)
+                output.truncate(0)
+                yield page_text
+        finally:
+            device.close()
+
+EXTRACTORS = {extractor.name: extractor for extractor in (PdfiumExtractor, PdfminerExtractor, PyPDF2Extractor)}
+
+def is_available(name: str) -> bool:
+    """Whether the package behind an extractor is installed"""
+    module = {"pypdfium2": "pypdfium2", "pdfminer": "pdfminer", "pypdf2": "PyPDF2"}[name]
+    return importlib.util.find_spec(module) is not None
+
+def create_extractor(name: str) -> PdfExtractor:
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor '{name}'. Supported extractors: {', '.join(SUPPORTED_PDF_EXTRACTORS)}")
+    if not is_available(name):
+        raise ImportError(f"The '{name}' PDF extractor is not installed. Install it with: pip install {'pdfminer.six' if name == 'pdfminer' else name}")
+    return EXTRACTORS[name]()
+
+def extractor_chain(name: str = None) -> List[PdfExtractor]:
+    """Extractors to try for each file, in order: the configured one, then PyPDF2 as the fallback"""
+    name = (name or Config.PDF_EXTRACTOR).lower()
+    if name == "auto":
+        name = next((fast for fast in FAST_EXTRACTORS if is_available(fast)), "pypdf2")
+    chain = [create_extractor(name)]
+    if name != "pypdf2":
+        chain.append(PyPDF2Extractor())
+    return chain
@@ -1,8 +1,27 @@
 import streamlit as st
-from PyPDF2 import PdfReader
+import os
+import hashlib
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List, BinaryIO
+from typing import List, BinaryIO, Dict, Optional, Tuple, Callable
 from config.settings import Config
+from src.metrics import metrics
+from src.pdf_extractors import extractor_chain, PdfExtractor, PageErrorCallback
+from src.isolated_extraction import isolated_extractor
+from src.upload_staging import StagedPDF
+from src.chunking import section_chunker
+from utils.text_utils import normalize_pages
+
+def file_sha256(pdf: BinaryIO) -> str:
+    """SHA-256 of the file contents"""
+    if isinstance(pdf, StagedPDF):
+        # Hashed when it was staged
+        return pdf.sha256
+    pdf.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: pdf.read(1 << 20), b""):
+        digest.update(block)
+    pdf.seek(0)
+    return digest.hexdigest()
 
 class PDFProcessor:
     def __init__(self):
@@ -11,52 +30,138 @@ class PDFProcessor:
             chunk_size=self.config.CHUNK_SIZE,
             chunk_overlap=self.config.CHUNK_OVERLAP
         )
+        # The configured extractor, then PyPDF2 for files it cannot read
+        self.extractors = extractor_chain(self.config.PDF_EXTRACTOR)
+    
+    def _extract_text_from_pdf(self, pdf: BinaryIO) -> str:
+        """Extract text from a single PDF"""
+        return self._extract_document(pdf)[0]
+    
+    def _extract_document(self, pdf: BinaryIO, max_pages: Optional[int] = None) -> Tuple[str, Dict]:
+        """Text of a single PDF (its first max_pages pages, if given) and its page count and skipped (1-based) page numbers"""
+        with metrics.span("extract"):
+            return self._extract_pages(pdf, max_pages)
+    
+    def _extract_pages(self, pdf: BinaryIO, max_pages: Optional[int] = None) -> Tuple[str, Dict]:
+        """Extract and join the text of every page of a PDF, listing any problems in the info's errors"""
+        text = ""
+        info = {"pages": 0, "skipped_pages": [], "errors": []}
+        try:
+            # Reset file pointer to beginning
+            pdf.seek(0)
+            
+            # Check if file is empty
+            if pdf.read(1) == b'':
+                info["errors"].append("The file is empty")
+                return text, info
+            
+            pages, skipped, errors = self._extract_with_fallback(pdf, max_pages)
+            info = {"pages": len(pages), "skipped_pages": sorted(page_num + 1 for page_num in skipped), "errors": errors}
+            
+            # Check if PDF has pages
+            if len(pages) == 0:
+                info["errors"].append("The PDF has no pages")
+                return text, info
+            
+            metrics.inc("rag_pages_total", len(pages) if max_pages is None else min(len(pages), max_pages))
+            page_texts = (page_text for page_text in pages if page_text and page_text.strip())
+            if self.config.TEXT_NORMALIZATION:
+                page_texts = normalize_pages(page_texts)
+            text = "".join(page_text + "\n" for page_text in page_texts if page_text)
+        
+        except Exception as e:
+            error_msg = str(e)
+            if "EOF marker not found" in error_msg:
+                info["errors"].append("Corrupted PDF file. The file may be incomplete or damaged.")
+            elif "not a PDF file" in error_msg.lower():
+                info["errors"].append("Invalid PDF file. The file is not a valid PDF.")
+            else:
+                info["errors"].append(f"Error reading the file: {e}")
+        return text, info
+    
+    def _run_extractor(
+        self,
+        extractor: PdfExtractor,
+        pdf: BinaryIO,
+        on_page_error: PageErrorCallback,
+        max_pages: Optional[int] = None
+    ) -> Tuple[List[str], Dict[int, str]]:
+        """Page texts and {page index: reason} of skipped pages from one extractor"""
+        if self.config.EXTRACTION_ISOLATION:
+            # In a worker process with page/file deadlines and a memory limit; staged files are opened there by path
+            source = pdf.path if isinstance(pdf, StagedPDF) else pdf.read()
+            return isolated_extractor.extract_pages(extractor.name, source, on_page_error, max_pages)
+        
+        skipped = {}
+        
+        def record_error(page_num: int, page_error: Exception):
+            skipped[page_num] = "error"
+            on_page_error(page_num, page_error)
+        
+        return extractor.extract_pages(pdf, record_error, max_pages), skipped
+    
+    def _extract_with_fallback(self, pdf: BinaryIO, max_pages: Optional[int] = None) -> Tuple[List[str], Dict[int, str], List[str]]:
+        """Raw text of every page from the first extractor that reads any text from the file, with its skipped pages and errors
+        
+        Errors of the last extractor tried (PyPDF2) are raised if none succeeds.
+        """
+        errors: List[str] = []
+        
+        def on_page_error(page_num: int, page_error: Exception):
+            errors.append(f"Error extracting text from page {page_num + 1}: {page_error}")
+        
+        pages, skipped, error = [], {}, None
+        for extractor in self.extractors:
+            pdf.seek(0)
+            # Only the problems of the extractor whose pages are used are reported
+            errors.clear()
+            try:
+                pages, skipped = self._run_extractor(extractor, pdf, on_page_error, max_pages)
+                error = None
+            except Exception as e:
+                metrics.inc("rag_extractions_total", backend=extractor.name, result="error")
+                pages, skipped, error = [], {}, e
+                continue
+            if any(page_text.strip() for page_text in pages):
+                metrics.inc("rag_extractions_total", backend=extractor.name, result="ok")
+                break
+            # Scanned or unusually encoded: no text, so the next extractor gets a try
+            metrics.inc("rag_extractions_total", backend=extractor.name, result="empty")
+        
+        if error is not None:
+            raise error
+        
+        # Failing pages were reported one by one; pages cut off by a deadline or crash are summarized here
+        killed = sorted(page_num + 1 for page_num, reason in skipped.items() if reason != "error")
+        if killed:
+            listed = ", ".join(str(page_num) for page_num in killed[:20]) + (", ..." if len(killed) > 20 else "")
+            errors.append(f"Skipped {len(killed)} page(s) that timed out or crashed the extractor: {listed}")
+        return pages, skipped, errors
     
     def extract_text_from_pdfs(self, pdf_files: List[BinaryIO]) -> str:
         """Extract text from uploaded PDFs"""
         text = ""
         for pdf in pdf_files:
-            try:
-                # Reset file pointer to beginning
-                pdf.seek(0)
-                
-                # Check if file is empty
-                if pdf.read(1) == b'':
-                    st.warning(f"File {getattr(pdf, 'name', 'unknown')} is empty")
-                    continue
-                
-                # Reset file pointer again
-                pdf.seek(0)
-                
-                pdf_reader = PdfReader(pdf)
-                
-                # Check if PDF has pages
-                if len(pdf_reader.pages) == 0:
-                    st.warning(f"PDF {getattr(pdf, 'name', 'unknown')} has no pages")
-                    continue
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text and page_text.strip():
-                            text += page_text + "\n"
-                    except Exception as page_error:
-                        st.warning(f"Error extracting text from page {page_num + 1} of {getattr(pdf, 'name', 'unknown')}: {page_error}")
-                        continue
-                        
-            except Exception as e:
-                error_msg = str(e)
-                if "EOF marker not found" in error_msg:
-                    st.error(f"Corrupted PDF file: {getattr(pdf, 'name', 'unknown')}. The file may be incomplete or damaged.")
-                elif "not a PDF file" in error_msg.lower():
-                    st.error(f"Invalid PDF file: {getattr(pdf, 'name', 'unknown')}. The file is not a valid PDF.")
-                else:
-                    st.error(f"Error reading {getattr(pdf, 'name', 'unknown')}: {e}")
+            text += self._extract_text_from_pdf(pdf)
         return text
+                
+    def _document_id(self, pdf: BinaryIO) -> str:
+        """Derive a stable document id from the file contents"""
+        return file_sha256(pdf)[:16]
+    
+    def chunk_text(self, text: str) -> List[Dict[str, str]]:
+        """Split text into chunks with the configured strategy, tagging each with its section when known"""
+        with metrics.span("chunk", strategy=self.config.CHUNKING_STRATEGY):
+            if self.config.CHUNKING_STRATEGY == "sections":
+                chunks = section_chunker.split(text)
+            else:
+                chunks = [{"text": chunk} for chunk in self.text_splitter.split_text(text)]
+        metrics.inc("rag_chunks_total", len(chunks))
+        return chunks
     
     def split_text_into_chunks(self, text: str) -> List[str]:
         """Split long text into smaller chunks"""
-        return self.text_splitter.split_text(text)
+        return [chunk["text"] for chunk in self.chunk_text(text)]
     
     def process_pdfs(self, pdf_files: List[BinaryIO]) -> List[str]:
         """Complete PDF processing pipeline"""
@@ -73,10 +178,65 @@ class PDFProcessor:
         # Split into chunks
         text_chunks = self.split_text_into_chunks(raw_text)
         return text_chunks
+    
+    def process_documents(
+        self,
+        pdf_files: List[BinaryIO],
+        metadata: Optional[List[Dict]] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        max_pages: Optional[int] = None,
+        errors: Optional[Dict[str, List[str]]] = None
+    ) -> Tuple[List[str], List[Dict]]:
+        """Process PDFs one document at a time, tagging every chunk with its document metadata
+        
+        progress_callback(done, total, name) is called after each file. With max_pages, only
+        the first max_pages pages of each file are processed and recorded as "pages_indexed".
+        Problems met while reading a file are added to errors[name] when errors is given.
+        """
+        text_chunks: List[str] = []
+        metadatas: List[Dict] = []
+        if not pdf_files:
+            return text_chunks, metadatas
+        
+        for idx, pdf in enumerate(pdf_files):
+            name = os.path.basename(getattr(pdf, 'name', 'unknown'))
+            text, extraction = self._extract_document(pdf, max_pages)
+            if progress_callback:
+                progress_callback(idx + 1, len(pdf_files), name)
+            if extraction["errors"] and errors is not None:
+                errors.setdefault(name, []).extend(extraction["errors"])
+            if not text.strip():
+                continue
+            
+            doc_metadata = dict(metadata[idx]) if metadata and metadata[idx] else {}
+            doc_metadata.setdefault("title", name)
+            doc_metadata["source"] = name
+            doc_metadata["doc_id"] = self._document_id(pdf)
+            doc_metadata["pages"] = extraction["pages"]
+            if max_pages is not None and extraction["pages"] > max_pages:
+                doc_metadata["pages_indexed"] = max_pages
+            if extraction["skipped_pages"]:
+                doc_metadata["skipped_pages"] = extraction["skipped_pages"]
+            
+            for chunk_num, chunk in enumerate(self.chunk_text(text)):
+                text_chunks.append(chunk["text"])
+                metadatas.append({**doc_metadata, "chunk": chunk_num, **({"section": chunk["section"]} if "section" in chunk else {})})
+            metrics.inc("rag_documents_total")
+        
+        return text_chunks, metadatas
 
 # Global instance
 pdf_processor = PDFProcessor()
 
 def process_pdfs(pdf_files: List[BinaryIO]) -> List[str]:
     """Process PDFs and return text chunks"""
-    return pdf_processor.process_pdfs(pdf_files)
\ No newline at end of file
+    return pdf_processor.process_pdfs(pdf_files)
+
+def process_documents(
+    pdf_files: List[BinaryIO],
+    metadata: Optional[List[Dict]] = None,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    errors: Optional[Dict[str, List[str]]] = None
+) -> Tuple[List[str], List[Dict]]:
+    """Process PDFs and return text chunks with per-chunk document metadata"""
+    return pdf_processor.process_documents(pdf_files, metadata, progress_callback, errors=errors)
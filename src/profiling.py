@@ -0,0 +1,168 @@
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+from config.settings import Config
+
+PROFILING_MODES = ("cprofile", "sampling")
+
+_prune_lock = threading.Lock()
+_last_prune = 0.0
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """Periodically sample one thread's stack and aggregate collapsed (flamegraph) stacks"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path: str):
+        """Write stacks in the collapsed format read by flamegraph.pl and speedscope"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+def profiling_mode(query_params: Optional[Dict] = None) -> Optional[str]:
+    """Return the profiling mode requested by env var or, in admin mode, by a ?profile=<mode> query parameter"""
+    requested = (query_params or {}).get("profile") if Config.ADMIN_MODE else None
+    requested = requested or Config.PROFILING_MODE
+    if not requested or requested.lower() in ("0", "false", "off", "none"):
+        return None
+    requested = requested.lower()
+    if requested in ("1", "true", "on"):
+        return "cprofile"
+    return requested if requested in PROFILING_MODES else None
+
+@contextmanager
+def profile_request(label: str, mode: Optional[str]):
+    """Profile the wrapped request and store the results under Config.PROFILE_DIR
+
+    "cprofile" writes a .pstats file plus collapsed stacks from a concurrent sampler;
+    "sampling" runs only the low-overhead sampler. mode=None disables profiling.
+    """
+    if mode not in PROFILING_MODES:
+        yield None
+        return
+
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    prune_profiles()
+    safe_label = re.sub(r"[^A-Za-z0-9_-]+", "-", label).strip("-") or "request"
+    base = os.path.join(
+        Config.PROFILE_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}_{safe_label}_{mode}"
+    )
+
+    sampler = SamplingProfiler(threading.get_ident(), Config.PROFILING_SAMPLE_INTERVAL_MS / 1000.0)
+    profiler = cProfile.Profile() if mode == "cprofile" else None
+    started = time.perf_counter()
+    sampler.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield base
+    finally:
+        if profiler:
+            profiler.disable()
+        sampler.stop()
+        if profiler:
+            profiler.dump_stats(base + ".pstats")
+        sampler.write_collapsed(base + ".collapsed")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(f"label: {label}\nmode: {mode}\nseconds: {time.perf_counter() - started:.3f}\n")
+
+def prune_profiles(force: bool = False):
+    """Delete profile files older than PROFILE_RETENTION_HOURS (at most once a minute)"""
+    global _last_prune
+    if Config.PROFILE_RETENTION_HOURS <= 0 or not os.path.isdir(Config.PROFILE_DIR):
+        return
+    now = time.time()
+    with _prune_lock:
+        if not force and now - _last_prune < 60:
+            return
+        _last_prune = now
+        cutoff = now - Config.PROFILE_RETENTION_HOURS * 3600
+        for entry in os.scandir(Config.PROFILE_DIR):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                continue
+
+def list_profiles(limit: int = 50) -> List[Dict]:
+    """List stored profiles, newest first"""
+    if not os.path.isdir(Config.PROFILE_DIR):
+        return []
+    profiles = {}
+    for name in os.listdir(Config.PROFILE_DIR):
+        base, ext = os.path.splitext(name)
+        if ext in (".pstats", ".collapsed", ".txt"):
+            profiles.setdefault(base, {"name": base, "files": {}})["files"][ext] = os.path.join(Config.PROFILE_DIR, name)
+    return sorted(profiles.values(), key=lambda p: p["name"], reverse=True)[:limit]
+
+def top_functions(pstats_path: str, limit: int = 25) -> List[Dict]:
+    """Top functions of a cProfile dump by cumulative time"""
+    stats = pstats.Stats(pstats_path)
+    rows = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{function} ({os.path.basename(filename)}:{line})",
+            "calls": calls,
+            "total_s": round(total, 4),
+            "cumulative_s": round(cumulative, 4),
+        })
+    rows.sort(key=lambda row: row["cumulative_s"], reverse=True)
+    return rows[:limit]
+
+def top_sampled_functions(collapsed_path: str, limit: int = 25) -> List[Dict]:
+    """Functions where sampled time was spent (self) and that were on the stack (inclusive)"""
+    self_samples = Counter()
+    inclusive_samples = Counter()
+    total = 0
+    with open(collapsed_path, "r", encoding="utf-8") as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            count = int(count)
+            frames = stack.split(";")
+            total += count
+            self_samples[frames[-1]] += count
+            for frame in set(frames):
+                inclusive_samples[frame] += count
+
+    return [
+        {
+            "function": function,
+            "self_pct": round(100.0 * count / total, 1),
+            "inclusive_pct": round(100.0 * inclusive_samples[function] / total, 1),
+        }
+        for function, count in self_samples.most_common(limit)
+    ]
@@ -0,0 +1,171 @@
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, BinaryIO, Callable
+from config.settings import Config
+from src.pdf_processor import pdf_processor
+from src.vector_store import vector_store_manager, VectorStoreManager
+from src.upload_staging import StagedPDF, upload_staging
+from src.ingest_ledger import (
+    IngestLedger, ingest_lock, select_new_files, commit_documents, schedule_insights, skipped_pages,
+    add_recoverable_documents, origins_of
+)
+
+def document_coverage(document: Dict) -> float:
+    """Share of a listed document's pages that are in the index"""
+    pages = document.get("pages") or 0
+    if not pages or "pages_indexed" not in document:
+        return 1.0
+    return min(1.0, document["pages_indexed"] / pages)
+
+def _detached_copy(pdf: BinaryIO) -> BinaryIO:
+    """A handle that outlives the caller's: staged files are reopened, anything else is copied to memory"""
+    if isinstance(pdf, StagedPDF):
+        return upload_staging.open(pdf)
+    pdf.seek(0)
+    copy = io.BytesIO(pdf.read())
+    copy.name = getattr(pdf, 'name', 'unknown')
+    return copy
+
+class ProgressiveIngestor:
+    """Indexes the first pages of new papers right away and the rest in the background
+
+    The first pages (title, abstract, introduction) are committed as a partial ingestion,
+    so questions can be asked within seconds. A background worker then extracts each
+    paper in full and replaces its partial chunks, one paper per commit. Partial files
+    are marked in the ledger and completed by the next upload if the app stops first.
+    """
+
+    def __init__(self, manager: Optional[VectorStoreManager] = None, first_pages: Optional[int] = None):
+        self.manager = manager or vector_store_manager
+        self.first_pages = first_pages or Config.PROGRESSIVE_FIRST_PAGES
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="progressive-ingest")
+        # sha256 -> source name of files still being completed
+        self._pending: Dict[str, str] = {}
+        # source name -> extraction problems of the completed files, until the next ingestion
+        self._errors: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def pending(self) -> List[str]:
+        """Source names of the files whose remaining pages are still being indexed"""
+        with self._lock:
+            return sorted(self._pending.values())
+
+    def errors(self) -> Dict[str, List[str]]:
+        """Extraction problems met while completing files in the background, by source name"""
+        with self._lock:
+            return {source: list(messages) for source, messages in self._errors.items()}
+
+    def ingest(
+        self,
+        pdf_files: List[BinaryIO],
+        metadata: Optional[List[Dict]] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        embedding_progress: Optional[Callable[[float], None]] = None
+    ) -> Dict:
+        """Index the first pages of new files and queue the rest; same stats as ingest_documents plus "background\""""
+        manager = self.manager
+        ledger = IngestLedger(manager.index_path)
+        stats = {
+            "documents": 0, "skipped": 0, "replaced": 0, "chunks": 0, "rebuilt": ledger.stale,
+            "skipped_pages": {}, "background": 0, "recovered": 0, "dropped": [], "failed": [], "errors": {},
+        }
+        with self._lock:
+            self._errors.clear()
+
+        recovered = []
+        try:
+            if ledger.stale:
+                # Rebuilt with the new settings: the papers already indexed are ingested again too
+                pdf_files, metadata, recovered = add_recoverable_documents(pdf_files, metadata, manager, stats)
+            return self._ingest(pdf_files, metadata, ledger, stats, progress_callback, embedding_progress)
+        finally:
+            for pdf in recovered:
+                pdf.close()
+
+    def _ingest(
+        self,
+        pdf_files: List[BinaryIO],
+        metadata: Optional[List[Dict]],
+        ledger: IngestLedger,
+        stats: Dict,
+        progress_callback: Optional[Callable[[int, int, str], None]],
+        embedding_progress: Optional[Callable[[float], None]]
+    ) -> Dict:
+        manager = self.manager
+        with self._lock:
+            in_progress = set(self._pending)
+        pending_files, pending_metadata, pending_shas = select_new_files(pdf_files, metadata, ledger, stats, in_progress)
+        if not pending_files:
+            return stats
+
+        sources = [os.path.basename(getattr(pdf, 'name', 'unknown')) for pdf in pending_files]
+        text_chunks, metadatas = pdf_processor.process_documents(
+            pending_files, pending_metadata, progress_callback, self.first_pages, stats["errors"]
+        )
+        complete = {m["doc_id"] for m in metadatas if "pages_indexed" not in m}
+        partial = {sha256 for sha256 in pending_shas if sha256[:16] not in complete}
+        # Marked pending before the commit, so the partial documents never look abandoned
+        with self._lock:
+            self._pending.update({sha256: source for sha256, source in zip(pending_shas, sources) if sha256 in partial})
+        try:
+            with ingest_lock(manager.index_path):
+                ledger = IngestLedger(manager.index_path)
+                stats["replaced"], stats["failed"] = commit_documents(
+                    ledger, manager, sources, pending_shas, text_chunks, metadatas, embedding_progress, partial,
+                    origins_of(pending_metadata)
+                )
+        except Exception:
+            with self._lock:
+                for sha256 in partial:
+                    self._pending.pop(sha256, None)
+            raise
+        stats["documents"] = len(pending_files) - len(stats["failed"])
+        stats["chunks"] = len(text_chunks)
+        stats["skipped_pages"] = skipped_pages(metadatas)
+        stats["background"] = len(partial)
+        schedule_insights(manager, [m for m in metadatas if m["doc_id"] in complete])
+
+        for pdf, file_metadata, sha256, source in zip(pending_files, pending_metadata, pending_shas, sources):
+            if sha256 in partial:
+                self._executor.submit(self._complete, _detached_copy(pdf), file_metadata, sha256, source)
+        return stats
+
+    def _complete(self, pdf: BinaryIO, file_metadata: Dict, sha256: str, source: str):
+        """Extract a partially indexed file in full and replace its partial chunks"""
+        try:
+            errors: Dict[str, List[str]] = {}
+            text_chunks, metadatas = pdf_processor.process_documents([pdf], [file_metadata], errors=errors)
+            with self._lock:
+                self._errors.update(errors)
+            with ingest_lock(self.manager.index_path):
+                ledger = IngestLedger(self.manager.index_path)
+                # Unless it was replaced or the index was deleted in the meantime. If the full extraction
+                # fails, the file stays partial with its first pages and the next upload completes it.
+                if sha256 not in ledger.files:
+                    return
+                commit_documents(
+                    ledger, self.manager, [source], [sha256], text_chunks, metadatas, origins=origins_of([file_metadata])
+                )
+            schedule_insights(self.manager, metadatas)
+        finally:
+            pdf.close()
+            with self._lock:
+                self._pending.pop(sha256, None)
+
+    def wait(self):
+        """Block until every queued file is complete"""
+        self._executor.submit(lambda: None).result()
+
+# Global instance
+progressive_ingestor = ProgressiveIngestor()
+
+def ingest_progressively(
+    pdf_files: List[BinaryIO],
+    metadata: Optional[List[Dict]] = None,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    embedding_progress: Optional[Callable[[float], None]] = None
+) -> Dict:
+    """Index the first pages of new PDFs now and their remaining pages in the background"""
+    return progressive_ingestor.ingest(pdf_files, metadata, progress_callback, embedding_progress)
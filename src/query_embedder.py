@@ -0,0 +1,129 @@
+import time
+import queue
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Dict, Optional, Callable
+import numpy as np
+from config.settings import Config
+from src.metrics import metrics
+
+def normalize_query(text: str) -> str:
+    """Cache key and embedded form of a query: NFKC with whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU of query vectors keyed by normalized text"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is not None:
+                self._vectors.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self.max_size:
+                self._vectors.popitem(last=False)
+
+class QueryEmbedder:
+    """Embed queries through an LRU cache and a micro-batcher shared by all sessions
+
+    Cache misses are queued; a background thread waits up to batch_window_ms for more
+    queries (from any session) and embeds them in one model call. Identical queries
+    in flight share one result.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        cache_size: int = Config.QUERY_EMBEDDING_CACHE_SIZE,
+        batch_window_ms: float = Config.QUERY_BATCH_WINDOW_MS,
+        max_batch_size: int = Config.QUERY_BATCH_MAX_SIZE
+    ):
+        self.embed_fn = embed_fn
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._cache = QueryEmbeddingCache(cache_size)
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def embed(self, queries: List[str]) -> np.ndarray:
+        """Vectors for the queries, one row each"""
+        keys = [normalize_query(query) for query in queries]
+        vectors = {key: self._cache.get(key) for key in keys}
+        missing = [key for key, vector in vectors.items() if vector is None]
+        metrics.inc("rag_cache_requests_total", len(keys) - len(missing), cache="query_embedding", result="hit")
+        metrics.inc("rag_cache_requests_total", len(missing), cache="query_embedding", result="miss")
+
+        if missing:
+            if self.batch_window <= 0 or len(missing) >= self.max_batch_size:
+                # Already a batch (or batching is off): embed in the calling thread
+                vectors.update(zip(missing, self._embed_batch(missing)))
+            else:
+                futures = [self._submit(key) for key in missing]
+                vectors.update((key, future.result()) for key, future in zip(missing, futures))
+
+        return np.vstack([vectors[key] for key in keys])
+
+    def _embed_batch(self, keys: List[str]) -> np.ndarray:
+        """One model call for a list of normalized queries; results are cached"""
+        vectors = np.asarray(self.embed_fn(keys), dtype=np.float32)
+        for key, vector in zip(keys, vectors):
+            self._cache.put(key, vector)
+        metrics.inc("rag_query_embedding_batches_total")
+        metrics.inc("rag_query_embeddings_total", len(keys))
+        return vectors
+
+    def _submit(self, key: str) -> Future:
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = Future()
+                self._pending[key] = future
+                self._queue.put(key)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="query-embedding-batcher", daemon=True)
+                self._thread.start()
+        return future
+
+    def _run(self):
+        while True:
+            keys = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(keys) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    keys.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = list(zip(keys, self._embed_batch(keys)))
+                error = None
+            except Exception as e:
+                results, error = [], e
+
+            with self._lock:
+                futures = [self._pending.pop(key) for key in keys]
+            if error is not None:
+                for future in futures:
+                    future.set_exception(error)
+            else:
+                for future, (_, vector) in zip(futures, results):
+                    future.set_result(vector)
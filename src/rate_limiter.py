@@ -0,0 +1,144 @@
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Callable, Awaitable, TypeVar
+from config.settings import Config
+
+T = TypeVar("T")
+
+# Request priorities (lower runs first)
+INTERACTIVE = 0
+BACKGROUND = 10
+
+class TokenBucket:
+    """Token bucket refilled continuously up to a per-minute capacity (0 disables the limit)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens are available (0 if available now)"""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        """Take tokens; the balance may go negative when correcting an estimate"""
+        if self.capacity <= 0:
+            return
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+class RateLimiter:
+    """Process-wide limiter for LLM requests and tokens per minute with priority ordering
+
+    Callers wait in a priority queue; only the head of the queue may take capacity, so
+    interactive chat is always served before queued background work.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    def _try_acquire(self, ticket, tokens: int) -> float:
+        """Take capacity if ticket is at the head of the queue; otherwise return seconds to wait"""
+        if self._queue[0] is not ticket:
+            return 0.05
+        wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+        if wait > 0:
+            return wait
+        self.requests.consume(1)
+        self.tokens.consume(tokens)
+        heapq.heappop(self._queue)
+        self._condition.notify_all()
+        return 0.0
+
+    def acquire(self, tokens: int = 0, priority: int = INTERACTIVE):
+        """Block until a request of the estimated token size may be sent"""
+        with self._condition:
+            ticket = [priority, next(self._counter)]
+            heapq.heappush(self._queue, ticket)
+            while True:
+                wait = self._try_acquire(ticket, tokens)
+                if wait == 0:
+                    return
+                self._condition.wait(timeout=wait)
+
+    async def aacquire(self, tokens: int = 0, priority: int = INTERACTIVE):
+        """Async variant of acquire that yields to the event loop while waiting"""
+        with self._condition:
+            ticket = [priority, next(self._counter)]
+            heapq.heappush(self._queue, ticket)
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_acquire(ticket, tokens)
+                if wait == 0:
+                    return
+                await asyncio.sleep(min(wait, 1.0))
+        except asyncio.CancelledError:
+            with self._condition:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._condition.notify_all()
+            raise
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Correct the token bucket once the real usage of a request is known"""
+        with self._condition:
+            self.tokens.consume(actual_tokens - estimated_tokens)
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Detect a rate-limit (HTTP 429) response from the LLM provider"""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "rate limit" in str(error).lower()
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before a retry: Retry-After when sent, otherwise full-jitter exponential backoff"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return random.uniform(0, Config.LLM_RETRY_BASE_DELAY * (2 ** attempt))
+
+def retry_with_backoff(call: Callable[[], T]) -> T:
+    """Run call, retrying rate-limited failures with jittered backoff"""
+    for attempt in range(Config.LLM_MAX_RETRIES + 1):
+        try:
+            return call()
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == Config.LLM_MAX_RETRIES:
+                raise
+            time.sleep(retry_delay(e, attempt))
+
+async def aretry_with_backoff(call: Callable[[], Awaitable[T]]) -> T:
+    """Async variant of retry_with_backoff"""
+    for attempt in range(Config.LLM_MAX_RETRIES + 1):
+        try:
+            return await call()
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == Config.LLM_MAX_RETRIES:
+                raise
+            await asyncio.sleep(retry_delay(e, attempt))
+
+# Global instance shared by every session in the process
+rate_limiter = RateLimiter(Config.LLM_REQUESTS_PER_MINUTE, Config.LLM_TOKENS_PER_MINUTE)
@@ -0,0 +1,211 @@
+# Shared resource server: one process per node holds the embedding model and the index,
+# and every app replica talks to it over a Unix socket instead of loading its own copies.
+#     RESOURCE_SERVER_SOCKET=/run/rag/resources.sock python -m src.resource_server
+# App processes started with the same RESOURCE_SERVER_SOCKET (and the same .env) become thin clients.
+import os
+import argparse
+from typing import List, Dict, Optional, Tuple, Callable, Any
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from config.settings import Config
+from src.metrics import metrics
+from src.rpc import RpcServer, RpcClientPool
+from src.vector_store import EMPTY_SNAPSHOT, IndexSnapshot, VectorStoreManager
+
+def _key_file(address: str) -> str:
+    return address + ".key"
+
+def server_authkey(address: str) -> bytes:
+    """RESOURCE_SERVER_AUTHKEY, or a random key kept next to the socket (owner-readable only)"""
+    if Config.RESOURCE_SERVER_AUTHKEY:
+        return Config.RESOURCE_SERVER_AUTHKEY.encode("utf-8")
+    if os.path.exists(_key_file(address)):
+        # Reuse the key across restarts so connected clients can reconnect
+        return client_authkey(address)
+    authkey = os.urandom(32)
+    os.makedirs(os.path.dirname(address) or ".", exist_ok=True)
+    fd = os.open(_key_file(address), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(authkey)
+    return authkey
+
+def client_authkey(address: str) -> bytes:
+    """The key the server at address accepts"""
+    if Config.RESOURCE_SERVER_AUTHKEY:
+        return Config.RESOURCE_SERVER_AUTHKEY.encode("utf-8")
+    with open(_key_file(address), "rb") as f:
+        return f.read()
+
+class ResourceService:
+    """The embedding model and index of this node, served to app processes over RPC"""
+
+    def __init__(self, manager: Optional[VectorStoreManager] = None):
+        self.manager = manager or VectorStoreManager()
+
+    def info(self) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "index_path": self.manager.index_path, "num_shards": self.manager.num_shards}
+
+    def _index_version(self, snapshot: IndexSnapshot) -> Optional[float]:
+        if self.manager.num_shards > 1:
+            shards_file = os.path.join(self.manager.index_path, "shards.json")
+            return os.path.getmtime(shards_file) if os.path.exists(shards_file) else None
+        return snapshot.mtime
+
+    def document_map(self, known_version: Optional[float] = None) -> Tuple[Optional[float], Optional[Dict]]:
+        """(index version, document map), with the map left out when known_version is still current"""
+        snapshot = self.manager.load_snapshot()
+        version = self._index_version(snapshot)
+        if version is not None and version == known_version:
+            return version, None
+        return version, snapshot.document_map
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.manager.embeddings.embed_documents(texts)
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        # Goes through the server's cache and micro-batcher, so queries from all replicas batch together
+        return self.manager.embed_queries(queries)
+
+    def document_chunks(self) -> Dict[str, List[str]]:
+        return self.manager.document_chunks()
+
+    def search(self, query_vectors: np.ndarray, k: int, filters: Optional[Dict] = None) -> List[List[Any]]:
+        """(document, cosine similarity) pairs per query vector"""
+        return self.manager.batch_similarity_search_with_scores([""] * len(query_vectors), k, filters, query_vectors=query_vectors)
+
+    def upsert_documents(
+        self,
+        text_chunks: List[str],
+        metadatas: Optional[List[Dict]],
+        remove_doc_ids: Optional[List[str]],
+        rebuild: bool,
+        ledger,
+        vectors: List[List[float]]
+    ):
+        self.manager.upsert_documents(
+            text_chunks, metadatas, remove_doc_ids=remove_doc_ids, rebuild=rebuild, ledger=ledger, vectors=vectors
+        )
+
+    def delete_index(self):
+        with self.manager._write_lock:
+            self.manager.delete_index()
+
+class RemoteEmbeddings(Embeddings):
+    """Embeddings computed by the resource server"""
+
+    def __init__(self, manager: "RemoteVectorStoreManager"):
+        self.manager = manager
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.manager.pool.call("embed_documents", texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.manager.pool.call("embed_queries", [text])[0].tolist()
+
+class RemoteVectorStoreManager(VectorStoreManager):
+    """VectorStoreManager whose model and index live in the resource server
+
+    Only the document map is kept locally (for filters and document lists); it is
+    refreshed whenever the server's index changes. The server is contacted on first
+    use, so app processes can start before it. FAISS_INDEX_PATH must match the
+    server's, since the ingestion ledger is read from the index directory.
+    """
+
+    def __init__(self, address: Optional[str] = None, max_connections: Optional[int] = None):
+        self.address = address or Config.RESOURCE_SERVER_SOCKET
+        self.max_connections = max_connections or Config.RESOURCE_SERVER_CONNECTIONS
+        self._pool = None
+        super().__init__(embeddings=RemoteEmbeddings(self), num_shards=1)
+
+    @property
+    def pool(self) -> RpcClientPool:
+        if self._pool is None:
+            self._pool = RpcClientPool(self.address, client_authkey(self.address), self.max_connections)
+        return self._pool
+
+    def load_snapshot(self) -> IndexSnapshot:
+        """Sync the document map with the server; raises FileNotFoundError when there is no index"""
+        version, document_map = self.pool.call("document_map", self._snapshot.mtime)
+        if document_map is None:
+            metrics.inc("rag_cache_requests_total", cache="index", result="hit")
+        else:
+            metrics.inc("rag_cache_requests_total", cache="index", result="miss")
+            self._snapshot = IndexSnapshot(self.pool, document_map, None, version)
+        return self._snapshot
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        return self.pool.call("embed_queries", queries)
+
+    def upsert_documents(
+        self,
+        text_chunks: List[str],
+        metadatas: Optional[List[Dict]] = None,
+        remove_doc_ids: Optional[List[str]] = None,
+        rebuild: bool = False,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        ledger=None,
+        vectors: Optional[List[List[float]]] = None
+    ):
+        """Embed in batches on the server (for progress), then have it write the index"""
+        if vectors is None:
+            vectors = self.embed_chunks(text_chunks, progress_callback) if text_chunks else []
+        with metrics.span("index_write", mode="remote"):
+            self.pool.call("upsert_documents", text_chunks, metadatas, remove_doc_ids or [], rebuild, ledger, vectors)
+        try:
+            self.load_snapshot()
+        except FileNotFoundError:
+            self._snapshot = EMPTY_SNAPSHOT
+        return self.pool
+
+    def delete_index(self):
+        self.pool.call("delete_index")
+        self._snapshot = EMPTY_SNAPSHOT
+
+    def document_chunks(self) -> Dict[str, List[str]]:
+        return self.pool.call("document_chunks")
+
+    def similarity_search_with_scores(self, query: str, k: int = None, filters: Optional[Dict] = None) -> List[Tuple[Any, float]]:
+        return self.batch_similarity_search_with_scores([query], k, filters)[0]
+
+    def batch_similarity_search_with_scores(
+        self,
+        queries: List[str],
+        k: int = None,
+        filters: Optional[Dict] = None,
+        query_vectors: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[Any, float]]]:
+        if k is None:
+            k = self.config.SIMILARITY_SEARCH_K
+        if not queries:
+            return []
+
+        with metrics.span("retrieve", mode="remote"):
+            self.load_vector_store()
+            filters, any_match = self._forwarded_filters(filters)
+            if not any_match:
+                return [[] for _ in queries]
+            if query_vectors is None:
+                query_vectors = self.embed_queries(queries)
+            return self.pool.call("search", query_vectors, k, filters)
+
+def serve(address: str):
+    """Load the model and index once and serve them until the process is stopped"""
+    service = ResourceService()
+    service.manager.embeddings.embed_query("warm up")
+    try:
+        service.manager.load_vector_store()
+    except FileNotFoundError:
+        pass
+    print(f"Serving embeddings and {service.manager.index_path} on {address}")
+    RpcServer(service, address, server_authkey(address)).serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the embedding model and index to app processes on this node")
+    parser.add_argument("--socket", default=Config.RESOURCE_SERVER_SOCKET, help="Unix socket path (default: RESOURCE_SERVER_SOCKET)")
+    args = parser.parse_args()
+    if not args.socket:
+        parser.error("Set RESOURCE_SERVER_SOCKET or pass --socket")
+    serve(args.socket)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import time
+import queue
+import threading
+from multiprocessing.connection import Listener, Client
+from typing import Any, Tuple
+
+# Exceptions re-raised with their own type on the client side; anything else becomes RpcError
+FORWARDED_EXCEPTIONS = {exc.__name__: exc for exc in (FileNotFoundError, KeyError, ValueError, TimeoutError)}
+
+class RpcError(RuntimeError):
+    """A remote call failed or the server could not be reached"""
+
+class RpcConnectionError(RpcError):
+    """The server could not be reached or the connection was lost"""
+
+class RpcServer:
+    """Serve the public methods of an object over a Unix socket, one thread per connection"""
+
+    def __init__(self, handler: Any, address: str, authkey: bytes):
+        self.handler = handler
+        self.address = address
+        self.authkey = authkey
+
+    def serve_forever(self):
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        with Listener(self.address, family="AF_UNIX", authkey=self.authkey) as listener:
+            while True:
+                try:
+                    connection = listener.accept()
+                except (OSError, EOFError):
+                    # Failed handshake (e.g. wrong authkey); keep serving
+                    continue
+                threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+
+    def _serve_connection(self, connection):
+        with connection:
+            while True:
+                try:
+                    method, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+                connection.send(self._dispatch(method, args, kwargs))
+
+    def _dispatch(self, method: str, args: Tuple, kwargs: dict) -> Tuple[str, Any]:
+        target = None if method.startswith("_") else getattr(self.handler, method, None)
+        if not callable(target):
+            return "error", ("AttributeError", f"Unknown method: {method}")
+        try:
+            return "ok", target(*args, **kwargs)
+        except Exception as e:
+            return "error", (type(e).__name__, str(e))
+
+class RpcClient:
+    """Call methods of a remote RpcServer over one connection; calls are serialized"""
+
+    def __init__(self, address: str, authkey: bytes, connect_timeout: float = 60.0):
+        self.address = address
+        self._lock = threading.Lock()
+        self._connection = self._connect(authkey, connect_timeout)
+
+    def _connect(self, authkey: bytes, timeout: float):
+        # The server may still be starting up
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return Client(self.address, family="AF_UNIX", authkey=authkey)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    raise RpcConnectionError(f"Could not connect to {self.address}")
+                time.sleep(0.05)
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """Invoke method on the server and return its result"""
+        with self._lock:
+            try:
+                self._connection.send((method, args, kwargs))
+                status, result = self._connection.recv()
+            except (EOFError, OSError) as e:
+                raise RpcConnectionError(f"Connection to {self.address} lost: {e}") from e
+        if status == "ok":
+            return result
+        error_type, message = result
+        raise FORWARDED_EXCEPTIONS.get(error_type, RpcError)(message if error_type in FORWARDED_EXCEPTIONS else f"{error_type}: {message}")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+class RpcClientPool:
+    """Up to max_size connections to one RpcServer, so concurrent callers are not serialized
+
+    Connections are opened on demand. A broken connection is dropped; if it was an idle
+    one (e.g. the server restarted since its last use) the call is retried on a new connection.
+    """
+
+    def __init__(self, address: str, authkey: bytes, max_size: int = 8, connect_timeout: float = 5.0):
+        self.address = address
+        self.max_size = max(1, max_size)
+        self.connect_timeout = connect_timeout
+        self._authkey = authkey
+        self._idle: "queue.LifoQueue[RpcClient]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        with self._slots:
+            while True:
+                try:
+                    client, reused = self._idle.get_nowait(), True
+                except queue.Empty:
+                    client, reused = RpcClient(self.address, self._authkey, self.connect_timeout), False
+                try:
+                    result = client.call(method, *args, **kwargs)
+                except RpcConnectionError:
+                    client.close()
+                    if reused:
+                        continue
+                    raise
+                except Exception:
+                    # The remote method failed; the connection itself is fine
+                    self._idle.put(client)
+                    raise
+                self._idle.put(client)
+                return result
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
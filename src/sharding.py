@@ -0,0 +1,214 @@
+import os
+import json
+import uuid
+import shutil
+import atexit
+import hashlib
+import heapq
+import itertools
+import tempfile
+import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple, Any
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.rpc import RpcServer, RpcClient, RpcError
+from src.vector_store import VectorStoreManager, DOCUMENT_MAP_FILE, DOCUMENT_VECTORS_FILE
+
+SHARDS_FILE = "shards.json"
+
+def shard_for(doc_id: str, num_shards: int) -> int:
+    """Shard that owns a document, from a hash of its id"""
+    return int(hashlib.sha256(doc_id.encode("utf-8")).hexdigest()[:8], 16) % num_shards
+
+def shard_path(index_path: str, shard: int) -> str:
+    return os.path.join(index_path, f"shard-{shard:03d}")
+
+class VectorsOnlyEmbeddings(Embeddings):
+    """Placeholder for shard workers, which receive query vectors from the coordinator"""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        raise RuntimeError("Shard workers do not embed text; embed in the coordinating process")
+
+    def embed_query(self, text: str) -> List[float]:
+        raise RuntimeError("Shard workers do not embed text; embed in the coordinating process")
+
+class ShardWorker:
+    """One shard's index, served to the coordinating process over RPC"""
+
+    def __init__(self, index_path: str):
+        self.manager = VectorStoreManager(index_path=index_path, embeddings=VectorsOnlyEmbeddings(), num_shards=1)
+
+    def ping(self) -> int:
+        return os.getpid()
+
+    def document_map(self, known_mtime: Optional[float] = None) -> Tuple[Optional[float], Optional[Dict]]:
+        """(index mtime, document map), with the map left out when known_mtime is still current"""
+        try:
+            snapshot = self.manager.load_snapshot()
+        except FileNotFoundError:
+            return None, {}
+        if snapshot.mtime == known_mtime:
+            return known_mtime, None
+        return snapshot.mtime, snapshot.document_map
+
+    def search(self, query_vectors: np.ndarray, k: int, filters: Optional[Dict] = None) -> List[List[Tuple[float, Any]]]:
+        """(distance, document) pairs per query, nearest first"""
+        try:
+            snapshot = self.manager.load_snapshot()
+        except FileNotFoundError:
+            return [[] for _ in range(len(query_vectors))]
+        return [
+            [(distance, doc) for (_, distance), doc in zip(hits, self.manager._to_documents(snapshot.vector_store, hits))]
+            for hits in self.manager._search_by_vectors(snapshot, query_vectors, k, filters)
+        ]
+
+    def document_chunks(self) -> Dict[str, List[str]]:
+        try:
+            return self.manager.document_chunks()
+        except FileNotFoundError:
+            return {}
+
+    def upsert(self, text_chunks: List[str], vectors: List[List[float]], metadatas: List[Dict], remove_doc_ids: List[str], rebuild: bool):
+        self.manager.upsert_documents(text_chunks, metadatas, remove_doc_ids=remove_doc_ids, rebuild=rebuild, vectors=vectors)
+
+def _serve_shard(index_path: str, address: str, authkey: bytes):
+    RpcServer(ShardWorker(index_path), address, authkey).serve_forever()
+
+class ShardPool:
+    """Local worker processes, one per shard, queried in parallel with results merged by distance
+
+    Documents are partitioned by a hash of their id. Each shard is a complete index
+    (document map, routing vectors) under <index_path>/shard-NNN, written atomically by its worker.
+    """
+
+    def __init__(self, index_path: str, num_shards: int):
+        self.index_path = index_path
+        self.num_shards = num_shards
+        self._authkey = os.urandom(16)
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[Any] = [None] * num_shards
+        self._clients: List[Optional[RpcClient]] = [None] * num_shards
+        self._maps: List[Tuple[Optional[float], Dict]] = [(None, {})] * num_shards
+        self._executor = ThreadPoolExecutor(max_workers=num_shards, thread_name_prefix="shard")
+        for shard in range(num_shards):
+            self._start(shard)
+        atexit.register(self.close)
+
+    def _start(self, shard: int):
+        address = os.path.join(tempfile.gettempdir(), f"rag-{os.getpid()}-{uuid.uuid4().hex[:8]}-{shard}.sock")
+        process = self._context.Process(
+            target=_serve_shard,
+            args=(shard_path(self.index_path, shard), address, self._authkey),
+            name=f"index-shard-{shard}",
+            daemon=True
+        )
+        process.start()
+        self._processes[shard] = process
+        while not os.path.exists(address):
+            if not process.is_alive():
+                raise RpcError(f"Shard worker {shard} exited during startup (exit code {process.exitcode})")
+            time.sleep(0.05)
+        self._clients[shard] = RpcClient(address, self._authkey)
+        self._maps[shard] = (None, {})
+
+    def _call(self, shard: int, method: str, *args) -> Any:
+        """Call a shard, restarting its worker once if it died"""
+        try:
+            return self._clients[shard].call(method, *args)
+        except RpcError:
+            if self._processes[shard].is_alive():
+                raise
+            self._start(shard)
+            return self._clients[shard].call(method, *args)
+
+    def _scatter(self, calls: Dict[int, Tuple]) -> Dict[int, Any]:
+        """Run {shard: (method, *args)} calls in parallel"""
+        futures = {shard: self._executor.submit(self._call, shard, *call) for shard, call in calls.items()}
+        return {shard: future.result() for shard, future in futures.items()}
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.index_path, SHARDS_FILE))
+
+    def document_map(self) -> Dict[str, Dict]:
+        """Merged document map of all shards (vector ranges are shard-local)"""
+        if not self.exists():
+            raise FileNotFoundError("FAISS index not found. Please process a PDF first.")
+        replies = self._scatter({shard: ("document_map", self._maps[shard][0]) for shard in range(self.num_shards)})
+        merged = {}
+        for shard, (mtime, shard_map) in replies.items():
+            if shard_map is not None:
+                self._maps[shard] = (mtime, shard_map)
+            merged.update(self._maps[shard][1])
+        return merged
+
+    def document_chunks(self) -> Dict[str, List[str]]:
+        """Chunk texts of all shards, grouped by document id"""
+        merged = {}
+        for shard_chunks in self._scatter({shard: ("document_chunks",) for shard in range(self.num_shards)}).values():
+            merged.update(shard_chunks)
+        return merged
+
+    def search(self, query_vectors: np.ndarray, k: int, filters: Optional[Dict] = None) -> List[List[Any]]:
+        """Search every shard in parallel and keep the k nearest (distance, document) pairs per query"""
+        replies = self._scatter({shard: ("search", query_vectors, k, filters) for shard in range(self.num_shards)})
+        return [
+            list(itertools.islice(heapq.merge(*(replies[shard][i] for shard in replies), key=lambda hit: hit[0]), k))
+            for i in range(len(query_vectors))
+        ]
+
+    def upsert(
+        self,
+        text_chunks: List[str],
+        vectors: List[List[float]],
+        metadatas: List[Dict],
+        remove_doc_ids: List[str],
+        rebuild: bool = False,
+        ledger=None
+    ):
+        """Route chunks and deletions to the shards owning their documents"""
+        if metadatas is None or any("doc_id" not in metadata for metadata in metadatas):
+            raise ValueError("Every chunk needs a doc_id in its metadata to be placed on a shard")
+        if rebuild:
+            self._remove_unsharded_files()
+
+        # Re-adding a document first removes any copy left by an interrupted earlier upsert
+        added_doc_ids = list(dict.fromkeys(metadata["doc_id"] for metadata in metadatas))
+        calls = {
+            shard: ("upsert", [], [], [], [], rebuild) for shard in range(self.num_shards)
+        } if rebuild else {}
+        for doc_id in dict.fromkeys(list(remove_doc_ids) + added_doc_ids):
+            shard = shard_for(doc_id, self.num_shards)
+            calls.setdefault(shard, ("upsert", [], [], [], [], rebuild))[4].append(doc_id)
+        for text, vector, metadata in zip(text_chunks, vectors, metadatas):
+            _, texts, shard_vectors, shard_metadatas, _, _ = calls[shard_for(metadata["doc_id"], self.num_shards)]
+            texts.append(text)
+            shard_vectors.append(vector)
+            shard_metadatas.append(metadata)
+        self._scatter(calls)
+
+        with open(os.path.join(self.index_path, SHARDS_FILE), "w", encoding="utf-8") as f:
+            json.dump({"shards": self.num_shards}, f)
+        if ledger is not None:
+            ledger.save(self.index_path)
+
+    def _remove_unsharded_files(self):
+        """Drop a single-process index, or shards beyond num_shards, left at index_path"""
+        os.makedirs(self.index_path, exist_ok=True)
+        for name in ("index.faiss", "index.pkl", DOCUMENT_MAP_FILE, DOCUMENT_VECTORS_FILE):
+            path = os.path.join(self.index_path, name)
+            if os.path.exists(path):
+                os.remove(path)
+        for name in os.listdir(self.index_path):
+            if name.startswith("shard-") and name[6:].isdigit() and int(name[6:]) >= self.num_shards:
+                shutil.rmtree(os.path.join(self.index_path, name), ignore_errors=True)
+
+    def close(self):
+        for client in self._clients:
+            if client:
+                client.close()
+        for process in self._processes:
+            if process and process.is_alive():
+                process.terminate()
+        self._executor.shutdown(wait=False)
@@ -2,11 +2,17 @@ import streamlit as st
 import requests
 import tempfile
 import os
-from typing import List, BinaryIO, Optional
-from config.settings import UI_CONFIG
-from src.pdf_processor import process_pdfs
+from typing import List, BinaryIO, Optional, Dict
+from config.settings import Config, UI_CONFIG
+from src.ingest_ledger import ingest_documents
+from src.progressive_ingest import ingest_progressively, progressive_ingestor, document_coverage
+from src.upload_staging import upload_staging
 from src.vector_store import vector_store_manager
 from src.chat_handler import chat_handler
+from src.event_loop import background_loop
+from src.document_insights import insight_scheduler, stored_summaries
+from src.metrics import metrics
+from src.profiling import profiling_mode, profile_request, list_profiles, top_functions, top_sampled_functions
 from utils.file_utils import download_pdf_from_url, search_arxiv
 
 def setup_page_config():
@@ -17,18 +23,18 @@ def setup_page_config():
         layout=UI_CONFIG["layout"],
         initial_sidebar_state="expanded"
     )
-    
+
     # Enhanced Custom CSS - Respects light/dark mode
     st.markdown("""
         <style>
         /* Import Google Fonts */
         @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-        
+
         /* Global Styling */
         html, body, [class*="css"] {
             font-family: 'Inter', sans-serif;
         }
-        
+
         /* Main header with gradient - always has white text */
         .main-header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -39,7 +45,7 @@ def setup_page_config():
             text-align: center;
             animation: fadeIn 0.6s ease-in;
         }
-        
+
         .main-header h1 {
             color: white !important;
             font-size: 3rem;
@@ -48,7 +54,7 @@ def setup_page_config():
             text-shadow: 2px 2px 8px rgba(0,0,0,0.3);
             letter-spacing: -0.5px;
         }
-        
+
         .main-header p {
             color: white !important;
             font-size: 1.2rem;
@@ -56,7 +62,7 @@ def setup_page_config():
             font-weight: 500;
             text-shadow: 1px 1px 2px rgba(0,0,0,0.2);
         }
-        
+
         .creator-badge {
             background: rgba(255,255,255,0.25);
             padding: 0.5rem 1.5rem;
@@ -68,29 +74,29 @@ def setup_page_config():
             backdrop-filter: blur(10px);
             border: 2px solid rgba(255,255,255,0.3);
         }
-        
+
         /* Sidebar styling - let Streamlit handle colors */
         [data-testid="stSidebar"] > div:first-child {
             padding-top: 2rem;
         }
-        
+
         /* Improve heading visibility */
         h1, h2, h3, h4, h5, h6 {
             font-weight: 700 !important;
         }
-        
+
         /* Tab styling - respect theme */
         .stTabs [data-baseweb="tab"] {
             font-weight: 600 !important;
             border-radius: 10px;
             padding: 0.75rem 1.5rem;
         }
-        
+
         .stTabs [aria-selected="true"] {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
             color: white !important;
         }
-        
+
         /* Enhanced buttons - always white text on gradient */
         .stButton>button {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
@@ -104,17 +110,17 @@ def setup_page_config():
             box-shadow: 0 4px 12px rgba(102, 126, 234, 0.3);
             width: 100%;
         }
-        
+
         .stButton>button:hover {
             transform: translateY(-2px);
             box-shadow: 0 8px 20px rgba(102, 126, 234, 0.4);
             background: linear-gradient(135deg, #764ba2 0%, #667eea 100%) !important;
         }
-        
+
         .stButton>button:active {
             transform: translateY(0);
         }
-        
+
         /* File uploader styling */
         [data-testid="stFileUploader"] {
             border-radius: 15px;
@@ -122,11 +128,11 @@ def setup_page_config():
             border: 2px dashed #667eea;
             transition: all 0.3s ease;
         }
-        
+
         [data-testid="stFileUploader"]:hover {
             border-color: #764ba2;
         }
-        
+
         /* Text area and input - let theme handle colors */
         .stTextArea textarea,
         .stTextInput input {
@@ -136,13 +142,13 @@ def setup_page_config():
             font-size: 0.95rem;
             transition: all 0.3s ease;
         }
-        
+
         .stTextArea textarea:focus,
         .stTextInput input:focus {
             border-color: #667eea;
             box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
         }
-        
+
         /* Chat messages - let theme handle colors */
         .stChatMessage {
             border-radius: 15px;
@@ -151,7 +157,7 @@ def setup_page_config():
             box-shadow: 0 2px 8px rgba(0,0,0,0.08);
             animation: slideIn 0.3s ease;
         }
-        
+
         /* Info/success/warning boxes - enhanced */
         .stAlert {
             border-radius: 12px;
@@ -160,7 +166,7 @@ def setup_page_config():
             box-shadow: 0 2px 8px rgba(0,0,0,0.05);
             font-weight: 500 !important;
         }
-        
+
         /* Expander styling */
         .streamlit-expanderHeader {
             border-radius: 12px;
@@ -168,40 +174,40 @@ def setup_page_config():
             padding: 1rem;
             transition: all 0.3s ease;
         }
-        
+
         .streamlit-expanderHeader:hover {
             box-shadow: 0 2px 8px rgba(102, 126, 234, 0.2);
         }
-        
+
         /* Chat input */
         .stChatInput {
             border-radius: 25px;
             border: 2px solid rgba(102, 126, 234, 0.3);
             padding: 0.5rem;
         }
-        
+
         .stChatInput:focus-within {
             border-color: #667eea;
             box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
         }
-        
+
         /* Metrics - use accent color */
         [data-testid="stMetricValue"] {
             font-size: 2rem !important;
             font-weight: 700 !important;
             color: #667eea !important;
         }
-        
+
         [data-testid="stMetricLabel"] {
             font-weight: 600 !important;
         }
-        
+
         /* Progress bars */
         .stProgress > div > div > div {
             background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
             border-radius: 10px;
         }
-        
+
         /* Divider */
         hr {
             margin: 2rem 0;
@@ -209,17 +215,17 @@ def setup_page_config():
             height: 1px;
             opacity: 0.3;
         }
-        
+
         /* Container styling */
         [data-testid="stContainer"] {
             border-radius: 15px;
         }
-        
+
         /* Spinner */
         .stSpinner > div {
             border-color: #667eea #667eea #667eea transparent !important;
         }
-        
+
         /* Download button - white text on gradient */
         .stDownloadButton button {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
@@ -227,12 +233,12 @@ def setup_page_config():
             font-weight: 600 !important;
             border-radius: 10px;
         }
-        
+
         /* Improve label visibility - bold but respect theme color */
         label {
             font-weight: 600 !important;
         }
-        
+
         /* Animations */
         @keyframes fadeIn {
             from {
@@ -244,7 +250,7 @@ def setup_page_config():
                 transform: translateY(0);
             }
         }
-        
+
         @keyframes slideIn {
             from {
                 opacity: 0;
@@ -255,38 +261,38 @@ def setup_page_config():
                 transform: translateX(0);
             }
         }
-        
+
         /* Caption text - slight transparency */
         .stCaption {
             font-weight: 500 !important;
             opacity: 0.8;
         }
-        
+
         /* Markdown bold text */
         .stMarkdown strong,
         .stMarkdown b {
             font-weight: 700 !important;
         }
-        
+
         /* Number input */
         .stNumberInput input {
             border-radius: 10px;
             border: 2px solid rgba(102, 126, 234, 0.3);
         }
-        
+
         /* Checkbox and radio */
         .stCheckbox label,
         .stRadio label {
             font-weight: 500 !important;
         }
-        
+
         /* Remove forced background colors to respect theme */
         [data-testid="stSidebar"] {
             border-right: 1px solid rgba(102, 126, 234, 0.2);
         }
         </style>
     """, unsafe_allow_html=True)
-    
+
     # Beautiful animated header
     st.markdown(
         f"""
@@ -304,388 +310,601 @@ def render_sidebar() -> List[BinaryIO]:
     with st.sidebar:
         st.markdown("### 📂 Document Management")
         st.markdown("---")
-        
-        # Create tabs for better organization
-        tab1, tab2, tab3 = st.tabs(["📤 Upload", "🔗 URLs", "🔬 arXiv"])
-        
-        uploaded_files = None
-        pdf_urls_input = None
-        
-        # Tab 1: File Upload
-        with tab1:
-            st.markdown("##### 📁 Local PDF Files")
-            uploaded_files = st.file_uploader(
-                "Drag and drop or browse",
-                accept_multiple_files=True,
-                type=["pdf"],
-                help="Upload one or more PDF files from your computer",
-                label_visibility="collapsed"
-            )
-            
-            if uploaded_files:
-                st.success(f"✅ {len(uploaded_files)} file(s) ready")
-                with st.expander("📋 View files", expanded=False):
-                    for i, file in enumerate(uploaded_files, 1):
-                        file_size = file.size / 1024 / 1024  # Convert to MB
-                        st.markdown(f"**{i}.** `{file.name}` ({file_size:.2f} MB)")
-        
-        # Tab 2: URL Input
-        with tab2:
-            st.markdown("##### 🌐 Enter PDF URLs")
-            pdf_urls_input = st.text_area(
-                "URLs",
-                height=150,
-                placeholder="https://arxiv.org/pdf/2301.00001.pdf\nhttps://example.com/paper.pdf",
-                help="Enter PDF URLs, one per line or comma-separated",
-                label_visibility="collapsed"
-            )
-            
-            if pdf_urls_input:
-                url_count = len([url.strip() for url in pdf_urls_input.replace(',', '\n').split('\n') if url.strip()])
-                st.info(f"🔗 {url_count} URL(s) detected")
-
-        # Tab 3: arXiv Search
-        with tab3:
-            st.markdown("##### 🔍 Search Research Papers")
-            
-            # Initialize session state
-            if "arxiv_search_results" not in st.session_state:
-                st.session_state["arxiv_search_results"] = []
-            if "selected_arxiv_pdfs" not in st.session_state:
-                st.session_state["selected_arxiv_pdfs"] = []
-            
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                search_query = st.text_input(
-                    "Search query",
-                    placeholder="e.g., 'transformers NLP'",
-                    help="Search for papers on arXiv",
-                    label_visibility="collapsed"
-                )
-            with col2:
-                max_results = st.number_input("Max", 1, 20, 5, label_visibility="collapsed")
-            
-            if st.button("🔎 Search", use_container_width=True, key="search_arxiv"):
-                if search_query.strip():
-                    with st.spinner("🔍 Searching arXiv..."):
-                        search_results = search_arxiv(search_query, max_results=max_results)
-                        if not search_results:
-                            st.warning("No results found. Try a different query.")
-                        else:
-                            st.session_state["arxiv_search_results"] = search_results
-                            st.success(f"✅ Found {len(search_results)} papers")
-                else:
-                    st.warning("Please enter a search query")
-
-            # Display search results with better UI
-            if st.session_state["arxiv_search_results"]:
-                st.markdown(f"**📄 {len(st.session_state['arxiv_search_results'])} Results:**")
-                
-                for i, item in enumerate(st.session_state["arxiv_search_results"]):
-                    with st.container():
-                        # Paper title and checkbox
-                        col1, col2 = st.columns([5, 1])
-                        with col1:
-                            st.markdown(f"**{i+1}. {item['title'][:60]}...**" if len(item['title']) > 60 else f"**{i+1}. {item['title']}**")
-                        with col2:
-                            checkbox_key = f"select_{i}_{item['id']}"
-                            is_selected = st.checkbox("✓", key=checkbox_key, label_visibility="collapsed")
-                        
-                        # Authors and summary
-                        st.caption(f"👥 {item['authors'][:80]}..." if len(item['authors']) > 80 else f"👥 {item['authors']}")
-                        
-                        # Summary in expander
-                        with st.expander("📖 Abstract"):
-                            st.write(item['summary'])
-                            st.markdown(f"[View on arXiv]({item['abs_url']}) • [Download PDF]({item['pdf_url']})")
-                        
-                        # Update selection
-                        if is_selected and item['pdf_url'] not in st.session_state["selected_arxiv_pdfs"]:
-                            st.session_state["selected_arxiv_pdfs"].append(item['pdf_url'])
-                        elif not is_selected and item['pdf_url'] in st.session_state["selected_arxiv_pdfs"]:
-                            st.session_state["selected_arxiv_pdfs"].remove(item['pdf_url'])
-                        
-                        st.markdown("---")
-
-            # Show selected papers summary
-            if st.session_state["selected_arxiv_pdfs"]:
-                st.success(f"✅ {len(st.session_state['selected_arxiv_pdfs'])} paper(s) selected")
-                if st.button("🗑️ Clear Selection", use_container_width=True):
-                    st.session_state["selected_arxiv_pdfs"] = []
-                    st.rerun()
-        
-        st.markdown("---")
-        
-        # Process URLs and combine all sources
-        pdf_urls = []
-        if pdf_urls_input:
-            pdf_urls = [
-                url.strip() 
-                for url in pdf_urls_input.replace(',', '\n').split('\n') 
-                if url.strip()
-            ]
-
-        # Add selected arXiv PDFs
-        if "selected_arxiv_pdfs" in st.session_state and st.session_state["selected_arxiv_pdfs"]:
-            pdf_urls = list(dict.fromkeys(pdf_urls + st.session_state["selected_arxiv_pdfs"]))
-
-        # Download PDFs from URLs
-        url_pdf_files = []
-        
-        # Combine all PDFs
-        pdf_docs = []
-        if uploaded_files:
-            pdf_docs.extend(uploaded_files)
-
-        # Show processing summary with metrics
-        total_files = len(uploaded_files) if uploaded_files else 0
-        total_urls = len(pdf_urls)
-        total_arxiv = len(st.session_state.get("selected_arxiv_pdfs", []))
-        
-        if total_files > 0 or total_urls > 0:
-            st.markdown("### 📊 Processing Summary")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("📄 Files", total_files)
-            with col2:
-                st.metric("🔗 URLs", total_urls)
-            with col3:
-                st.metric("🔬 arXiv", total_arxiv)
-            
-            st.markdown(f"**Total: {total_files + total_urls} document(s)**")
-
-        # Process PDFs button with enhanced UI
-        process_disabled = (total_files == 0 and total_urls == 0)
-        
-        if st.button(
-            "🚀 Process All Documents",
-            use_container_width=True,
-            disabled=process_disabled,
-            type="primary"
-        ):
-            # Download PDFs from URLs first
-            if pdf_urls:
-                progress_text = "📥 Downloading PDFs from URLs..."
-                progress_bar = st.progress(0, text=progress_text)
-                
-                for idx, url in enumerate(pdf_urls):
-                    st.caption(f"Downloading {idx + 1}/{len(pdf_urls)}...")
-                    pdf_path = download_pdf_from_url(url)
-                    if pdf_path:
-                        url_pdf_files.append(open(pdf_path, "rb"))
-                    progress_bar.progress((idx + 1) / len(pdf_urls), text=progress_text)
-                
-                pdf_docs.extend(url_pdf_files)
-            
-            if pdf_docs:
-                with st.spinner("⚙️ Processing documents..."):
-                    progress_bar = st.progress(0, text="Starting...")
-                    
-                    # Extract text
-                    progress_bar.progress(0.2, text="📖 Extracting text...")
-                    text_chunks = process_pdfs(pdf_docs)
-                    
-                    if text_chunks:
-                        # Create vector store
-                        progress_bar.progress(0.7, text="🧠 Creating embeddings...")
-                        vector_store_manager.create_vector_store(text_chunks)
-                        
-                        progress_bar.progress(1.0, text="✅ Complete!")
-                        st.success(f"✅ Successfully processed {len(pdf_docs)} document(s)!")
-                        st.balloons()
-                        
-                        # Show statistics
-                        st.info(f"📊 Created {len(text_chunks)} text chunks for AI analysis")
-                        
-                        # Clear selections
-                        if "selected_arxiv_pdfs" in st.session_state:
-                            st.session_state["selected_arxiv_pdfs"] = []
-                    else:
-                        st.error("❌ Failed to extract text from documents")
-        
-        if process_disabled:
-            st.info("👆 Upload files or add URLs to get started")
-        
+
+        # Sources and processing rerun on their own, without redrawing the chat area
+        pdf_docs = render_document_sources()
+        render_indexing_coverage()
+
         st.markdown("---")
-        
+
         # Help section with tips
         with st.expander("💡 Help & Tips"):
             st.markdown("""
             **Quick Guide:**
-            
+
             1️⃣ **Upload Documents**
             - Drag & drop PDF files
             - Enter PDF URLs
             - Search & select from arXiv
-            
+
             2️⃣ **Process**
             - Click "Process All Documents"
             - Wait for completion
-            
+
             3️⃣ **Chat**
             - Ask questions about your papers
             - Use quick actions for summaries
             - Export or clear chat history
-            
+
             **Tips:**
             - ✨ You can mix local files, URLs, and arXiv papers
             - 🔄 Use Clear Chat to start fresh
             - 📋 Use Summarize for quick overviews
             - 💾 Processing creates a searchable database
             """)
-        
+
         # Status indicator
-        index_exists = os.path.exists("data/faiss_index")
+        index_exists = os.path.exists(Config.FAISS_INDEX_PATH)
         st.markdown("### 📊 System Status")
         if index_exists:
             st.success("✅ Vector database ready")
         else:
             st.info("ℹ️ No documents processed yet")
 
+        # Stage timings recorded by the tracing layer
+        stage_summary = metrics.stage_summary()
+        if stage_summary:
+            with st.expander("⏱️ Performance", expanded=False):
+                for stage, entry in sorted(stage_summary.items()):
+                    st.markdown(f"**{stage}**: {entry['mean_seconds'] * 1000:.0f} ms avg · {entry['count']} call(s)")
+
+        if Config.ADMIN_MODE:
+            render_profiles_panel()
+
         return pdf_docs
 
-def render_chat_interface(index_exists: bool):
-    """Render the main chat interface"""
-    
-    # Initialize chat history in session state
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
-    
-    if index_exists:
-        # Header with stats
-        col1, col2 = st.columns([4, 1])
+@st.fragment
+def render_document_sources() -> List[BinaryIO]:
+    """Upload, URL and arXiv tabs plus the process button, rerun as a fragment"""
+    # Create tabs for better organization
+    tab1, tab2, tab3 = st.tabs(["📤 Upload", "🔗 URLs", "🔬 arXiv"])
+
+    uploaded_files = None
+    pdf_urls_input = None
+
+    # Tab 1: File Upload
+    with tab1:
+        st.markdown("##### 📁 Local PDF Files")
+        uploaded_files = st.file_uploader(
+            "Drag and drop or browse",
+            accept_multiple_files=True,
+            type=["pdf"],
+            help="Upload one or more PDF files from your computer",
+            label_visibility="collapsed"
+        )
+
+        if uploaded_files:
+            st.success(f"✅ {len(uploaded_files)} file(s) ready")
+            with st.expander("📋 View files", expanded=False):
+                for i, file in enumerate(uploaded_files, 1):
+                    file_size = file.size / 1024 / 1024  # Convert to MB
+                    st.markdown(f"**{i}.** `{file.name}` ({file_size:.2f} MB)")
+
+    # Tab 2: URL Input
+    with tab2:
+        st.markdown("##### 🌐 Enter PDF URLs")
+        pdf_urls_input = st.text_area(
+            "URLs",
+            height=150,
+            placeholder="https://arxiv.org/pdf/2301.00001.pdf\nhttps://example.com/paper.pdf",
+            help="Enter PDF URLs, one per line or comma-separated",
+            label_visibility="collapsed"
+        )
+
+        if pdf_urls_input:
+            url_count = len([url.strip() for url in pdf_urls_input.replace(',', '\n').split('\n') if url.strip()])
+            st.info(f"🔗 {url_count} URL(s) detected")
+
+    # Tab 3: arXiv Search
+    with tab3:
+        st.markdown("##### 🔍 Search Research Papers")
+
+        # Initialize session state
+        if "arxiv_search_results" not in st.session_state:
+            st.session_state["arxiv_search_results"] = []
+        if "selected_arxiv_pdfs" not in st.session_state:
+            st.session_state["selected_arxiv_pdfs"] = []
+        if "arxiv_metadata" not in st.session_state:
+            st.session_state["arxiv_metadata"] = {}
+
+        col1, col2 = st.columns([3, 1])
         with col1:
-            st.markdown("### 💬 AI Chat Assistant")
-            st.caption("Ask questions and get instant answers from your documents")
+            search_query = st.text_input(
+                "Search query",
+                placeholder="e.g., 'transformers NLP'",
+                help="Search for papers on arXiv",
+                label_visibility="collapsed"
+            )
         with col2:
-            if st.session_state.chat_history:
-                st.metric("Messages", len(st.session_state.chat_history) * 2)
-        
-        st.markdown("---")
-        
-        # Quick action buttons
-        st.markdown("#### ⚡ Quick Actions")
-        quick_cols = st.columns(5)
-        
-        quick_actions = [
-            ("📋 Summarize", "Please provide a comprehensive summary of all the documents"),
-            ("🎯 Main Topics", "What are the main topics discussed in these documents?"),
-            ("💡 Key Findings", "What are the key findings and important results?"),
-            ("🔬 Methodology", "Explain the research methodology or approach used"),
-            ("📊 Conclusions", "What are the main conclusions and implications?")
+            max_results = st.number_input("Max", 1, 20, 5, label_visibility="collapsed")
+
+        if st.button("🔎 Search", use_container_width=True, key="search_arxiv"):
+            if search_query.strip():
+                with st.spinner("🔍 Searching arXiv..."):
+                    search_results = search_arxiv(search_query, max_results=max_results)
+                    if not search_results:
+                        st.warning("No results found. Try a different query.")
+                    else:
+                        st.session_state["arxiv_search_results"] = search_results
+                        st.success(f"✅ Found {len(search_results)} papers")
+            else:
+                st.warning("Please enter a search query")
+
+        # Display search results with better UI
+        if st.session_state["arxiv_search_results"]:
+            st.markdown(f"**📄 {len(st.session_state['arxiv_search_results'])} Results:**")
+
+            for i, item in enumerate(st.session_state["arxiv_search_results"]):
+                with st.container():
+                    # Paper title and checkbox
+                    col1, col2 = st.columns([5, 1])
+                    with col1:
+                        st.markdown(f"**{i+1}. {item['title'][:60]}...**" if len(item['title']) > 60 else f"**{i+1}. {item['title']}**")
+                    with col2:
+                        checkbox_key = f"select_{i}_{item['id']}"
+                        is_selected = st.checkbox("✓", key=checkbox_key, label_visibility="collapsed")
+
+                    # Authors and summary
+                    st.caption(f"👥 {item['authors'][:80]}..." if len(item['authors']) > 80 else f"👥 {item['authors']}")
+
+                    # Summary in expander
+                    with st.expander("📖 Abstract"):
+                        st.write(item['summary'])
+                        st.markdown(f"[View on arXiv]({item['abs_url']}) • [Download PDF]({item['pdf_url']})")
+
+                    # Update selection
+                    if is_selected and item['pdf_url'] not in st.session_state["selected_arxiv_pdfs"]:
+                        st.session_state["selected_arxiv_pdfs"].append(item['pdf_url'])
+                        st.session_state["arxiv_metadata"][item['pdf_url']] = {
+                            "title": item['title'],
+                            "authors": item['authors'],
+                            "categories": item.get('categories', ""),
+                            "year": item.get('year', ""),
+                        }
+                    elif not is_selected and item['pdf_url'] in st.session_state["selected_arxiv_pdfs"]:
+                        st.session_state["selected_arxiv_pdfs"].remove(item['pdf_url'])
+
+                    st.markdown("---")
+
+        # Show selected papers summary
+        if st.session_state["selected_arxiv_pdfs"]:
+            st.success(f"✅ {len(st.session_state['selected_arxiv_pdfs'])} paper(s) selected")
+            if st.button("🗑️ Clear Selection", use_container_width=True):
+                st.session_state["selected_arxiv_pdfs"] = []
+                st.rerun(scope="fragment")
+
+    st.markdown("---")
+
+    # Process URLs and combine all sources
+    pdf_urls = []
+    if pdf_urls_input:
+        pdf_urls = [
+            url.strip()
+            for url in pdf_urls_input.replace(',', '\n').split('\n')
+            if url.strip()
         ]
-        
-        for idx, (label, question) in enumerate(quick_actions):
-            with quick_cols[idx]:
-                if st.button(label, key=f"quick_{idx}", help=f"Ask: {question}"):
-                    # Process the quick question
-                    with st.spinner("🤔 AI is thinking..."):
-                        try:
-                            response = chat_handler.handle_user_query(question, st.session_state.chat_history)
-                            st.session_state.chat_history.append({
-                                "user": question,
-                                "assistant": response
-                            })
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Error: {str(e)}")
-        
-        st.markdown("---")
-        
-        # Display chat history
-        if st.session_state.chat_history:
-            st.markdown("### 📜 Conversation History")
-            
-            # Container for chat messages
-            chat_container = st.container()
-            
-            with chat_container:
-                for idx, entry in enumerate(st.session_state.chat_history):
-                    # User message
-                    with st.chat_message("user", avatar="👤"):
-                        st.markdown(entry["user"])
-                    
-                    # Assistant message
-                    with st.chat_message("assistant", avatar="🤖"):
-                        st.markdown(entry["assistant"])
-            
-            st.markdown("---")
-        else:
-            st.info("👋 Start a conversation by typing a question below or using the quick actions above!")
-        
-        # Action buttons row
-        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-        
+
+    # Add selected arXiv PDFs
+    if "selected_arxiv_pdfs" in st.session_state and st.session_state["selected_arxiv_pdfs"]:
+        pdf_urls = list(dict.fromkeys(pdf_urls + st.session_state["selected_arxiv_pdfs"]))
+
+    # Combine all PDFs, keeping per-document metadata aligned with pdf_docs
+    pdf_docs = []
+    doc_metadata = []
+    if uploaded_files:
+        pdf_docs.extend(uploaded_files)
+        doc_metadata.extend({} for _ in uploaded_files)
+
+    # Show processing summary with metrics
+    total_files = len(uploaded_files) if uploaded_files else 0
+    total_urls = len(pdf_urls)
+    total_arxiv = len(st.session_state.get("selected_arxiv_pdfs", []))
+
+    if total_files > 0 or total_urls > 0:
+        st.markdown("### 📊 Processing Summary")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("📄 Files", total_files)
         with col2:
-            if st.button("📋 Full Summary", use_container_width=True, help="Generate comprehensive summary"):
-                with st.spinner("📝 Generating detailed summary..."):
-                    try:
-                        summary = chat_handler.summarize_research_papers()
-                        st.session_state.chat_history.append({
-                            "user": "Generate a comprehensive summary of all research papers",
-                            "assistant": summary
-                        })
+            st.metric("🔗 URLs", total_urls)
+        with col3:
+            st.metric("🔬 arXiv", total_arxiv)
+
+        st.markdown(f"**Total: {total_files + total_urls} document(s)**")
+
+    # Process PDFs button with enhanced UI
+    process_disabled = (total_files == 0 and total_urls == 0)
+
+    if st.button(
+        "🚀 Process All Documents",
+        use_container_width=True,
+        disabled=process_disabled,
+        type="primary"
+    ):
+        # Uploads are spooled to disk by content hash and read from there, not from the widgets
+        staged_docs = []
+        try:
+            for uploaded in pdf_docs:
+                staged_docs.append(upload_staging.stage_file(uploaded, uploaded.name))
+
+            # Download PDFs from URLs (streamed to disk) after the uploads
+            if pdf_urls:
+                progress_text = "📥 Downloading PDFs from URLs..."
+                progress_bar = st.progress(0, text=progress_text)
+
+                for idx, url in enumerate(pdf_urls):
+                    st.caption(f"Downloading {idx + 1}/{len(pdf_urls)}...")
+                    with metrics.span("download"):
+                        pdf_path = download_pdf_from_url(url)
+                    if pdf_path:
+                        staged_docs.append(upload_staging.stage_path(pdf_path))
+                        # The URL identifies the paper: a new version from the same URL replaces the old one
+                        doc_metadata.append(
+                            {**st.session_state.get("arxiv_metadata", {}).get(url, {"title": url}), "origin": url}
+                        )
+                    progress_bar.progress((idx + 1) / len(pdf_urls), text=progress_text)
+
+            if staged_docs:
+                with st.spinner("⚙️ Processing documents..."), profile_request("ingest", _requested_profiling_mode()):
+                    progress_bar = st.progress(0, text="Starting...")
+
+                    # Extract text (first half of the bar, advanced per file)
+                    def extraction_progress(done: int, total: int, name: str):
+                        progress_bar.progress(0.5 * done / total, text=f"📖 Extracted {done}/{total}: {name}")
+
+                    # Embed and index (second half, advanced per embedding batch)
+                    def embedding_progress(fraction: float):
+                        progress_bar.progress(0.5 + 0.45 * fraction, text=f"🧠 Creating embeddings... {fraction:.0%}")
+
+                    # Files already in the index with the current settings are skipped
+                    if Config.PROGRESSIVE_INGESTION:
+                        # First pages now, the rest in the background: the chat unlocks as soon as this returns
+                        stats = ingest_progressively(staged_docs, doc_metadata, extraction_progress, embedding_progress)
+                    else:
+                        stats = ingest_documents(staged_docs, doc_metadata, extraction_progress, embedding_progress)
+
+                    if stats["chunks"] or stats["skipped"] or stats.get("background"):
+                        progress_bar.progress(1.0, text="✅ Complete!")
+
+                        # Clear selections
+                        if "selected_arxiv_pdfs" in st.session_state:
+                            st.session_state["selected_arxiv_pdfs"] = []
+
+                        # The chat area and search scope depend on the index: rerun the whole app once
+                        st.session_state["ingest_report"] = {**stats, "processed": len(staged_docs)}
                         st.rerun()
-                    except Exception as e:
-                        st.error(f"❌ Error: {str(e)}")
-        
+                    else:
+                        failed = f": {', '.join(stats['failed'])}" if stats.get("failed") else ""
+                        st.error(f"❌ Failed to extract text from documents{failed}")
+                        _render_extraction_errors(stats.get("errors", {}))
+        finally:
+            # Also on st.rerun(); background indexing holds its own handles
+            for staged in staged_docs:
+                staged.close()
+
+    # Statistics of the last processing run, shown after the rerun it triggered
+    report = st.session_state.pop("ingest_report", None)
+    if report:
+        st.success(f"✅ Successfully processed {report['processed']} document(s)!")
+        st.balloons()
+        if report["rebuilt"]:
+            st.info(f"🔄 Processing settings changed, so the index was rebuilt; {report.get('recovered', 0)} document(s) already indexed were processed again")
+        if report.get("dropped"):
+            st.warning(f"⚠️ The files of {len(report['dropped'])} indexed document(s) are no longer available, so the rebuilt index does not contain them: {', '.join(report['dropped'])}")
+        if report["chunks"]:
+            st.info(f"📊 Created {report['chunks']} text chunks for AI analysis")
+        if report.get("background"):
+            st.info(f"📖 {report['background']} document(s) are searchable from their first pages; the remaining pages are being indexed in the background")
+        if report["skipped"]:
+            st.info(f"⏭️ Skipped {report['skipped']} unchanged document(s) already in the index")
+        if report["replaced"]:
+            st.info(f"♻️ Replaced {report['replaced']} updated document(s) downloaded from the same URL")
+        if report.get("failed"):
+            st.warning(f"⚠️ No text could be extracted from {', '.join(report['failed'])}; not added to the index, processing them again will retry")
+        for source, pages in report["skipped_pages"].items():
+            st.warning(f"⚠️ {source}: {len(pages)} page(s) could not be extracted and were skipped ({', '.join(map(str, pages))})")
+        _render_extraction_errors(report.get("errors", {}))
+
+    if process_disabled:
+        st.info("👆 Upload files or add URLs to get started")
+
+    return pdf_docs
+
+def _render_extraction_errors(errors: Dict[str, List[str]]):
+    """One warning per file listing the problems met while extracting it"""
+    for source, messages in errors.items():
+        st.warning(f"⚠️ {source}: " + "; ".join(messages))
+
+def _render_coverage():
+    """Per-document share of pages in the index, for documents not yet fully indexed"""
+    pending = progressive_ingestor.pending()
+    documents = vector_store_manager.list_documents()
+    # Reported until the next ingestion, as the run that queued these files has already finished
+    _render_extraction_errors(progressive_ingestor.errors())
+    incomplete = [doc for doc in documents if document_coverage(doc) < 1.0]
+
+    if not pending and not incomplete:
+        # Background indexing just finished: refresh the chat and search scope once
+        if st.session_state.pop("coverage_refreshing", False):
+            st.rerun()
+        return
+    st.session_state["coverage_refreshing"] = bool(pending)
+
+    st.markdown("### 📑 Indexing Coverage")
+    for doc in incomplete:
+        title = doc.get("title") or doc.get("source") or doc["doc_id"]
+        st.progress(document_coverage(doc), text=f"{title}: {doc['pages_indexed']}/{doc['pages']} pages")
+
+    indexed_sources = {doc.get("source") for doc in documents}
+    for source in pending:
+        if source not in indexed_sources:
+            st.caption(f"⏳ {source}: no text in the first pages, indexing the rest...")
+
+    if pending:
+        st.caption(f"🔄 Indexing the remaining pages of {len(pending)} document(s). You can ask questions now.")
+    else:
+        st.caption("⚠️ Indexing was interrupted. Process these files again to index their remaining pages.")
+    if len(documents) > len(incomplete):
+        st.caption(f"✅ {len(documents) - len(incomplete)} document(s) fully indexed")
+
+def render_indexing_coverage():
+    """Indexing coverage panel, refreshed every few seconds while pages are indexed in the background"""
+    st.fragment(_render_coverage, run_every=2 if progressive_ingestor.pending() else None)()
+
+def _requested_profiling_mode() -> Optional[str]:
+    """Profiling mode for this request from PROFILING_MODE or, in admin mode, the ?profile= query parameter"""
+    return profiling_mode(st.query_params.to_dict())
+
+def render_profiles_panel():
+    """Admin panel listing captured profiles and their top functions"""
+    with st.expander("🛠️ Profiles (admin)", expanded=False):
+        st.caption("Add `?profile=cprofile` or `?profile=sampling` to the URL to profile the next requests")
+        profiles = list_profiles()
+        if not profiles:
+            st.info("No profiles captured yet")
+            return
+
+        names = [profile["name"] for profile in profiles]
+        selected = st.selectbox("Profile", names)
+        files = next(profile["files"] for profile in profiles if profile["name"] == selected)
+
+        if ".txt" in files:
+            with open(files[".txt"], "r", encoding="utf-8") as f:
+                st.code(f.read())
+        if ".pstats" in files:
+            st.markdown("**Top functions (cumulative time)**")
+            st.dataframe(top_functions(files[".pstats"]), use_container_width=True)
+        if ".collapsed" in files:
+            st.markdown("**Top sampled functions**")
+            st.dataframe(top_sampled_functions(files[".collapsed"]), use_container_width=True)
+
+        for ext, path in files.items():
+            if ext == ".txt":
+                continue
+            with open(path, "rb") as f:
+                st.download_button(f"💾 {ext[1:]}", data=f.read(), file_name=os.path.basename(path), key=f"profile_{path}")
+
+def render_search_scope() -> Dict[str, List]:
+    """Render paper/author/category/year/keyword selectors that scope retrieval"""
+    documents = vector_store_manager.list_documents()
+    if not documents:
+        return {}
+
+    titles = {doc["doc_id"]: doc.get("title") or doc.get("source") or doc["doc_id"] for doc in documents}
+    authors = sorted({a.strip() for doc in documents for a in (doc.get("authors") or "").split(",") if a.strip()})
+    categories = sorted({c.strip() for doc in documents for c in (doc.get("categories") or "").split(",") if c.strip()})
+    years = sorted({str(doc["year"]) for doc in documents if doc.get("year")})
+    keywords = sorted({k for doc in documents for k in vector_store_manager.document_keywords.get(doc["doc_id"], [])})
+
+    with st.expander(f"🎯 Search Scope ({len(documents)} paper(s) indexed)", expanded=False):
+        doc_ids = st.multiselect(
+            "Papers",
+            options=list(titles),
+            format_func=lambda doc_id: titles[doc_id],
+            help="Only search inside the selected papers (leave empty to search all)"
+        )
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            selected_authors = st.multiselect("Authors", options=authors) if authors else []
+        with col2:
+            selected_categories = st.multiselect("Categories", options=categories) if categories else []
         with col3:
-            if st.button("🗑️ Clear Chat", use_container_width=True, help="Clear conversation history"):
-                st.session_state.chat_history = []
-                st.rerun()
-        
-        with col4:
-            if st.button("📥 Export", use_container_width=True, help="Export chat history"):
-                if st.session_state.chat_history:
-                    # Create export text
-                    export_text = "# Chat History Export\n\n"
-                    for idx, entry in enumerate(st.session_state.chat_history, 1):
-                        export_text += f"## Q{idx}: {entry['user']}\n\n"
-                        export_text += f"**A{idx}:** {entry['assistant']}\n\n"
-                        export_text += "---\n\n"
-                    
-                    st.download_button(
-                        label="💾 Download",
-                        data=export_text,
-                        file_name="chat_history.md",
-                        mime="text/markdown"
-                    )
+            selected_years = st.multiselect("Years", options=years) if years else []
+        selected_keywords = st.multiselect(
+            "Keywords",
+            options=keywords,
+            help="Papers whose distinctive terms (TF-IDF over all indexed papers) include any selected keyword"
+        ) if keywords else []
+
+        ready = len(stored_summaries(documents))
+        pending = len(insight_scheduler.pending())
+        st.caption(f"📝 Precomputed summaries: {ready}/{len(documents)}" + (f" ({pending} in progress)" if pending else ""))
+
+    return {
+        "doc_ids": doc_ids,
+        "authors": selected_authors,
+        "categories": selected_categories,
+        "years": selected_years,
+        "keywords": selected_keywords,
+    }
+
+def _render_exchange(entry: Dict[str, str]):
+    """Render one question and its answer"""
+    with st.chat_message("user", avatar="👤"):
+        st.markdown(entry["user"])
+    with st.chat_message("assistant", avatar="🤖"):
+        st.markdown(entry["assistant"])
+
+def _render_history():
+    """Render the newest turns of the conversation, with older ones behind a button"""
+    history = st.session_state.chat_history
+    page_size = max(1, Config.CHAT_HISTORY_PAGE_SIZE)
+    visible = st.session_state.setdefault("chat_visible_turns", page_size)
+
+    hidden = max(0, len(history) - visible)
+    if hidden and st.button(f"⬆️ Show earlier messages ({hidden} hidden)", key="chat_show_earlier", use_container_width=True):
+        visible = st.session_state.chat_visible_turns = visible + page_size
+
+    for entry in history[-visible:]:
+        _render_exchange(entry)
+
+@st.fragment
+def render_chat_area():
+    """Chat area as a fragment: questions, quick actions and paging rerun only this part of the page
+
+    New answers are drawn below the existing messages instead of rerunning the script,
+    and only the last CHAT_HISTORY_PAGE_SIZE turns are rendered until more are requested.
+    """
+    # Header with stats
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.markdown("### 💬 AI Chat Assistant")
+        st.caption("Ask questions and get instant answers from your documents")
+    with col2:
+        message_count = st.empty()
+
+    st.markdown("---")
+
+    # Restrict retrieval to selected papers
+    search_filters = render_search_scope()
+
+    # Quick action buttons
+    st.markdown("#### ⚡ Quick Actions")
+    quick_cols = st.columns(5)
+
+    quick_actions = [
+        ("📋 Summarize", "Please provide a comprehensive summary of all the documents"),
+        ("🎯 Main Topics", "What are the main topics discussed in these documents?"),
+        ("💡 Key Findings", "What are the key findings and important results?"),
+        ("🔬 Methodology", "Explain the research methodology or approach used"),
+        ("📊 Conclusions", "What are the main conclusions and implications?")
+    ]
+
+    quick_question = None
+    quick_summary = False
+    for idx, (label, question) in enumerate(quick_actions):
+        with quick_cols[idx]:
+            if st.button(label, key=f"quick_{idx}", help=f"Ask: {question}"):
+                # Summarize is answered from the precomputed summaries when they are ready
+                if idx == 0:
+                    quick_summary = True
                 else:
-                    st.warning("No chat history to export")
-        
-        # Main chat input
-        user_query = st.chat_input("💭 Type your question here and press Enter...")
-        
-        # Handle pending question (from quick actions)
-        if "pending_question" in st.session_state:
-            user_query = st.session_state.pending_question
-            del st.session_state.pending_question
-        
-        if user_query:
-            with st.spinner("🤔 AI is analyzing your question..."):
+                    quick_question = question
+
+    st.markdown("---")
+
+    # Display chat history; new exchanges are appended to the same container below
+    history_heading = st.empty()
+    history_container = st.container()
+    if st.session_state.chat_history:
+        history_heading.markdown("### 📜 Conversation History")
+        with history_container:
+            _render_history()
+    else:
+        history_heading.info("👋 Start a conversation by typing a question below or using the quick actions above!")
+
+    st.markdown("---")
+
+    # Action buttons row
+    col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+
+    with col2:
+        summary_requested = st.button("📋 Full Summary", use_container_width=True, help="Generate comprehensive summary") or quick_summary
+
+    with col3:
+        if st.button("🗑️ Clear Chat", use_container_width=True, help="Clear conversation history"):
+            st.session_state.chat_history = []
+            st.session_state.chat_visible_turns = Config.CHAT_HISTORY_PAGE_SIZE
+            st.rerun(scope="fragment")
+
+    with col4:
+        if st.session_state.chat_history:
+            # Create export text
+            export_text = "# Chat History Export\n\n"
+            for idx, entry in enumerate(st.session_state.chat_history, 1):
+                export_text += f"## Q{idx}: {entry['user']}\n\n"
+                export_text += f"**A{idx}:** {entry['assistant']}\n\n"
+                export_text += "---\n\n"
+
+            st.download_button(
+                label="📥 Export",
+                data=export_text,
+                file_name="chat_history.md",
+                mime="text/markdown",
+                use_container_width=True,
+                help="Export chat history",
+                on_click="ignore"
+            )
+
+    # Main chat input
+    user_query = st.chat_input("💭 Type your question here and press Enter...")
+
+    # Handle pending question (from quick actions)
+    if "pending_question" in st.session_state:
+        user_query = st.session_state.pending_question
+        del st.session_state.pending_question
+
+    def start_exchange(question: str):
+        if not st.session_state.chat_history:
+            history_heading.markdown("### 📜 Conversation History")
+        with st.chat_message("user", avatar="👤"):
+            st.markdown(question)
+
+    question = quick_question or user_query
+    if question:
+        with history_container:
+            start_exchange(question)
+            with st.chat_message("assistant", avatar="🤖"), profile_request("chat", _requested_profiling_mode()):
                 try:
-                    response = chat_handler.handle_user_query(
-                        user_query,
-                        st.session_state.chat_history
-                    )
-                    
-                    # Store the new exchange
-                    st.session_state.chat_history.append({
-                        "user": user_query,
-                        "assistant": response
-                    })
-                    
-                    # Rerun to display the new message
-                    st.rerun()
-                    
+                    # Tokens are drawn as they arrive; earlier messages are left untouched. The stream runs on
+                    # the shared loop the pooled async LLM clients belong to, not a fresh loop per rerun
+                    response = st.write_stream(background_loop.iterate(
+                        chat_handler.astream_user_query(question, st.session_state.chat_history, filters=search_filters)
+                    ))
+                    st.session_state.chat_history.append({"user": question, "assistant": response})
                 except Exception as e:
                     st.error(f"❌ Error processing your question: {str(e)}")
                     st.info("💡 Tip: Try rephrasing your question or check if the documents are properly processed")
-    
+
+    if summary_requested:
+        question = "Generate a comprehensive summary of all research papers"
+        with history_container:
+            start_exchange(question)
+            with st.chat_message("assistant", avatar="🤖"):
+                with st.spinner("📝 Generating detailed summary..."), profile_request("summary", _requested_profiling_mode()):
+                    try:
+                        summary = chat_handler.summarize_research_papers()
+                        st.markdown(summary)
+                        st.session_state.chat_history.append({"user": question, "assistant": summary})
+                    except Exception as e:
+                        st.error(f"❌ Error: {str(e)}")
+
+    if st.session_state.chat_history:
+        message_count.metric("Messages", len(st.session_state.chat_history) * 2)
+
+def render_chat_interface(index_exists: bool):
+    """Render the main chat interface"""
+
+    # Initialize chat history in session state
+    if "chat_history" not in st.session_state:
+        st.session_state.chat_history = []
+
+    if index_exists:
+        render_chat_area()
     else:
         # Welcome screen when no documents are processed
         st.markdown("### 👋 Welcome to Research Document Summarizer!")
-        
+
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
             st.markdown("""
@@ -693,32 +912,32 @@ def render_chat_interface(index_exists: bool):
                 <h2 style='color: #667eea;'>🚀 Get Started in 3 Easy Steps</h2>
             </div>
             """, unsafe_allow_html=True)
-            
+
             # Step-by-step guide
             st.markdown("""
             <div style='background: white; padding: 1.5rem; border-radius: 15px; margin: 1rem 0; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
                 <h3 style='color: #667eea;'>1️⃣ Upload Documents</h3>
                 <p>Use the sidebar to upload PDF files, enter URLs, or search arXiv for research papers</p>
             </div>
-            
+
             <div style='background: white; padding: 1.5rem; border-radius: 15px; margin: 1rem 0; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
                 <h3 style='color: #667eea;'>2️⃣ Process & Analyze</h3>
                 <p>Click "Process All Documents" to extract text and create AI-powered embeddings</p>
             </div>
-            
+
             <div style='background: white; padding: 1.5rem; border-radius: 15px; margin: 1rem 0; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
                 <h3 style='color: #667eea;'>3️⃣ Chat & Explore</h3>
                 <p>Ask questions, get summaries, and discover insights from your research papers</p>
             </div>
             """, unsafe_allow_html=True)
-        
+
         st.markdown("---")
-        
+
         # Features showcase
         st.markdown("### ✨ Powerful Features")
-        
+
         feat_col1, feat_col2, feat_col3 = st.columns(3)
-        
+
         with feat_col1:
             st.markdown("""
             **📚 Multi-Source Support**
@@ -727,7 +946,7 @@ def render_chat_interface(index_exists: bool):
             - arXiv integration
             - Batch processing
             """)
-        
+
         with feat_col2:
             st.markdown("""
             **🤖 AI-Powered Chat**
@@ -736,7 +955,7 @@ def render_chat_interface(index_exists: bool):
             - Chat history tracking
             - Export conversations
             """)
-        
+
         with feat_col3:
             st.markdown("""
             **🔍 Smart Analysis**
@@ -745,14 +964,14 @@ def render_chat_interface(index_exists: bool):
             - Methodology analysis
             - Citation-ready outputs
             """)
-        
+
         st.markdown("---")
-        
+
         # Example questions
         st.markdown("### 🎯 Example Questions You Can Ask")
-        
+
         ex_col1, ex_col2 = st.columns(2)
-        
+
         with ex_col1:
             st.markdown("""
             - "What is the main contribution of this research?"
@@ -760,7 +979,7 @@ def render_chat_interface(index_exists: bool):
             - "What are the experimental results?"
             - "Compare findings across documents"
             """)
-        
+
         with ex_col2:
             st.markdown("""
             - "What datasets were used?"
@@ -768,12 +987,12 @@ def render_chat_interface(index_exists: bool):
             - "What future work is suggested?"
             - "Explain the key concepts"
             """)
-        
+
         st.markdown("---")
-        
+
         # Call to action
         st.info("👈 **Ready to start?** Use the sidebar to upload your first document!")
-        
+
         # Tips section
         with st.expander("💡 Pro Tips for Best Results"):
             st.markdown("""
@@ -782,12 +1001,12 @@ def render_chat_interface(index_exists: bool):
             - Reference particular sections if needed
             - Use follow-up questions for deeper insights
             - Try the quick action buttons for common queries
-            
+
             **Document Processing:**
             - Ensure PDFs are text-based (not scanned images)
             - Process related papers together for better context
             - Wait for complete processing before asking questions
-            
+
             **Maximizing Features:**
             - Use arXiv search to find latest research
             - Export chat history for future reference
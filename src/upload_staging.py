@@ -0,0 +1,112 @@
+import io
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from typing import BinaryIO, Optional
+from config.settings import Config
+from src.metrics import metrics
+
+# Size of the blocks files are copied and hashed in
+BLOCK_SIZE = 1 << 20
+
+class StagedPDF(io.BufferedReader):
+    """Read-only handle on a staged file that keeps the name it was uploaded with
+
+    path is the content-addressed file on disk and sha256 its hash, so the file is not
+    hashed again and extraction workers can open it themselves instead of receiving its bytes.
+    """
+
+    def __init__(self, path: str, name: str, sha256: str):
+        super().__init__(io.FileIO(path, "rb"), buffer_size=BLOCK_SIZE)
+        self.path = path
+        self.sha256 = sha256
+        self._name = name
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+class UploadStaging:
+    """Spools uploads and downloads to a content-addressed directory
+
+    Each file is stored once as <sha256>.pdf, however many sessions upload it, and is
+    handed on as a StagedPDF opened from disk. Files not staged again for
+    UPLOAD_RETENTION_HOURS are deleted.
+    """
+
+    def __init__(self, directory: Optional[str] = None, retention_hours: Optional[float] = None):
+        self.directory = directory or Config.UPLOAD_DIR
+        self.retention_hours = Config.UPLOAD_RETENTION_HOURS if retention_hours is None else retention_hours
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, sha256: str) -> str:
+        return os.path.join(self.directory, f"{sha256}.pdf")
+
+    def stage_file(self, upload: BinaryIO, name: Optional[str] = None) -> StagedPDF:
+        """Copy an open file (e.g. a Streamlit upload) to the staging directory in blocks"""
+        name = os.path.basename(name or getattr(upload, 'name', None) or "upload.pdf")
+        os.makedirs(self.directory, exist_ok=True)
+        digest = hashlib.sha256()
+        upload.seek(0)
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".part", delete=False) as spool:
+            for block in iter(lambda: upload.read(BLOCK_SIZE), b""):
+                digest.update(block)
+                spool.write(block)
+        upload.seek(0)
+        return self._store(spool.name, digest.hexdigest(), name)
+
+    def stage_path(self, path: str, name: Optional[str] = None) -> StagedPDF:
+        """Move a file on disk (e.g. a finished download) into the staging directory"""
+        os.makedirs(self.directory, exist_ok=True)
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+                digest.update(block)
+        spool = tempfile.NamedTemporaryFile(dir=self.directory, suffix=".part", delete=False)
+        spool.close()
+        # A copy if the file is on another filesystem (e.g. the system temp directory)
+        shutil.move(path, spool.name)
+        return self._store(spool.name, digest.hexdigest(), name or os.path.basename(path))
+
+    def _store(self, spool_path: str, sha256: str, name: str) -> StagedPDF:
+        path = self._path(sha256)
+        with self._lock:
+            if os.path.exists(path):
+                # Already staged by this or another session: keep the existing copy and refresh its age
+                os.remove(spool_path)
+                os.utime(path)
+                metrics.inc("rag_cache_requests_total", cache="upload_staging", result="hit")
+            else:
+                os.replace(spool_path, path)
+                metrics.inc("rag_cache_requests_total", cache="upload_staging", result="miss")
+        self.prune()
+        return StagedPDF(path, name, sha256)
+
+    def open(self, pdf: StagedPDF) -> StagedPDF:
+        """A second, independent handle on a staged file"""
+        return StagedPDF(pdf.path, pdf.name, pdf.sha256)
+
+    def prune(self, force: bool = False):
+        """Delete staged files older than the retention period (at most once a minute)"""
+        if self.retention_hours <= 0 or not os.path.isdir(self.directory):
+            return
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_prune < 60:
+                return
+            self._last_prune = now
+            cutoff = now - self.retention_hours * 3600
+            for entry in os.scandir(self.directory):
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        # Open handles (e.g. background indexing) keep reading an unlinked file on POSIX
+                        os.remove(entry.path)
+                except OSError:
+                    continue
+
+# Global instance
+upload_staging = UploadStaging()
@@ -1,49 +1,680 @@
-import streamlit as st
 import os
-from langchain_huggingface import HuggingFaceEmbeddings
+import copy
+import json
+import bisect
+import shutil
+import threading
+from contextlib import contextmanager
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
-from typing import List
+from typing import List, Dict, Optional, Tuple, Callable, Any, NamedTuple
 from config.settings import Config
+from src.metrics import metrics
+from src.embedding_backends import create_embeddings
+from src.query_embedder import QueryEmbedder
+
+DOCUMENT_MAP_FILE = "documents.json"
+DOCUMENT_VECTORS_FILE = "document_vectors.npy"
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock on the file at path, which also excludes other processes"""
+    try:
+        import fcntl
+    except ImportError:
+        # Not available on Windows; callers still hold their own thread locks
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _l2_distances(query_vectors: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """Squared L2 distances via ||x||^2 - 2 q.x + ||q||^2, one matmul for all queries"""
+    return (
+        np.einsum("ij,ij->i", vectors, vectors)[None, :]
+        - 2.0 * query_vectors @ vectors.T
+        + np.einsum("ij,ij->i", query_vectors, query_vectors)[:, None]
+    )
+
+def distance_to_similarity(distance: float) -> float:
+    """Cosine similarity from the squared L2 distance of unit-length vectors (create_embeddings normalizes them)"""
+    return 1.0 - distance / 2.0
+
+def _is_abstract(metadata: Dict) -> bool:
+    return "abstract" in str(metadata.get("section", "")).lower()
+
+class IndexSnapshot(NamedTuple):
+    """A loaded index with the document map and routing vectors that describe it
+
+    Snapshots are never modified: a commit builds a new one and publishes it with a single
+    reference swap, so a search that took a snapshot keeps ranges that match its index.
+    """
+    vector_store: Any
+    document_map: Dict[str, Dict]
+    document_vectors: Optional[np.ndarray]
+    mtime: Optional[float]
+
+EMPTY_SNAPSHOT = IndexSnapshot(None, {}, None, None)
+
+def _copy_vector_store(vector_store: FAISS) -> FAISS:
+    """Copy of a FAISS store to modify while searches keep reading the original
+
+    FAISS deletes compact vector ids in place, so the index, docstore and id map are all copied.
+    """
+    copied = copy.copy(vector_store)
+    copied.index = faiss.clone_index(vector_store.index)
+    copied.docstore = InMemoryDocstore(dict(vector_store.docstore._dict))
+    copied.index_to_docstore_id = dict(vector_store.index_to_docstore_id)
+    return copied
+
+def _without_documents(
+    document_map: Dict[str, Dict],
+    document_vectors: np.ndarray,
+    doc_ids: List[str]
+) -> Tuple[Dict[str, Dict], np.ndarray]:
+    """Document map and routing vectors after deleting doc_ids from the index
+
+    FAISS compacts the vector ids on delete, so every remaining range moves down by the
+    number of deleted vectors before it; ranges that become adjacent are merged.
+    """
+    doc_ids = set(doc_ids)
+    removed = sorted(r for doc_id in doc_ids for r in document_map.get(doc_id, {}).get("ranges", []))
+    if not removed:
+        return document_map, document_vectors
+    starts = [start for start, _ in removed]
+    deleted_before = np.concatenate([[0], np.cumsum([end - start for start, end in removed])])
+
+    remaining, rows = {}, []
+    for row, (doc_id, entry) in enumerate(document_map.items()):
+        if doc_id in doc_ids:
+            continue
+        ranges = []
+        for start, end in entry["ranges"]:
+            shift = int(deleted_before[bisect.bisect_left(starts, start)])
+            if ranges and ranges[-1][1] == start - shift:
+                ranges[-1][1] = end - shift
+            else:
+                ranges.append([start - shift, end - shift])
+        remaining[doc_id] = {**entry, "ranges": ranges}
+        rows.append(row)
+    return remaining, document_vectors[rows]
+
+def _top_k(row: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k smallest values, nearest first"""
+    top = np.argpartition(row, k)[:k] if len(row) > k else np.arange(len(row))
+    return top[np.argsort(row[top])]
 
 class VectorStoreManager:
-    def __init__(self):
+    def __init__(self, index_path: Optional[str] = None, embeddings=None, num_shards: Optional[int] = None):
         self.config = Config()
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=self.config.EMBEDDING_MODEL
-        )
-    
-    @st.cache_resource
-    def create_vector_store(_self, text_chunks: List[str]):
-        """Convert chunks into embeddings and store in FAISS"""
-        vector_store = FAISS.from_texts(
-            texts=text_chunks, 
-            embedding=_self.embeddings
-        )
-        
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(_self.config.FAISS_INDEX_PATH), exist_ok=True)
-        
-        vector_store.save_local(_self.config.FAISS_INDEX_PATH)
+        self.index_path = index_path or self.config.FAISS_INDEX_PATH
+        self.num_shards = num_shards or self.config.INDEX_SHARDS
+        self._embeddings = embeddings
+        self._shards = None
+        self.query_embedder = QueryEmbedder(lambda texts: self.embeddings.embed_documents(texts))
+        self._snapshot = EMPTY_SNAPSHOT
+        # Reentrant: writers load the current snapshot, which may recover an interrupted save
+        self._write_lock = threading.RLock()
+        self.document_keywords: Dict[str, List[str]] = {}
+
+    @property
+    def embeddings(self):
+        """Embedding model, created on first use"""
+        if self._embeddings is None:
+            self._embeddings = create_embeddings(self.config.EMBEDDING_MODEL)
+        return self._embeddings
+
+    def _shard_pool(self):
+        """Worker processes serving the index shards, started on first use"""
+        if self._shards is None:
+            from src.sharding import ShardPool
+            self._shards = ShardPool(self.index_path, self.num_shards)
+        return self._shards
+
+    def embed_chunks(self, text_chunks: List[str], progress_callback: Optional[Callable[[float], None]] = None) -> List[List[float]]:
+        """Embed chunks in batches so progress_callback(fraction) can report real progress"""
+        vectors = []
+        batch_size = self.config.EMBEDDING_BATCH_SIZE
+        with metrics.span("embed"):
+            for start in range(0, len(text_chunks), batch_size):
+                vectors.extend(self.embeddings.embed_documents(text_chunks[start:start + batch_size]))
+                if progress_callback:
+                    progress_callback(min(start + batch_size, len(text_chunks)) / len(text_chunks))
+        return vectors
+
+    def create_vector_store(
+        self,
+        text_chunks: List[str],
+        metadatas: Optional[List[Dict]] = None,
+        progress_callback: Optional[Callable[[float], None]] = None
+    ):
+        """Convert chunks into embeddings and store them in a new FAISS index, replacing any existing one"""
+        return self.upsert_documents(text_chunks, metadatas, rebuild=True, progress_callback=progress_callback)
+
+    def upsert_documents(
+        self,
+        text_chunks: List[str],
+        metadatas: Optional[List[Dict]] = None,
+        remove_doc_ids: Optional[List[str]] = None,
+        rebuild: bool = False,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        ledger=None,
+        vectors: Optional[List[List[float]]] = None
+    ):
+        """Add chunks to the saved index after removing remove_doc_ids, then save atomically
+
+        rebuild=True starts from an empty index. The ingestion ledger, if given, is saved together with the index.
+        Precomputed vectors skip the embedding step.
+        """
+        if vectors is None:
+            vectors = self.embed_chunks(text_chunks, progress_callback) if text_chunks else []
+
+        if self.num_shards > 1:
+            with self._write_lock, metrics.span("index_write", mode="sharded"):
+                self._shard_pool().upsert(text_chunks, vectors, metadatas, remove_doc_ids or [], rebuild, ledger)
+                self._snapshot = IndexSnapshot(self._shards, self._shards.document_map(), None, None)
+            return self._shards
+
+        with self._write_lock, metrics.span("index_write"):
+            current = EMPTY_SNAPSHOT
+            if not rebuild:
+                try:
+                    current = self.load_snapshot()
+                except FileNotFoundError:
+                    current = EMPTY_SNAPSHOT
+
+            # Searches keep reading the published snapshot; changes go to a copy that replaces it on save
+            vector_store = current.vector_store
+            if vector_store is not None and (remove_doc_ids or text_chunks):
+                vector_store = _copy_vector_store(vector_store)
+            # The document map and routing vectors are updated for the changed documents only
+            document_map, document_vectors = current.document_map, current.document_vectors
+            if vector_store is not None and remove_doc_ids:
+                self._delete_documents(vector_store, document_map, remove_doc_ids)
+                document_map, document_vectors = _without_documents(document_map, document_vectors, remove_doc_ids)
+            if text_chunks:
+                first_id = 0 if vector_store is None else vector_store.index.ntotal
+                if vector_store is None:
+                    vector_store = FAISS.from_embeddings(
+                        text_embeddings=list(zip(text_chunks, vectors)),
+                        embedding=self.embeddings,
+                        metadatas=metadatas
+                    )
+                else:
+                    vector_store.add_embeddings(list(zip(text_chunks, vectors)), metadatas=metadatas)
+                document_map, document_vectors = self._with_documents(
+                    document_map, document_vectors, first_id, metadatas or [{} for _ in text_chunks], vectors
+                )
+            if vector_store is None:
+                if rebuild:
+                    self.delete_index()
+                return None
+            if document_map is None:
+                # New chunks of a document already in the index: rebuild both from the index
+                document_map = self._build_document_map(vector_store)
+                document_vectors = self._build_document_vectors(vector_store, document_map)
+            self._save_atomic(vector_store, ledger, document_map, document_vectors)
         return vector_store
-    
+
+    def delete_index(self):
+        """Remove the saved index and forget the loaded copy"""
+        shutil.rmtree(self.index_path, ignore_errors=True)
+        self._snapshot = EMPTY_SNAPSHOT
+
+    def _delete_documents(self, vector_store, document_map: Dict[str, Dict], doc_ids: List[str]):
+        """Remove every vector belonging to the given documents"""
+        docstore_ids = [
+            vector_store.index_to_docstore_id[vector_id]
+            for doc_id in dict.fromkeys(doc_ids)
+            for start, end in document_map.get(doc_id, {}).get("ranges", [])
+            for vector_id in range(start, end)
+        ]
+        if docstore_ids:
+            vector_store.delete(docstore_ids)
+
+    def _recover_interrupted_save(self):
+        """Restore the previous index if a save was interrupted between the two renames"""
+        index_path = self.index_path
+        if os.path.exists(index_path):
+            return
+        # Under the write lock and the swap lock, so a save in progress in this or another process is never
+        # mistaken for an interrupted one
+        with self._write_lock, file_lock(index_path + ".swap"):
+            if not os.path.exists(index_path) and os.path.exists(index_path + ".old"):
+                os.rename(index_path + ".old", index_path)
+
+    def _with_documents(
+        self,
+        document_map: Dict[str, Dict],
+        document_vectors: Optional[np.ndarray],
+        first_id: int,
+        metadatas: List[Dict],
+        vectors: List[List[float]]
+    ) -> Tuple[Optional[Dict[str, Dict]], Optional[np.ndarray]]:
+        """Document map and routing vectors after appending chunks at vector id first_id
+
+        Returns (None, None) when a chunk belongs to a document already in the map.
+        """
+        added: Dict[str, Dict] = {}
+        positions: Dict[str, List[int]] = {}
+        for position, metadata in enumerate(metadatas):
+            doc_id = metadata.get("doc_id")
+            if not doc_id:
+                continue
+            if doc_id in document_map:
+                return None, None
+            entry = added.get(doc_id)
+            if entry is None:
+                entry = {key: value for key, value in metadata.items() if key not in ("doc_id", "chunk", "section")}
+                entry["ranges"] = []
+                entry["chunks"] = 0
+                added[doc_id] = entry
+                positions[doc_id] = []
+            vector_id = first_id + position
+            ranges = entry["ranges"]
+            if ranges and ranges[-1][1] == vector_id:
+                ranges[-1][1] = vector_id + 1
+            else:
+                ranges.append([vector_id, vector_id + 1])
+            entry["chunks"] += 1
+            positions[doc_id].append(position)
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows = np.zeros((len(added), vectors.shape[1]), dtype=np.float32)
+        for row, doc_id in enumerate(added):
+            selected = positions[doc_id]
+            if self.config.ROUTING_DOCUMENT_VECTOR == "abstract":
+                selected = [position for position in selected if _is_abstract(metadatas[position])] or selected
+            rows[row] = vectors[selected].mean(axis=0)
+        if document_vectors is None or not len(document_vectors):
+            document_vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        return {**document_map, **added}, np.concatenate([document_vectors, rows])
+
+    def _save_atomic(self, vector_store, ledger=None, document_map: Optional[Dict[str, Dict]] = None, document_vectors: Optional[np.ndarray] = None):
+        """Write the index, document map and ledger to a temporary directory and swap it into place
+
+        The document map and routing vectors are built from the index unless given.
+        """
+        index_path = self.index_path
+        tmp_path, old_path = index_path + ".tmp", index_path + ".old"
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+        vector_store.save_local(tmp_path)
+        if document_map is None:
+            document_map = self._build_document_map(vector_store)
+        with open(os.path.join(tmp_path, DOCUMENT_MAP_FILE), "w", encoding="utf-8") as f:
+            json.dump({"documents": document_map}, f)
+        if document_vectors is None:
+            document_vectors = self._build_document_vectors(vector_store, document_map)
+        np.save(os.path.join(tmp_path, DOCUMENT_VECTORS_FILE), document_vectors)
+        if ledger is not None:
+            ledger.save(tmp_path)
+
+        self._recover_interrupted_save()
+        with file_lock(index_path + ".swap"):
+            shutil.rmtree(old_path, ignore_errors=True)
+            if os.path.exists(index_path):
+                os.rename(index_path, old_path)
+            os.rename(tmp_path, index_path)
+            shutil.rmtree(old_path, ignore_errors=True)
+
+        self._snapshot = IndexSnapshot(vector_store, document_map, document_vectors, self._index_mtime())
+
+    def _saved_mtime(self) -> Optional[float]:
+        """Modification time of the saved index, waiting for a save that is between its two renames"""
+        mtime = self._index_mtime()
+        if mtime is None:
+            self._recover_interrupted_save()
+            mtime = self._index_mtime()
+        return mtime
+
+    def _index_mtime(self) -> Optional[float]:
+        """Return the modification time of the saved FAISS index"""
+        try:
+            return os.path.getmtime(os.path.join(self.index_path, "index.faiss"))
+        except FileNotFoundError:
+            # Not saved yet, or a save is swapping it in
+            return None
+
+    def _build_document_map(self, vector_store) -> Dict[str, Dict]:
+        """Map each document id to its metadata and contiguous vector id ranges"""
+        document_map: Dict[str, Dict] = {}
+        for vector_id in sorted(vector_store.index_to_docstore_id):
+            doc = vector_store.docstore.search(vector_store.index_to_docstore_id[vector_id])
+            metadata = getattr(doc, "metadata", None) or {}
+            doc_id = metadata.get("doc_id")
+            if not doc_id:
+                continue
+
+            entry = document_map.get(doc_id)
+            if entry is None:
+                entry = {
+                    key: value for key, value in metadata.items()
+                    if key not in ("doc_id", "chunk", "section")
+                }
+                entry["ranges"] = []
+                entry["chunks"] = 0
+                document_map[doc_id] = entry
+
+            # Extend the last range when ids are contiguous, otherwise open a new one
+            ranges = entry["ranges"]
+            if ranges and ranges[-1][1] == vector_id:
+                ranges[-1][1] = vector_id + 1
+            else:
+                ranges.append([vector_id, vector_id + 1])
+            entry["chunks"] += 1
+
+        return document_map
+
+    def _build_document_vectors(self, vector_store, document_map: Dict[str, Dict]) -> np.ndarray:
+        """One routing vector per document (rows follow document_map order)
+
+        The mean of the document's chunk vectors, or of its abstract chunks when
+        ROUTING_DOCUMENT_VECTOR is "abstract" and the document has any.
+        """
+        matrix = np.zeros((len(document_map), vector_store.index.d), dtype=np.float32)
+        for row, entry in enumerate(document_map.values()):
+            ids = [vector_id for start, end in entry["ranges"] for vector_id in range(start, end)]
+            vectors = np.concatenate([
+                vector_store.index.reconstruct_n(start, end - start) for start, end in entry["ranges"]
+            ])
+            if self.config.ROUTING_DOCUMENT_VECTOR == "abstract":
+                abstract = [
+                    position for position, vector_id in enumerate(ids)
+                    if _is_abstract(vector_store.docstore.search(vector_store.index_to_docstore_id[vector_id]).metadata)
+                ]
+                if abstract:
+                    vectors = vectors[abstract]
+            matrix[row] = vectors.mean(axis=0)
+        return matrix
+
+    def _load_document_vectors(self, vector_store, document_map: Dict[str, Dict]) -> np.ndarray:
+        """Load the routing vectors, rebuilding them for indexes saved without them"""
+        vectors_path = os.path.join(self.index_path, DOCUMENT_VECTORS_FILE)
+        if os.path.exists(vectors_path):
+            document_vectors = np.load(vectors_path)
+            if len(document_vectors) == len(document_map):
+                return document_vectors
+        return self._build_document_vectors(vector_store, document_map)
+
+    def _load_document_map(self, vector_store) -> Dict[str, Dict]:
+        """Load the document map, rebuilding it for indexes saved without one"""
+        map_path = os.path.join(self.index_path, DOCUMENT_MAP_FILE)
+        if os.path.exists(map_path):
+            with open(map_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("documents", {})
+        return self._build_document_map(vector_store)
+
+    def load_snapshot(self) -> IndexSnapshot:
+        """The current index with its document map and routing vectors, loaded from disk when it changed"""
+        if self.num_shards > 1:
+            # The shard workers hold the indexes; keep only the merged document map here
+            self._snapshot = IndexSnapshot(self._shard_pool(), self._shard_pool().document_map(), None, None)
+            return self._snapshot
+
+        # Reuse the loaded index until the saved one changes on disk
+        snapshot = self._snapshot
+        mtime = self._saved_mtime()
+        if mtime is None:
+            raise FileNotFoundError("FAISS index not found. Please process a PDF first.")
+        if snapshot.vector_store is not None and mtime == snapshot.mtime:
+            metrics.inc("rag_cache_requests_total", cache="index", result="hit")
+            return snapshot
+        metrics.inc("rag_cache_requests_total", cache="index", result="miss")
+
+        while True:
+            loaded_mtime = mtime
+            try:
+                vector_store = FAISS.load_local(
+                    self.index_path,
+                    self.embeddings,
+                    allow_dangerous_deserialization=True
+                )
+                document_map = self._load_document_map(vector_store)
+                document_vectors = self._load_document_vectors(vector_store, document_map)
+            except Exception:
+                # Files that vanished mid-read belong to an index another process replaced: read the new one
+                if self._index_mtime() == loaded_mtime:
+                    raise
+                loaded_mtime = None
+            # Another process may have swapped in a new index while the files were read
+            mtime = self._saved_mtime()
+            if mtime is None:
+                raise FileNotFoundError("FAISS index not found. Please process a PDF first.")
+            if mtime == loaded_mtime:
+                break
+        self._snapshot = IndexSnapshot(vector_store, document_map, document_vectors, mtime)
+        return self._snapshot
+
     def load_vector_store(self):
         """Load existing FAISS vector store"""
-        if not os.path.exists(self.config.FAISS_INDEX_PATH):
-            raise FileNotFoundError("FAISS index not found. Please process a PDF first.")
-        
-        return FAISS.load_local(
-            self.config.FAISS_INDEX_PATH,
-            self.embeddings,
-            allow_dangerous_deserialization=True
-        )
-    
-    def similarity_search(self, query: str, k: int = None):
-        """Perform similarity search on vector store"""
+        return self.load_snapshot().vector_store
+
+    def list_documents(self) -> List[Dict]:
+        """List indexed documents with their metadata"""
+        try:
+            document_map = self.load_snapshot().document_map
+        except FileNotFoundError:
+            return []
+
+        return [
+            {"doc_id": doc_id, **{k: v for k, v in entry.items() if k != "ranges"}}
+            for doc_id, entry in document_map.items()
+        ]
+
+    def document_info(self, doc_id: str) -> Dict:
+        """Metadata of one indexed document (empty when it is not in the index)"""
+        try:
+            entry = self.load_snapshot().document_map.get(doc_id) or {}
+        except FileNotFoundError:
+            return {}
+        return {k: v for k, v in entry.items() if k != "ranges"}
+
+    def resolve_filters(self, filters: Optional[Dict], document_map: Optional[Dict[str, Dict]] = None) -> Optional[List[str]]:
+        """Resolve metadata and keyword filters to the matching document ids (None means no filter)"""
+        if not filters or not any(filters.values()):
+            return None
+        if document_map is None:
+            document_map = self._snapshot.document_map
+
+        doc_ids = set(filters.get("doc_ids") or [])
+        authors = [a.lower() for a in filters.get("authors") or []]
+        categories = {c.lower() for c in filters.get("categories") or []}
+        years = {str(y) for y in filters.get("years") or []}
+        keywords = {k.lower() for k in filters.get("keywords") or []}
+
+        matches = []
+        for doc_id, entry in document_map.items():
+            if doc_ids and doc_id not in doc_ids:
+                continue
+            if authors and not any(a in (entry.get("authors") or "").lower() for a in authors):
+                continue
+            if categories:
+                doc_categories = {c.strip().lower() for c in (entry.get("categories") or "").split(",")}
+                if not categories & doc_categories:
+                    continue
+            if years and str(entry.get("year")) not in years:
+                continue
+            if keywords and not keywords & set(self.document_keywords.get(doc_id, ())):
+                continue
+            matches.append(doc_id)
+        return matches
+
+    def _forwarded_filters(self, filters: Optional[Dict]) -> Tuple[Optional[Dict], bool]:
+        """Filters for shard workers or the resource server, which do not know the keyword facets
+
+        Keyword filters are resolved to document ids here. Returns (filters, whether anything can match).
+        """
+        if not filters or not filters.get("keywords"):
+            return filters, True
+        doc_ids = self.resolve_filters(filters)
+        return {"doc_ids": doc_ids}, bool(doc_ids)
+
+    def document_chunks(self) -> Dict[str, List[str]]:
+        """Text of every chunk in the index, grouped by document id"""
+        vector_store, document_map, _, _ = self.load_snapshot()
+        if self.num_shards > 1:
+            return self._shards.document_chunks()
+
+        chunks: Dict[str, List[str]] = {}
+        for doc_id, entry in document_map.items():
+            chunks[doc_id] = [
+                vector_store.docstore.search(vector_store.index_to_docstore_id[vector_id]).page_content
+                for start, end in entry["ranges"]
+                for vector_id in range(start, end)
+            ]
+        return chunks
+
+    def _search_ranges(self, vector_store, query_vectors: np.ndarray, ranges: List[List[int]], k: int) -> List[List[Tuple[int, float]]]:
+        """Score only the vectors inside the given id ranges and return the top k per query"""
+        if not ranges:
+            return [[] for _ in range(len(query_vectors))]
+
+        ids = np.concatenate([np.arange(start, end) for start, end in ranges])
+        vectors = np.concatenate([
+            vector_store.index.reconstruct_n(start, end - start) for start, end in ranges
+        ])
+        distances = _l2_distances(query_vectors, vectors)
+
+        results = []
+        for row in distances:
+            results.append([(int(ids[i]), float(row[i])) for i in _top_k(row, k)])
+        return results
+
+    def _routing_applies(self, document_map: Dict[str, Dict], doc_ids: Optional[List[str]]) -> bool:
+        """Whether the candidate documents are numerous enough to route queries"""
+        top_documents = self.config.ROUTING_TOP_DOCUMENTS
+        candidates = len(document_map) if doc_ids is None else len(doc_ids)
+        return top_documents > 0 and candidates > max(top_documents, self.config.ROUTING_MIN_DOCUMENTS)
+
+    def route_documents(self, query_vectors: np.ndarray, doc_ids: Optional[List[str]] = None, snapshot: Optional[IndexSnapshot] = None) -> List[List[str]]:
+        """The ROUTING_TOP_DOCUMENTS documents closest to each query, among doc_ids (default: all)"""
+        if snapshot is None:
+            snapshot = self._snapshot
+        with metrics.span("route"):
+            document_ids = list(snapshot.document_map)
+            document_vectors = snapshot.document_vectors
+            if doc_ids is not None:
+                rows = {doc_id: row for row, doc_id in enumerate(document_ids)}
+                document_ids = [doc_id for doc_id in doc_ids if doc_id in rows]
+                document_vectors = document_vectors[[rows[doc_id] for doc_id in document_ids]]
+
+            distances = _l2_distances(query_vectors, document_vectors)
+            return [[document_ids[i] for i in _top_k(row, self.config.ROUTING_TOP_DOCUMENTS)] for row in distances]
+
+    def _search_by_vectors(self, snapshot: IndexSnapshot, query_vectors: np.ndarray, k: int, filters: Optional[Dict] = None) -> List[List[Tuple[int, float]]]:
+        """Search a snapshot for a matrix of query vectors, filtering and routing before scoring"""
+        vector_store, document_map = snapshot.vector_store, snapshot.document_map
+        doc_ids = self.resolve_filters(filters, document_map)
+        if self._routing_applies(document_map, doc_ids):
+            # Two-stage: pick the closest papers per query, then score only their chunks
+            return [
+                self._search_ranges(
+                    vector_store,
+                    query_vectors[i:i + 1],
+                    [r for doc_id in routed for r in document_map[doc_id]["ranges"]],
+                    k
+                )[0]
+                for i, routed in enumerate(self.route_documents(query_vectors, doc_ids, snapshot))
+            ]
+
+        if doc_ids is None:
+            distances, indices = vector_store.index.search(query_vectors, k)
+            return [
+                [(int(i), float(d)) for i, d in zip(row_ids, row_distances) if i != -1]
+                for row_ids, row_distances in zip(indices, distances)
+            ]
+
+        ranges = [r for doc_id in doc_ids for r in document_map[doc_id]["ranges"]]
+        return self._search_ranges(vector_store, query_vectors, ranges, k)
+
+    def _to_documents(self, vector_store, hits: List[Tuple[int, float]]):
+        """Resolve FAISS vector ids to stored documents"""
+        return [
+            vector_store.docstore.search(vector_store.index_to_docstore_id[vector_id])
+            for vector_id, _ in hits
+        ]
+
+    def _to_scored_documents(self, vector_store, hits: List[Tuple[int, float]]) -> List[Tuple[Any, float]]:
+        """Resolve FAISS hits to (document, cosine similarity) pairs"""
+        return [
+            (doc, distance_to_similarity(distance))
+            for doc, (_, distance) in zip(self._to_documents(vector_store, hits), hits)
+        ]
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed queries through the shared cache and micro-batcher"""
+        return self.query_embedder.embed(queries)
+
+    def similarity_search(self, query: str, k: int = None, filters: Optional[Dict] = None):
+        """Perform similarity search on vector store, optionally restricted by metadata filters"""
+        return [doc for doc, _ in self.similarity_search_with_scores(query, k, filters)]
+
+    def similarity_search_with_scores(self, query: str, k: int = None, filters: Optional[Dict] = None) -> List[Tuple[Any, float]]:
+        """(document, cosine similarity to the query) pairs, most similar first"""
         if k is None:
             k = self.config.SIMILARITY_SEARCH_K
-        
-        vector_store = self.load_vector_store()
-        return vector_store.similarity_search(query, k=k)
+
+        with metrics.span("retrieve"):
+            snapshot = self.load_snapshot()
+            query_vector = self.embed_queries([query])
+            if self.num_shards > 1:
+                filters, any_match = self._forwarded_filters(filters)
+                return _shard_hits(self._shards.search(query_vector, k, filters))[0] if any_match else []
+
+            # Filter or route before scoring: only vectors belonging to the selected documents are compared
+            hits = self._search_by_vectors(snapshot, query_vector, k, filters)[0]
+            return self._to_scored_documents(snapshot.vector_store, hits)
+
+    def batch_similarity_search(self, queries: List[str], k: int = None, filters: Optional[Dict] = None, query_vectors: Optional[np.ndarray] = None):
+        """Search many queries at once with one embedding call and one FAISS search over the query matrix"""
+        return [
+            [doc for doc, _ in scored]
+            for scored in self.batch_similarity_search_with_scores(queries, k, filters, query_vectors)
+        ]
+
+    def batch_similarity_search_with_scores(
+        self,
+        queries: List[str],
+        k: int = None,
+        filters: Optional[Dict] = None,
+        query_vectors: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[Any, float]]]:
+        """batch_similarity_search with the cosine similarity of every document"""
+        if k is None:
+            k = self.config.SIMILARITY_SEARCH_K
+        if not queries:
+            return []
+
+        with metrics.span("retrieve", mode="batch"):
+            snapshot = self.load_snapshot()
+            if query_vectors is None:
+                query_vectors = self.embed_queries(queries)
+            if self.num_shards > 1:
+                filters, any_match = self._forwarded_filters(filters)
+                return _shard_hits(self._shards.search(query_vectors, k, filters)) if any_match else [[] for _ in queries]
+
+            hits_per_query = self._search_by_vectors(snapshot, query_vectors, k, filters)
+            return [self._to_scored_documents(snapshot.vector_store, hits) for hits in hits_per_query]
+
+def _shard_hits(results: List[List[Tuple[float, Any]]]) -> List[List[Tuple[Any, float]]]:
+    """(distance, document) pairs from the shard pool as (document, cosine similarity) pairs"""
+    return [[(doc, distance_to_similarity(distance)) for distance, doc in hits] for hits in results]
+
+def _create_manager() -> VectorStoreManager:
+    """In-process manager, or a thin client of the resource server when RESOURCE_SERVER_SOCKET is set"""
+    if Config.RESOURCE_SERVER_SOCKET:
+        from src.resource_server import RemoteVectorStoreManager
+        return RemoteVectorStoreManager()
+    return VectorStoreManager()
 
 # Global instance
-vector_store_manager = VectorStoreManager()
\ No newline at end of file
+vector_store_manager = _create_manager()
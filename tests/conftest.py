@@ -0,0 +1,5 @@
+import os
+
+# Settings are read when config.settings is imported: use the offline LLM backend, no API key needed
+os.environ["LLM_BACKEND"] = "fake"
+os.environ.pop("RESOURCE_SERVER_SOCKET", None)
@@ -0,0 +1,67 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from src.api_server import ApiRequestHandler, PooledHTTPServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = PooledHTTPServer(("127.0.0.1", 0), ApiRequestHandler, workers=2, max_queue=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, path, body):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+    connection.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, response.getheader("Content-Type"), json.loads(response.read())
+
+
+@pytest.mark.parametrize("body", [
+    {"query": "q", "k": "5"},
+    {"query": "q", "k": 0},
+    {"query": "q", "k": 101},
+    {"query": "q", "k": True},
+    {"query": "q", "filters": ["doc"]},
+    {"query": "q", "filters": {"authors": "Smith"}},
+    {"query": "q", "filters": {"venue": ["NeurIPS"]}},
+    {"queries": ["q", 3]},
+    {},
+])
+def test_search_rejects_malformed_input(server, body):
+    status, _, payload = post(server, "/search", body)
+
+    assert status == 400
+    assert payload["error"]
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"question": "  "},
+    {"question": "q", "chat_history": {"user": "hi"}},
+    {"question": "q", "chat_history": [{"user": "hi"}]},
+    {"question": "q", "chat_history": [{"user": "hi", "assistant": 1}]},
+    {"question": "q", "filters": "2023"},
+    {"question": "q", "filters": {"years": [2023, None]}},
+    {"question": "q", "filters": {"years": "2023"}, "stream": False},
+])
+def test_ask_rejects_malformed_input_before_streaming(server, body):
+    status, content_type, payload = post(server, "/ask", body)
+
+    assert status == 400
+    assert content_type == "application/json"
+    assert payload["error"]
+
+
+def test_unknown_endpoint(server):
+    status, _, payload = post(server, "/nope", {})
+
+    assert status == 404
+    assert "Unknown endpoint" in payload["error"]
@@ -0,0 +1,56 @@
+import pytest
+from langchain_core.documents import Document
+
+from config.settings import PROMPT_TEMPLATES
+from src import chat_handler as chat_handler_module
+from src.chat_handler import ChatHandler
+
+
+def scored(*similarities):
+    return [(Document(page_content=f"chunk {i}"), similarity) for i, similarity in enumerate(similarities)]
+
+
+@pytest.fixture
+def handler():
+    handler = ChatHandler()
+    handler.config.RETRIEVAL_MIN_SIMILARITY = 0.5
+    handler.low_confidence_chain = None
+    return handler
+
+
+def test_gate_is_off_at_zero_threshold(handler):
+    handler.config.RETRIEVAL_MIN_SIMILARITY = 0
+
+    assert handler._gate(scored(0.1)) == ([doc for doc, _ in scored(0.1)], "qa")
+    assert handler._gate([]) == ([], "qa")
+
+
+def test_gate_passes_when_the_best_chunk_reaches_the_threshold(handler):
+    docs, kind = handler._gate(scored(0.2, 0.5, 0.3))
+
+    assert kind == "qa"
+    assert [doc.page_content for doc in docs] == ["chunk 0", "chunk 1", "chunk 2"]
+
+
+def test_gate_below_the_threshold_answers_from_the_template_without_the_llm(handler, monkeypatch):
+    monkeypatch.setattr(
+        chat_handler_module.vector_store_manager, "similarity_search_with_scores", lambda question, filters=None: scored(0.2, 0.4)
+    )
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the LLM was called")
+
+    monkeypatch.setattr(handler, "_answer", fail)
+
+    assert handler._gate([]) == ([], None)
+    assert handler.handle_user_query("Who won the 1998 World Cup?", []) == PROMPT_TEMPLATES["low_confidence_response"]
+
+
+def test_gate_below_the_threshold_uses_the_low_confidence_model_when_configured(handler):
+    low_confidence_chain = object()
+    handler.low_confidence_chain = low_confidence_chain
+
+    docs, kind = handler._gate(scored(0.2))
+
+    assert kind == "low_confidence"
+    assert handler._select_chain(kind, {"question": "q", "context": docs}) == ("low_confidence", low_confidence_chain)
@@ -0,0 +1,91 @@
+from src.chunking import FRONT_MATTER, SectionChunker, detect_heading, split_sections
+from utils.text_utils import estimate_tokens
+
+SENTENCE = "The model is trained on a large corpus of scientific papers."
+
+
+def paper(body_sentences: int = 12) -> str:
+    body = " ".join(f"{SENTENCE[:-1]} number {i}." for i in range(body_sentences))
+    return "\n".join([
+        "A Study of Chunking",
+        "",
+        "Abstract: We study how papers are split.",
+        "",
+        "1 Introduction",
+        body,
+        "",
+        "2 Method",
+        body,
+        "",
+        "References",
+        "[1] A. Author. Some Paper. 2020.",
+    ])
+
+
+def test_detect_heading():
+    assert detect_heading("Introduction") == "Introduction"
+    assert detect_heading("3.2 Training Objective") == "3.2 Training Objective"
+    assert detect_heading("IV. Results:") == "IV. Results"
+    assert detect_heading("Unknown Title Case Line") is None
+    assert detect_heading("3 the model was trained") is None
+    assert detect_heading(SENTENCE) is None
+
+
+def test_split_sections_with_inline_abstract():
+    sections = split_sections(paper(2))
+
+    assert [heading for heading, _ in sections] == [FRONT_MATTER, "Abstract", "1 Introduction", "2 Method", "References"]
+    assert sections[1][1] == ["We study how papers are split."]
+
+
+def test_chunks_fit_budget_and_keep_their_section():
+    chunker = SectionChunker(max_tokens=60, overlap_tokens=20, min_tokens=10, skip_references=True)
+
+    chunks = chunker.split(paper())
+
+    assert all(estimate_tokens(chunk["text"]) <= 60 for chunk in chunks)
+    assert {chunk["section"] for chunk in chunks} == {"Abstract", "1 Introduction", "2 Method"}
+    # The title block is too small for a chunk of its own and is folded into the abstract
+    assert chunks[0]["text"].startswith("A Study of Chunking\nAbstract")
+
+
+def test_overlap_stays_within_a_section():
+    chunker = SectionChunker(max_tokens=60, overlap_tokens=20, min_tokens=0, skip_references=True)
+
+    chunks = chunker.split(paper())
+
+    for previous, chunk in zip(chunks, chunks[1:]):
+        last_sentence = previous["text"].rsplit(". ", 1)[-1]
+        if previous["section"] == chunk["section"]:
+            assert last_sentence in chunk["text"]
+        else:
+            assert chunk["text"].startswith(chunk["section"])
+
+
+def test_references_are_skipped_only_when_configured():
+    skipping = SectionChunker(max_tokens=60, overlap_tokens=0, min_tokens=0, skip_references=True)
+    keeping = SectionChunker(max_tokens=60, overlap_tokens=0, min_tokens=0, skip_references=False)
+
+    assert "References" not in {chunk["section"] for chunk in skipping.split(paper(2))}
+    assert "References" in {chunk["section"] for chunk in keeping.split(paper(2))}
+
+
+def test_long_sentence_is_split_at_word_boundaries():
+    sentence = " ".join(["word"] * 200) + "."
+    chunker = SectionChunker(max_tokens=50, overlap_tokens=0, min_tokens=0)
+
+    chunks = chunker.split(sentence)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk["text"]) <= 50 for chunk in chunks)
+    assert " ".join(chunk["text"] for chunk in chunks).split() == sentence.split()
+
+
+def test_small_chunks_are_merged_into_the_next():
+    chunker = SectionChunker(max_tokens=200, overlap_tokens=0, min_tokens=20)
+
+    chunks = chunker.split("Short Title\n\nAbstract\n" + " ".join([SENTENCE] * 5))
+
+    assert len(chunks) == 1
+    assert chunks[0]["text"].startswith("Short Title\nAbstract")
+    assert chunks[0]["section"] == "Abstract"
@@ -0,0 +1,236 @@
+import io
+import json
+import hashlib
+
+import pytest
+
+from src import ingest_ledger
+from src.pdf_processor import file_sha256
+from src.ingest_ledger import (
+    LEDGER_FILE, IngestLedger, commit_documents, ingest_lock, recoverable_documents, select_new_files,
+)
+
+
+class FakeManager:
+    """Records upserts instead of embedding; lists a fixed set of documents"""
+
+    def __init__(self, documents=()):
+        self.documents = list(documents)
+        self.upserts = []
+
+    def upsert_documents(self, text_chunks, metadatas, remove_doc_ids=None, rebuild=False, progress_callback=None, ledger=None, vectors=None):
+        self.upserts.append({"chunks": text_chunks, "remove_doc_ids": remove_doc_ids, "rebuild": rebuild})
+
+    def list_documents(self):
+        return self.documents
+
+
+def sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def commit(ledger, manager, files, origins=None, empty=()):
+    """Commit one chunk per (source, contents) pair, none for the sources in empty; returns the replaced count"""
+    replaced, _ = commit_with_failures(ledger, manager, files, origins, empty)
+    return replaced
+
+
+def commit_with_failures(ledger, manager, files, origins=None, empty=()):
+    shas = [sha(data) for _, data in files]
+    extracted = [(source, sha256) for (source, _), sha256 in zip(files, shas) if source not in empty]
+    return commit_documents(
+        ledger,
+        manager,
+        [source for source, _ in files],
+        shas,
+        [f"chunk of {source}" for source, _ in extracted],
+        [{"doc_id": sha256[:16]} for _, sha256 in extracted],
+        origins=origins,
+    )
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return IngestLedger(str(tmp_path))
+
+
+def test_select_new_files_skips_indexed_and_repeated_files(ledger):
+    ledger.record(sha(b"old"), "old.pdf", 3)
+    files = [io.BytesIO(b"old"), io.BytesIO(b"new"), io.BytesIO(b"new")]
+    stats = {"skipped": 0}
+
+    pending, metadata, shas = select_new_files(files, [{"i": 0}, {"i": 1}, {"i": 2}], ledger, stats)
+
+    assert pending == [files[1]]
+    assert metadata == [{"i": 1}]
+    assert shas == [sha(b"new")]
+    assert stats["skipped"] == 2
+
+
+def test_partially_indexed_file_is_not_skipped(ledger):
+    ledger.record(sha(b"paper"), "paper.pdf", 1, partial=True)
+    stats = {"skipped": 0}
+
+    pending, _, _ = select_new_files([io.BytesIO(b"paper")], None, ledger, stats)
+
+    assert len(pending) == 1
+    assert stats["skipped"] == 0
+
+
+def test_commit_replaces_earlier_version_from_same_origin(ledger):
+    manager = FakeManager()
+    commit(ledger, manager, [("paper.pdf", b"v1")], origins=["https://example.org/paper.pdf"])
+
+    replaced = commit(ledger, manager, [("paper.pdf", b"v2")], origins=["https://example.org/paper.pdf"])
+
+    assert replaced == 1
+    assert manager.upserts[-1]["remove_doc_ids"] == [sha(b"v1")[:16]]
+    assert set(ledger.files) == {sha(b"v2")}
+
+
+def test_commit_keeps_unrelated_files_with_same_name(ledger):
+    manager = FakeManager()
+    commit(ledger, manager, [("paper.pdf", b"first")])
+
+    replaced = commit(ledger, manager, [("paper.pdf", b"second")])
+
+    assert replaced == 0
+    assert manager.upserts[-1]["remove_doc_ids"] == []
+    assert set(ledger.files) == {sha(b"first"), sha(b"second")}
+
+
+def test_files_of_one_batch_do_not_replace_each_other(ledger):
+    origin = "/papers/paper.pdf"
+
+    replaced = commit(ledger, FakeManager(), [("paper.pdf", b"a"), ("paper.pdf", b"b")], origins=[origin, origin])
+
+    assert replaced == 0
+    assert set(ledger.files) == {sha(b"a"), sha(b"b")}
+
+
+def test_completing_partial_file_replaces_its_chunks(ledger):
+    manager = FakeManager()
+    sha256 = sha(b"paper")
+    commit_documents(ledger, manager, ["paper.pdf"], [sha256], ["c"], [{"doc_id": sha256[:16]}], partial={sha256})
+    assert sha256 not in ledger
+
+    commit(ledger, manager, [("paper.pdf", b"paper")])
+
+    assert manager.upserts[-1]["remove_doc_ids"] == [sha256[:16]]
+    assert sha256 in ledger
+
+
+def test_ledger_from_other_settings_is_stale_and_rebuilds(tmp_path):
+    with open(tmp_path / LEDGER_FILE, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": "other-settings", "files": {sha(b"old"): {"doc_id": sha(b"old")[:16]}}}, f)
+    ledger = IngestLedger(str(tmp_path))
+    manager = FakeManager()
+
+    assert ledger.stale
+    assert sha(b"old") not in ledger
+
+    commit(ledger, manager, [("new.pdf", b"new")])
+
+    assert manager.upserts[-1]["rebuild"] is True
+    assert not ledger.stale
+
+
+def test_index_without_ledger_is_stale(tmp_path):
+    (tmp_path / "index.faiss").write_bytes(b"")
+
+    assert IngestLedger(str(tmp_path)).stale
+
+
+def test_saved_ledger_is_loaded_back(tmp_path):
+    ledger = IngestLedger(str(tmp_path))
+    ledger.record(sha(b"paper"), "paper.pdf", 4, origin="/papers/paper.pdf")
+    ledger.save(str(tmp_path))
+
+    loaded = IngestLedger(str(tmp_path))
+
+    assert not loaded.stale
+    assert sha(b"paper") in loaded
+    assert loaded.superseded_by("/papers/paper.pdf", sha(b"other")) == [sha(b"paper")]
+
+
+def test_recoverable_documents_reads_staged_and_source_copies(tmp_path, monkeypatch):
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    monkeypatch.setattr(ingest_ledger.upload_staging, "directory", str(uploads))
+    staged_sha, local_sha = sha(b"uploaded"), sha(b"local")
+    (uploads / f"{staged_sha}.pdf").write_bytes(b"uploaded")
+    local_path = tmp_path / "local.pdf"
+    local_path.write_bytes(b"local")
+    changed_path = tmp_path / "changed.pdf"
+    changed_path.write_bytes(b"edited since ingestion")
+    manager = FakeManager([
+        {"doc_id": staged_sha[:16], "source": "uploaded.pdf", "title": "Uploaded"},
+        {"doc_id": local_sha[:16], "source": "local.pdf", "origin": str(local_path)},
+        {"doc_id": sha(b"changed")[:16], "source": "changed.pdf", "origin": str(changed_path)},
+        {"doc_id": sha(b"gone")[:16], "source": "gone.pdf"},
+    ])
+
+    recoverable, dropped = recoverable_documents(manager)
+
+    assert recoverable == [
+        (str(uploads / f"{staged_sha}.pdf"), staged_sha, "uploaded.pdf", {"title": "Uploaded"}),
+        (str(local_path), local_sha, "local.pdf", {"origin": str(local_path)}),
+    ]
+    assert dropped == ["changed.pdf", "gone.pdf"]
+
+
+def test_file_without_chunks_is_reported_and_retried(ledger):
+    manager = FakeManager()
+
+    replaced, failed = commit_with_failures(
+        ledger, manager, [("good.pdf", b"good"), ("broken.pdf", b"broken")], empty={"broken.pdf"}
+    )
+
+    assert (replaced, failed) == (0, ["broken.pdf"])
+    assert sha(b"good") in ledger
+    assert sha(b"broken") not in ledger.files
+    stats = {"skipped": 0}
+    pending, _, _ = select_new_files([io.BytesIO(b"broken")], None, ledger, stats)
+    assert len(pending) == 1 and stats["skipped"] == 0
+
+
+def test_failed_new_version_keeps_the_old_one(ledger):
+    manager = FakeManager()
+    origin = "https://example.org/paper.pdf"
+    commit(ledger, manager, [("paper.pdf", b"v1")], origins=[origin])
+
+    replaced, failed = commit_with_failures(ledger, manager, [("paper.pdf", b"v2")], origins=[origin], empty={"paper.pdf"})
+
+    assert (replaced, failed) == (0, ["paper.pdf"])
+    assert manager.upserts[-1]["remove_doc_ids"] == []
+    assert set(ledger.files) == {sha(b"v1")}
+
+
+def test_partial_file_without_chunks_yet_is_recorded_as_partial(ledger):
+    sha256 = sha(b"scanned")
+
+    _, failed = commit_documents(ledger, FakeManager(), ["scanned.pdf"], [sha256], [], [], partial={sha256})
+
+    assert failed == []
+    assert ledger.files[sha256]["partial"] and ledger.files[sha256]["chunks"] == 0
+    assert sha256 not in ledger
+
+
+def test_ingest_lock_excludes_other_processes(tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    index_path = str(tmp_path / "index")
+    with ingest_lock(index_path):
+        # flock conflicts between separate opens of the file, as it does between processes
+        with open(index_path + ".lock") as other:
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    with open(index_path + ".lock") as other:
+        fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def test_file_sha256_hashes_contents_and_rewinds():
+    pdf = io.BytesIO(b"%PDF contents")
+    pdf.seek(5)
+
+    assert file_sha256(pdf) == sha(b"%PDF contents")
+    assert pdf.tell() == 0
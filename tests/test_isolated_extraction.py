@@ -0,0 +1,42 @@
+import io
+import multiprocessing
+
+import pypdfium2 as pdfium
+import pytest
+
+from src.isolated_extraction import IsolatedExtractor
+
+
+def blank_pdf(pages: int) -> bytes:
+    document = pdfium.PdfDocument.new()
+    for _ in range(pages):
+        document.new_page(200, 200)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_failed_worker_start_reraises_and_next_file_starts_a_worker(monkeypatch):
+    extractor = IsolatedExtractor(page_timeout=30, file_timeout=60, memory_mb=0)
+    process_class = type(multiprocessing.get_context("spawn").Process())
+
+    def fail_start(process):
+        raise OSError("cannot start process")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(process_class, "start", fail_start)
+        with pytest.raises(OSError, match="cannot start process"):
+            extractor.extract_pages("pypdfium2", blank_pdf(2))
+    assert extractor._process is None
+
+    try:
+        assert extractor.extract_pages("pypdfium2", blank_pdf(2)) == (["", ""], {})
+    finally:
+        extractor.close()
+
+
+def test_close_without_a_worker():
+    extractor = IsolatedExtractor()
+
+    extractor.close()
+    extractor.close()
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+
+from src import chat_handler as chat_handler_module
+from src.chat_handler import ChatHandler
+from src.model_cascade import FAST, LARGE, ModelCascade
+
+
+class FakeChain:
+    """Returns a fixed answer and counts its calls"""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = 0
+
+    def invoke(self, inputs, config=None):
+        self.calls += 1
+        return self.answer
+
+    async def ainvoke(self, inputs, config=None):
+        return self.invoke(inputs, config)
+
+
+@pytest.fixture
+def cascade():
+    cascade = ModelCascade()
+    cascade.models = {FAST: "small-model", LARGE: "large-model"}
+    cascade.max_question_words = 25
+    cascade.max_context_tokens = 3000
+    cascade.escalation = True
+    return cascade
+
+
+@pytest.mark.parametrize("kind, question, context_tokens, route", [
+    ("qa", "What dataset was used for pretraining?", 500, (FAST, "lookup")),
+    ("qa", "Compare the two attention variants", 500, (LARGE, "synthesis")),
+    ("qa", "Why does the model fail on long inputs?", 500, (LARGE, "synthesis")),
+    ("qa", " ".join(["word"] * 26), 500, (LARGE, "long_question")),
+    ("qa", "What dataset was used?", 3001, (LARGE, "large_context")),
+    ("summarization", "", 500, (LARGE, "summarization")),
+])
+def test_route_sends_lookups_to_the_fast_model(cascade, kind, question, context_tokens, route):
+    assert cascade.route(kind, question, context_tokens) == route
+
+
+def test_route_uses_the_large_tier_when_both_tiers_share_a_model(cascade):
+    cascade.models[FAST] = cascade.models[LARGE]
+
+    assert cascade.route("qa", "What dataset was used?", 10) == (LARGE, "single_model")
+
+
+def test_self_check_flags_empty_and_uncertain_answers(cascade):
+    assert cascade.self_check("  ") == "empty"
+    assert cascade.self_check("I'm not sure which dataset was used.") == "uncertain"
+    assert cascade.self_check("The answer is not available in the provided papers.") == "uncertain"
+    assert cascade.self_check("They pretrain on C4.") is None
+
+    cascade.escalation = False
+    assert cascade.self_check("I'm not sure.") is None
+
+
+@pytest.fixture
+def handler(cascade, monkeypatch):
+    monkeypatch.setattr(chat_handler_module, "model_cascade", cascade)
+    return ChatHandler()
+
+
+def qa_inputs(question):
+    return {"question": question, "context": [Document(page_content="We pretrain on C4.")], "chat_history": ""}
+
+
+def test_uncertain_fast_answers_are_escalated_to_the_large_model(handler):
+    fast, large = FakeChain("I do not know."), FakeChain("They pretrain on C4.")
+    handler.chains["qa"] = {FAST: fast, LARGE: large}
+
+    assert handler._answer("qa", qa_inputs("Which corpus is used?")) == "They pretrain on C4."
+    assert asyncio.run(handler._aanswer("qa", qa_inputs("Which corpus is used?"))) == "They pretrain on C4."
+    assert (fast.calls, large.calls) == (2, 2)
+
+
+def test_confident_fast_answers_are_kept(handler):
+    fast, large = FakeChain("C4."), FakeChain("They pretrain on C4.")
+    handler.chains["qa"] = {FAST: fast, LARGE: large}
+
+    assert handler._answer("qa", qa_inputs("Which corpus is used?")) == "C4."
+    assert handler._answer("qa", qa_inputs("Why is C4 used?")) == "They pretrain on C4."
+    assert (fast.calls, large.calls) == (1, 1)
@@ -0,0 +1,55 @@
+import io
+
+import pytest
+
+from src.pdf_extractors import PdfExtractor
+from src.pdf_processor import PDFProcessor
+
+
+class FailingPageExtractor(PdfExtractor):
+    """Two pages of text with a failing page between them"""
+
+    name = "failing-page"
+
+    def page_count(self, pdf):
+        return 3
+
+    def iter_pages(self, pdf, on_page_error=None, first_page=0):
+        yield "Attention is all you need. " * 20
+        on_page_error(1, ValueError("bad content stream"))
+        yield ""
+        yield "The transformer relies entirely on attention. " * 20
+
+
+@pytest.fixture
+def processor():
+    processor = PDFProcessor()
+    processor.config.EXTRACTION_ISOLATION = False
+    return processor
+
+
+def named(data: bytes, name: str):
+    pdf = io.BytesIO(data)
+    pdf.name = name
+    return pdf
+
+
+def test_unreadable_files_report_errors_instead_of_chunks(processor):
+    errors = {}
+
+    chunks, metadatas = processor.process_documents([named(b"", "empty.pdf"), named(b"not a pdf", "notes.pdf")], errors=errors)
+
+    assert chunks == [] and metadatas == []
+    assert errors["empty.pdf"] == ["The file is empty"]
+    assert len(errors["notes.pdf"]) == 1
+
+
+def test_page_errors_are_returned_with_the_skipped_pages(processor):
+    processor.extractors = [FailingPageExtractor()]
+    errors = {}
+
+    chunks, metadatas = processor.process_documents([named(b"%PDF-1.4", "paper.pdf")], errors=errors)
+
+    assert chunks
+    assert metadatas[0]["skipped_pages"] == [2]
+    assert errors == {"paper.pdf": ["Error extracting text from page 2: bad content stream"]}
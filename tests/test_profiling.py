@@ -0,0 +1,52 @@
+import os
+import time
+
+from config.settings import Config
+from src import profiling
+from src.profiling import list_profiles, profile_request, profiling_mode, prune_profiles
+
+
+def test_query_parameter_is_ignored_outside_admin_mode(monkeypatch):
+    monkeypatch.setattr(Config, "PROFILING_MODE", "")
+    monkeypatch.setattr(Config, "ADMIN_MODE", False)
+
+    assert profiling_mode({"profile": "cprofile"}) is None
+
+    monkeypatch.setattr(Config, "ADMIN_MODE", True)
+
+    assert profiling_mode({"profile": "sampling"}) == "sampling"
+    assert profiling_mode({"profile": "1"}) == "cprofile"
+    assert profiling_mode({"profile": "unknown"}) is None
+
+
+def test_environment_mode_applies_without_admin_mode(monkeypatch):
+    monkeypatch.setattr(Config, "PROFILING_MODE", "sampling")
+    monkeypatch.setattr(Config, "ADMIN_MODE", False)
+
+    assert profiling_mode({}) == "sampling"
+
+
+def test_profile_request_writes_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "PROFILE_DIR", str(tmp_path))
+
+    with profile_request("chat question", "cprofile") as base:
+        sum(range(1000))
+
+    assert os.path.basename(base).endswith("_chat-question_cprofile")
+    assert set(list_profiles()[0]["files"]) == {".pstats", ".collapsed", ".txt"}
+
+
+def test_old_profiles_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "PROFILE_RETENTION_HOURS", 1)
+    monkeypatch.setattr(profiling, "_last_prune", 0.0)
+    old, new = tmp_path / "old_chat_cprofile.pstats", tmp_path / "new_chat_cprofile.pstats"
+    old.write_text("")
+    new.write_text("")
+    two_hours_ago = time.time() - 7200
+    os.utime(old, (two_hours_ago, two_hours_ago))
+
+    prune_profiles()
+
+    assert not old.exists()
+    assert new.exists()
@@ -0,0 +1,102 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.query_embedder import QueryEmbedder, normalize_query
+
+
+class RecordingEmbedder:
+    """Vectors derived from the text; records the texts of every call"""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.threads = []
+        self.error = error
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        self.threads.append(threading.current_thread())
+        if self.error:
+            raise self.error
+        return [[float(len(text)), float(sum(map(ord, text)))] for text in texts]
+
+
+def embed_concurrently(embedder, queries):
+    barrier = threading.Barrier(len(queries))
+    results = [None] * len(queries)
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = embedder.embed([queries[i]])
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(queries))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_normalize_query_collapses_whitespace_and_compatibility_forms():
+    assert normalize_query("  What is\tthe  ﬁrst\nresult? ") == "What is the first result?"
+
+
+def test_repeated_queries_are_served_from_the_cache():
+    embed_fn = RecordingEmbedder()
+    embedder = QueryEmbedder(embed_fn, cache_size=8, batch_window_ms=0)
+
+    first = embedder.embed(["what is attention"])
+    second = embedder.embed([" what  is attention "])
+
+    np.testing.assert_array_equal(first, second)
+    assert embed_fn.calls == [["what is attention"]]
+
+
+def test_least_recently_used_queries_are_evicted():
+    embed_fn = RecordingEmbedder()
+    embedder = QueryEmbedder(embed_fn, cache_size=2, batch_window_ms=0)
+
+    embedder.embed(["a"])
+    embedder.embed(["b"])
+    embedder.embed(["a"])
+    embedder.embed(["c"])
+    embedder.embed(["a", "b"])
+
+    assert embed_fn.calls == [["a"], ["b"], ["c"], ["b"]]
+
+
+def test_concurrent_queries_are_embedded_in_one_batch():
+    embed_fn = RecordingEmbedder()
+    embedder = QueryEmbedder(embed_fn, cache_size=8, batch_window_ms=500, max_batch_size=16)
+
+    results = embed_concurrently(embedder, ["first", "second", "first", "third"])
+
+    assert len(embed_fn.calls) == 1
+    assert sorted(embed_fn.calls[0]) == ["first", "second", "third"]
+    for query, vectors in zip(["first", "second", "first", "third"], results):
+        np.testing.assert_array_equal(vectors, [[len(query), sum(map(ord, query))]])
+
+
+def test_a_full_batch_is_embedded_in_the_calling_thread():
+    embed_fn = RecordingEmbedder()
+    embedder = QueryEmbedder(embed_fn, cache_size=8, batch_window_ms=500, max_batch_size=2)
+
+    vectors = embedder.embed(["a", "b", "a"])
+
+    assert embed_fn.calls == [["a", "b"]]
+    assert vectors.shape == (3, 2)
+    assert embed_fn.threads == [threading.current_thread()]
+
+
+def test_a_failed_batch_fails_every_waiting_query():
+    embedder = QueryEmbedder(RecordingEmbedder(error=RuntimeError("model unavailable")), batch_window_ms=200)
+
+    results = embed_concurrently(embedder, ["first", "second"])
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError):
+        embedder.embed(["first"])
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter, TokenBucket, retry_delay
+
+
+def drained_limiter(requests_per_minute: float) -> RateLimiter:
+    limiter = RateLimiter(requests_per_minute, 0)
+    limiter.requests.consume(requests_per_minute)
+    return limiter
+
+
+def wait_for_queue(limiter: RateLimiter, length: int):
+    deadline = time.monotonic() + 2
+    while len(limiter._queue) < length:
+        assert time.monotonic() < deadline, "acquire never queued"
+        time.sleep(0.001)
+
+
+def test_disabled_bucket_never_waits():
+    bucket = TokenBucket(0)
+    bucket.consume(1000)
+
+    assert bucket.wait_time(1000) == 0
+
+
+def test_bucket_waits_for_refill():
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(60) == 0
+
+    bucket.consume(60)
+
+    assert 0.9 < bucket.wait_time(1) <= 1.0
+
+
+def test_bucket_balance_goes_negative_on_correction():
+    bucket = TokenBucket(60)
+    bucket.consume(60)
+    bucket.consume(30)
+
+    assert bucket.wait_time(1) > 30
+
+
+def test_requests_larger_than_capacity_are_capped():
+    bucket = TokenBucket(60)
+
+    assert bucket.wait_time(1000) == 0
+
+
+def test_interactive_request_is_served_before_queued_background_work():
+    limiter = drained_limiter(120)
+    order = []
+
+    def acquire(name, priority):
+        limiter.acquire(priority=priority)
+        order.append(name)
+
+    background = threading.Thread(target=acquire, args=("background", BACKGROUND))
+    background.start()
+    wait_for_queue(limiter, 1)
+    interactive = threading.Thread(target=acquire, args=("interactive", INTERACTIVE))
+    interactive.start()
+    wait_for_queue(limiter, 2)
+    background.join(timeout=5)
+    interactive.join(timeout=5)
+
+    assert order == ["interactive", "background"]
+
+
+def test_same_priority_is_first_come_first_served():
+    limiter = drained_limiter(120)
+    order = []
+
+    def acquire(name):
+        limiter.acquire(priority=BACKGROUND)
+        order.append(name)
+
+    threads = [threading.Thread(target=acquire, args=(name,)) for name in ("first", "second")]
+    for length, thread in enumerate(threads, 1):
+        thread.start()
+        wait_for_queue(limiter, length)
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert order == ["first", "second"]
+
+
+def test_cancelled_async_acquire_leaves_the_queue():
+    limiter = drained_limiter(1)
+
+    async def cancel():
+        task = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+
+    assert limiter._queue == []
+
+
+def test_retry_delay_prefers_retry_after_header():
+    class Response:
+        headers = {"retry-after": "7"}
+
+    class RateLimitError(Exception):
+        response = Response()
+
+    assert retry_delay(RateLimitError(), attempt=3) == 7.0
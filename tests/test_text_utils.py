@@ -0,0 +1,51 @@
+from utils.text_utils import normalize_page, normalize_pages, tfidf_keywords
+
+BODIES = ["Alpha results.", "Beta method.", "Gamma setup.", "Delta proofs.", "Epsilon data.", "Zeta notes."]
+
+
+def page(number: int) -> str:
+    return f"Journal of Examples, Vol. 3\n{BODIES[number - 1]}\nA middle line.\nClosing line {BODIES[number - 1]}\n{number}"
+
+
+def test_repeated_headers_and_page_numbers_are_removed():
+    pages = [page(n) for n in range(1, 5)]
+
+    normalized = list(normalize_pages(pages))
+
+    # The first page keeps its header, since it usually carries the title, but not its page number
+    assert normalized[0] == pages[0].rsplit("\n", 1)[0]
+    assert normalized[1:] == [pages[n].split("\n", 1)[1].rsplit("\n", 1)[0] for n in range(1, 4)]
+
+
+def test_pages_after_warmup_are_normalized_as_they_arrive():
+    pages = [page(n) for n in range(1, 7)]
+
+    normalized = list(normalize_pages(pages, warmup_pages=2))
+
+    assert normalized[-1] == f"{BODIES[5]}\nA middle line.\nClosing line {BODIES[5]}"
+
+
+def test_hyphenated_words_ligatures_and_whitespace():
+    text = "The ﬁrst experi-\nment   ran\n\n\n\nfor two hours."
+
+    assert normalize_page(text) == "The first experiment ran\n\nfor two hours."
+
+
+def test_tfidf_keywords_prefer_terms_distinctive_to_a_document():
+    documents = {
+        "transformer": ["Attention models with attention heads.", "Attention scales; model training is costly."],
+        "diffusion": ["Diffusion models denoise images.", "Model training adds noise, then diffusion reverses it."],
+        "empty": [],
+    }
+
+    keywords = tfidf_keywords(documents, top_k=3)
+
+    assert keywords["transformer"][0] == "attention"
+    assert keywords["diffusion"][0] == "diffusion"
+    # Shared by both documents, so outranked by any term of one document
+    assert not {"models", "model", "training"} & set(keywords["transformer"] + keywords["diffusion"])
+    assert keywords["empty"] == []
+
+
+def test_tfidf_keywords_of_documents_without_terms():
+    assert tfidf_keywords({"a": ["1 2 3"], "b": []}) == {"a": [], "b": []}
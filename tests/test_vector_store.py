@@ -0,0 +1,180 @@
+import os
+import shutil
+import hashlib
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.vector_store import VectorStoreManager, _without_documents, file_lock
+
+
+def test_removing_documents_shifts_and_merges_remaining_ranges():
+    document_map = {
+        "a": {"source": "a.pdf", "ranges": [[0, 3]]},
+        "b": {"source": "b.pdf", "ranges": [[3, 5], [9, 10]]},
+        "c": {"source": "c.pdf", "ranges": [[5, 9]]},
+        "d": {"source": "d.pdf", "ranges": [[10, 12]]},
+    }
+    vectors = np.arange(8, dtype=np.float32).reshape(4, 2)
+
+    remaining, remaining_vectors = _without_documents(document_map, vectors, ["a", "c"])
+
+    assert remaining == {
+        "b": {"source": "b.pdf", "ranges": [[0, 3]]},
+        "d": {"source": "d.pdf", "ranges": [[3, 5]]},
+    }
+    np.testing.assert_array_equal(remaining_vectors, vectors[[1, 3]])
+
+
+def test_removing_unknown_documents_changes_nothing():
+    document_map = {"a": {"ranges": [[0, 2]]}}
+    vectors = np.ones((1, 2), dtype=np.float32)
+
+    remaining, remaining_vectors = _without_documents(document_map, vectors, ["missing"])
+
+    assert remaining is document_map
+    assert remaining_vectors is vectors
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic unit vectors, so no model is loaded"""
+
+    def embed_documents(self, texts):
+        vectors = []
+        for text in texts:
+            vector = np.random.default_rng(int(hashlib.sha256(text.encode()).hexdigest()[:8], 16)).standard_normal(16)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def add_document(manager, doc_id, chunks=200, remove=False):
+    texts = [f"{doc_id} chunk {i}" for i in range(chunks)]
+    metadatas = [{"doc_id": doc_id, "source": f"{doc_id}.pdf", "chunk": i} for i in range(chunks)]
+    manager.upsert_documents(texts, metadatas, remove_doc_ids=[doc_id] if remove else None)
+
+
+def test_filtered_searches_stay_consistent_while_documents_are_replaced(tmp_path):
+    manager = VectorStoreManager(index_path=str(tmp_path / "index"), embeddings=HashEmbeddings(), num_shards=1)
+    # Replacing "x" deletes the vectors in front of the other papers, shifting their ids
+    for doc_id in ("x", "a", "b"):
+        add_document(manager, doc_id)
+    stop = threading.Event()
+    failures = []
+
+    def search():
+        while not stop.is_set():
+            try:
+                docs = manager.similarity_search("a question", k=5, filters={"doc_ids": ["b"]})
+                failures.extend(doc.metadata["doc_id"] for doc in docs if doc.metadata["doc_id"] != "b")
+            except Exception as e:
+                failures.append(repr(e))
+
+    readers = [threading.Thread(target=search) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    try:
+        for _ in range(10):
+            add_document(manager, "x", remove=True)
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+    assert failures == []
+    assert [doc["chunks"] for doc in manager.list_documents()] == [200, 200, 200]
+
+
+def test_repeated_remove_ids_delete_a_document_once(tmp_path):
+    manager = VectorStoreManager(index_path=str(tmp_path / "index"), embeddings=HashEmbeddings(), num_shards=1)
+    add_document(manager, "a", chunks=5)
+    add_document(manager, "b", chunks=5)
+
+    manager.upsert_documents([], [], remove_doc_ids=["a", "a"])
+
+    assert [doc["doc_id"] for doc in manager.list_documents()] == ["b"]
+
+
+def test_document_info_returns_metadata_without_ranges(tmp_path):
+    manager = VectorStoreManager(index_path=str(tmp_path / "index"), embeddings=HashEmbeddings(), num_shards=1)
+    assert manager.document_info("a") == {}
+
+    add_document(manager, "a", chunks=3)
+
+    assert manager.document_info("a") == {"source": "a.pdf", "chunks": 3}
+    assert manager.document_info("missing") == {}
+
+
+def test_readers_wait_for_a_save_between_its_renames_instead_of_recovering_it(tmp_path):
+    index_path = str(tmp_path / "index")
+    writer = VectorStoreManager(index_path=index_path, embeddings=HashEmbeddings(), num_shards=1)
+    add_document(writer, "a", chunks=3)
+    shutil.copytree(index_path, index_path + ".tmp")
+    reader = VectorStoreManager(index_path=index_path, embeddings=HashEmbeddings(), num_shards=1)
+    loaded = []
+
+    # Another process's save, stopped between its two renames
+    with file_lock(index_path + ".swap"):
+        os.rename(index_path, index_path + ".old")
+        thread = threading.Thread(target=lambda: loaded.append(reader.load_snapshot()))
+        thread.start()
+        thread.join(0.5)
+        assert thread.is_alive()
+        os.rename(index_path + ".tmp", index_path)
+    thread.join()
+
+    assert list(loaded[0].document_map) == ["a"]
+    assert os.path.exists(index_path + ".old")
+
+
+def test_an_interrupted_save_is_recovered(tmp_path):
+    index_path = str(tmp_path / "index")
+    add_document(VectorStoreManager(index_path=index_path, embeddings=HashEmbeddings(), num_shards=1), "a", chunks=3)
+    os.rename(index_path, index_path + ".old")
+
+    reader = VectorStoreManager(index_path=index_path, embeddings=HashEmbeddings(), num_shards=1)
+
+    assert list(reader.load_snapshot().document_map) == ["a"]
+    assert not os.path.exists(index_path + ".old")
+
+
+def test_resolve_filters_matches_every_given_facet():
+    manager = VectorStoreManager(index_path="unused", embeddings=HashEmbeddings(), num_shards=1)
+    document_map = {
+        "a": {"authors": "Ashish Vaswani, Noam Shazeer", "categories": "cs.CL, cs.LG", "year": 2017},
+        "b": {"authors": "Jonathan Ho", "categories": "cs.LG", "year": "2020"},
+        "c": {"source": "notes.pdf"},
+    }
+
+    assert manager.resolve_filters(None, document_map) is None
+    assert manager.resolve_filters({"authors": [], "years": []}, document_map) is None
+    assert manager.resolve_filters({"authors": ["vaswani"]}, document_map) == ["a"]
+    assert manager.resolve_filters({"categories": ["CS.LG"]}, document_map) == ["a", "b"]
+    assert manager.resolve_filters({"years": [2020]}, document_map) == ["b"]
+    assert manager.resolve_filters({"categories": ["cs.LG"], "years": ["2017"]}, document_map) == ["a"]
+    assert manager.resolve_filters({"doc_ids": ["c"], "years": [2017]}, document_map) == []
+
+
+def test_filtered_search_returns_only_the_selected_papers(tmp_path):
+    manager = VectorStoreManager(index_path=str(tmp_path / "index"), embeddings=HashEmbeddings(), num_shards=1)
+    for doc_id in ("a", "b", "c"):
+        add_document(manager, doc_id, chunks=20)
+
+    docs = manager.similarity_search("a question", k=8, filters={"doc_ids": ["a", "c"]})
+    unmatched = manager.similarity_search("a question", k=8, filters={"authors": ["nobody"]})
+
+    assert len(docs) == 8
+    assert {doc.metadata["doc_id"] for doc in docs} <= {"a", "c"}
+    assert unmatched == []
+
+
+def test_keyword_filters_use_the_document_keywords():
+    manager = VectorStoreManager(index_path="unused", embeddings=HashEmbeddings(), num_shards=1)
+    manager.document_keywords = {"a": ["attention", "transformer"], "b": ["diffusion"]}
+    document_map = {"a": {}, "b": {}, "c": {}}
+
+    assert manager.resolve_filters({"keywords": ["Attention"]}, document_map) == ["a"]
+    assert manager.resolve_filters({"keywords": ["diffusion", "transformer"]}, document_map) == ["a", "b"]
@@ -1,3 +1,4 @@
+import os
 import requests
 import tempfile
 import streamlit as st
@@ -32,25 +33,36 @@ def download_pdf_from_url(url: str) -> Optional[str]:
         elif 'scholar.google.com' in url:
             st.warning("Google Scholar URLs are not direct PDF links. Please find the actual PDF URL or upload the file manually.")
         
-        response = requests.get(url, timeout=30, headers={
+        # Streamed to disk in blocks, so a large PDF is never held in memory as a whole
+        with requests.get(url, timeout=30, stream=True, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        response.raise_for_status()
-        
-        # Validate content type
-        content_type = response.headers.get('content-type', '').lower()
-        if 'application/pdf' not in content_type:
-            st.warning(f"Warning: URL may not be a PDF file (Content-Type: {content_type})")
-            # Still try to process it as it might be a valid PDF with wrong content-type
-        
-        # Validate PDF content by checking magic bytes
-        if not response.content.startswith(b'%PDF'):
-            st.error(f"Downloaded content is not a valid PDF file from {url}")
-            return None
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-            tmp_pdf.write(response.content)
-            return tmp_pdf.name
+        }) as response:
+            response.raise_for_status()
+            
+            # Validate content type
+            content_type = response.headers.get('content-type', '').lower()
+            if 'application/pdf' not in content_type:
+                st.warning(f"Warning: URL may not be a PDF file (Content-Type: {content_type})")
+                # Still try to process it as it might be a valid PDF with wrong content-type
+            
+            blocks = response.iter_content(chunk_size=1 << 20)
+            first_block = next((block for block in blocks if block), b"")
+            
+            # Validate PDF content by checking magic bytes
+            if not first_block.startswith(b'%PDF'):
+                st.error(f"Downloaded content is not a valid PDF file from {url}")
+                return None
+            
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
+                try:
+                    tmp_pdf.write(first_block)
+                    for block in blocks:
+                        tmp_pdf.write(block)
+                except Exception:
+                    tmp_pdf.close()
+                    os.remove(tmp_pdf.name)
+                    raise
+                return tmp_pdf.name
             
     except requests.RequestException as e:
         st.error(f"Failed to download PDF from {url}: {e}")
@@ -73,7 +85,7 @@ def cleanup_temp_files(file_paths: list):
 def search_arxiv(query: str, max_results: int = 5) -> List[Dict[str, str]]:
     """Search arXiv for research papers and return basic metadata.
 
-    Returns a list of dicts with: title, authors, summary, abs_url, pdf_url, published, id
+    Returns a list of dicts with: title, authors, summary, abs_url, pdf_url, published, year, categories, id
     """
     if not query or not query.strip():
         return []
@@ -127,6 +139,16 @@ def search_arxiv(query: str, max_results: int = 5) -> List[Dict[str, str]]:
                 if title_attr.lower() == "pdf" or (rel == "related" and href.endswith(".pdf")):
                     pdf_url = href
 
+            # Categories (primary first)
+            categories: List[str] = []
+            primary = entry.find("arxiv:primary_category", ns)
+            if primary is not None and primary.attrib.get("term"):
+                categories.append(primary.attrib["term"])
+            for category in entry.findall("atom:category", ns):
+                term = category.attrib.get("term", "")
+                if term and term not in categories:
+                    categories.append(term)
+
             # Derive pdf_url if missing
             if not pdf_url and abs_url:
                 paper_code = abs_url.split("/abs/")[-1]
@@ -138,6 +160,8 @@ def search_arxiv(query: str, max_results: int = 5) -> List[Dict[str, str]]:
                 "authors": ", ".join(authors),
                 "summary": summary,
                 "published": published,
+                "year": published[:4],
+                "categories": ", ".join(categories),
                 "abs_url": abs_url,
                 "pdf_url": pdf_url,
             })
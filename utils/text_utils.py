@@ -1,5 +1,8 @@
 import re
-from typing import List, Optional
+import math
+from collections import Counter
+from typing import List, Dict, Optional, Iterable, Iterator, Set
+import numpy as np
 
 def clean_text(text: str) -> str:
     """Clean and normalize extracted text"""
@@ -29,25 +32,169 @@ def truncate_text(text: str, max_tokens: int = 4000) -> str:
     char_limit = max_tokens * 4
     return text[:char_limit] + "..."
 
+# Common stop words to filter out of keywords
+KEYWORD_STOP_WORDS = {
+    'this', 'that', 'with', 'have', 'will', 'from', 'they', 'know',
+    'want', 'been', 'good', 'much', 'some', 'time', 'very', 'when',
+    'come', 'here', 'just', 'like', 'long', 'make', 'many', 'over',
+    'such', 'take', 'than', 'them', 'well', 'were', 'what', 'your',
+    'also', 'into', 'more', 'most', 'only', 'other', 'these', 'those',
+    'their', 'there', 'then', 'which', 'while', 'where', 'each', 'both',
+    'does', 'using', 'used', 'based', 'show', 'shows', 'shown', 'however',
+    'between', 'through', 'about', 'after', 'before', 'under', 'within',
+    'would', 'could', 'should', 'being', 'same', 'first', 'second', 'table',
+    'figure', 'section', 'paper', 'work', 'results', 'approach', 'method'
+}
+
+KEYWORD_RE = re.compile(r"\b[a-z][a-z\-]{3,}\b")
+
 def extract_keywords(text: str, top_k: int = 10) -> List[str]:
     """Extract top keywords from text (simple frequency-based)"""
     # Simple keyword extraction - can be enhanced with NLP libraries
     words = re.findall(r'\b\w{4,}\b', text.lower())
     
-    # Common stop words to filter out
-    stop_words = {
-        'this', 'that', 'with', 'have', 'will', 'from', 'they', 'know',
-        'want', 'been', 'good', 'much', 'some', 'time', 'very', 'when',
-        'come', 'here', 'just', 'like', 'long', 'make', 'many', 'over',
-        'such', 'take', 'than', 'them', 'well', 'were', 'what', 'your'
-    }
-    
     # Filter and count
-    filtered_words = [word for word in words if word not in stop_words]
+    filtered_words = [word for word in words if word not in KEYWORD_STOP_WORDS]
     word_freq = {}
     for word in filtered_words:
         word_freq[word] = word_freq.get(word, 0) + 1
     
     # Return top keywords
     sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-    return [word for word, freq in sorted_words[:top_k]]
\ No newline at end of file
+    return [word for word, freq in sorted_words[:top_k]]
+
+def tfidf_keywords(documents: Dict[str, List[str]], top_k: int = 8) -> Dict[str, List[str]]:
+    """Top TF-IDF terms of each document, with document frequencies taken over the whole corpus
+    
+    documents maps a document id to its chunks. Terms are counted once per document, then
+    scored for all documents together as one sparse (document, term) array.
+    """
+    vocabulary: Dict[str, int] = {}
+    doc_rows, term_ids, counts = [], [], []
+    for row, chunks in enumerate(documents.values()):
+        term_counts = Counter(
+            term for chunk in chunks for term in KEYWORD_RE.findall(chunk.lower())
+            if term not in KEYWORD_STOP_WORDS and not term.endswith("-")
+        )
+        doc_rows.extend([row] * len(term_counts))
+        term_ids.extend(vocabulary.setdefault(term, len(vocabulary)) for term in term_counts)
+        counts.extend(term_counts.values())
+    if not counts:
+        return {doc_id: [] for doc_id in documents}
+    
+    doc_rows = np.asarray(doc_rows)
+    term_ids = np.asarray(term_ids)
+    document_frequency = np.bincount(term_ids, minlength=len(vocabulary))
+    # Sublinear tf, smoothed idf (as in scikit-learn's TfidfVectorizer)
+    scores = (1.0 + np.log(np.asarray(counts, dtype=np.float64))) * (
+        np.log((1.0 + len(documents)) / (1.0 + document_frequency[term_ids])) + 1.0
+    )
+    
+    # Sort by document, then by descending score, and keep the first top_k of each document
+    order = np.lexsort((-scores, doc_rows))
+    doc_rows, term_ids = doc_rows[order], term_ids[order]
+    starts = np.searchsorted(doc_rows, np.arange(len(documents)))
+    rank = np.arange(len(doc_rows)) - starts[doc_rows]
+    keep = rank < top_k
+    
+    terms = np.asarray(list(vocabulary), dtype=object)
+    keywords: Dict[str, List[str]] = {doc_id: [] for doc_id in documents}
+    doc_ids = list(documents)
+    for row, term in zip(doc_rows[keep], terms[term_ids[keep]]):
+        keywords[doc_ids[row]].append(term)
+    return keywords
+
+# Typographic ligatures and invisible characters common in PDF text layers
+LIGATURE_TABLE = str.maketrans({
+    "ﬀ": "ff",
+    "ﬁ": "fi",
+    "ﬂ": "fl",
+    "ﬃ": "ffi",
+    "ﬄ": "ffl",
+    "ﬅ": "ft",
+    "ﬆ": "st",
+    "­": None,  # soft hyphen
+    "​": None,  # zero-width space
+    "﻿": None,  # byte order mark
+})
+
+PAGE_NUMBER_RE = re.compile(r"^(?:page\s*)?(?:\d{1,4}|[ivxlc]{1,7})(?:\s*(?:of|/)\s*\d{1,4})?$", re.IGNORECASE)
+DIGITS_RE = re.compile(r"\d+")
+
+def _edge_indexes(lines: List[str], edge_lines: int) -> List[int]:
+    """Indexes of the first and last edge_lines non-empty lines of a page"""
+    non_empty = [i for i, line in enumerate(lines) if line and not line.isspace()]
+    return sorted(set(non_empty[:edge_lines] + non_empty[-edge_lines:]))
+
+def _edge_key(line: str) -> str:
+    """Key used to match running headers/footers across pages (page numbers ignored)"""
+    return DIGITS_RE.sub("#", " ".join(line.split()).lower())
+
+def normalize_page(text: str, repeated_edges: Set[str] = frozenset(), edge_lines: int = 2) -> str:
+    """Normalize one page of extracted PDF text in a single pass over its lines
+    
+    Folds ligatures, drops page numbers and repeated header/footer lines at the page edges,
+    rejoins words hyphenated across line breaks and collapses whitespace.
+    """
+    lines = text.translate(LIGATURE_TABLE).split("\n")
+    edges = set(_edge_indexes(lines, edge_lines))
+    
+    out: List[str] = []
+    for i, raw_line in enumerate(lines):
+        line = " ".join(raw_line.split())
+        if not line:
+            # Keep at most one blank line as a paragraph break
+            if out and out[-1]:
+                out.append("")
+            continue
+        if i in edges and (PAGE_NUMBER_RE.match(line) or _edge_key(line) in repeated_edges):
+            continue
+        
+        previous = out[-1] if out else ""
+        if len(previous) > 1 and previous[-1] == "-" and previous[-2].isalpha() and line[0].islower():
+            out[-1] = previous[:-1] + line
+        else:
+            out.append(line)
+    
+    return "\n".join(out).strip("\n")
+
+def normalize_pages(
+    pages: Iterable[str],
+    edge_lines: int = 2,
+    min_fraction: float = 0.5,
+    warmup_pages: int = 8
+) -> Iterator[str]:
+    """Normalize a stream of page texts, removing headers/footers that repeat across pages
+    
+    The first warmup_pages are buffered to learn which edge lines repeat; later pages are
+    normalized as they arrive while the counts keep updating. The first page keeps its
+    edge lines, since it usually carries the title rather than a running header.
+    """
+    counts: Counter = Counter()
+    seen = 0
+    
+    def learn(page: str):
+        nonlocal seen
+        seen += 1
+        lines = page.split("\n")
+        counts.update({_edge_key(lines[i]) for i in _edge_indexes(lines, edge_lines)})
+    
+    def repeated() -> Set[str]:
+        threshold = max(2, math.ceil(min_fraction * seen))
+        return {key for key, count in counts.items() if count >= threshold}
+    
+    page_iter = iter(pages)
+    buffered: List[str] = []
+    for page in page_iter:
+        learn(page)
+        buffered.append(page)
+        if len(buffered) >= warmup_pages:
+            break
+    
+    edges = repeated()
+    for page_num, page in enumerate(buffered):
+        yield normalize_page(page, edges if page_num else frozenset(), edge_lines)
+    
+    for page in page_iter:
+        learn(page)
+        yield normalize_page(page, repeated(), edge_lines)